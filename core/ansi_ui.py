@@ -0,0 +1,261 @@
+import os
+import sys
+import select
+import termios
+import threading
+import time
+import tty
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from core.renderer import Renderer
+from utils.constants import KEY_ESCAPE, KEY_RETURN, KEY_UP, KEY_DOWN, KEY_RIGHT, KEY_LEFT
+
+Color = Tuple[int, int, int]
+
+class CellConsole:
+    """
+    Console minimale en mémoire : un caractère et une couleur par case
+    """
+    DEFAULT_FG: Color = (255, 255, 255)
+    FRAME_CHARS = "┌─┐│└┘"
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.chars: List[str] = [' '] * (width * height)
+        self.fgs: List[Color] = [self.DEFAULT_FG] * (width * height)
+
+    def clear(self):
+        """Efface la console"""
+        self.chars[:] = [' '] * (self.width * self.height)
+        self.fgs[:] = [self.DEFAULT_FG] * (self.width * self.height)
+
+    def print(self, x: int, y: int, string: str, fg: Optional[Color] = None):
+        """Écrit une chaîne à partir de (x, y), tronquée aux bords"""
+        if not 0 <= y < self.height:
+            return
+        fg = fg or self.DEFAULT_FG
+        row = y * self.width
+        for i, char in enumerate(string):
+            if 0 <= x + i < self.width:
+                self.chars[row + x + i] = char
+                self.fgs[row + x + i] = fg
+
+    def draw_frame(self, x: int, y: int, width: int, height: int,
+                   title: str = "", fg: Optional[Color] = None):
+        """Dessine un cadre et efface son intérieur, comme tcod"""
+        tl, h, tr, v, bl, br = self.FRAME_CHARS
+        self.print(x, y, tl + h * (width - 2) + tr, fg)
+        for row in range(y + 1, y + height - 1):
+            self.print(x, row, v + ' ' * (width - 2) + v, fg)
+        self.print(x, y + height - 1, bl + h * (width - 2) + br, fg)
+        if title:
+            title = f" {title} "
+            self.print(x + (width - len(title)) // 2, y, title, fg)
+
+class AnsiUI(Renderer):
+    """
+    Interface utilisateur pour un simple terminal (séquences ANSI).
+
+    La trame précédente est conservée : seules les cases dont le caractère
+    ou la couleur a changé sont réémises, et chaque trame part en une seule
+    écriture. Sur un terminal, l'entrée est lue par un fil dédié dès que
+    des octets arrivent : l'instant de lecture d'un événement ne dépend pas
+    de la cadence des trames.
+    """
+    # Séquences d'échappement des flèches (modes normal et application)
+    ARROW_KEYS = {
+        '\x1b[A': KEY_UP, '\x1b[B': KEY_DOWN, '\x1b[C': KEY_RIGHT, '\x1b[D': KEY_LEFT,
+        '\x1bOA': KEY_UP, '\x1bOB': KEY_DOWN, '\x1bOC': KEY_RIGHT, '\x1bOD': KEY_LEFT,
+    }
+    QUIT_CHARS = ('\x03', '\x04')  # Ctrl-C, Ctrl-D
+    READ_INTERVAL = 0.05  # Attente maximale du fil de lecture avant de vérifier l'arrêt
+
+    def __init__(self, screen_width: int = 80, screen_height: int = 40,
+                 map_width: int = 50, map_height: int = 30,
+                 input_fd: Optional[int] = None, output_fd: Optional[int] = None):
+        super().__init__(screen_width, screen_height, map_width, map_height)
+        self.input_fd = input_fd if input_fd is not None else sys.stdin.fileno()
+        self.output_fd = output_fd if output_fd is not None else sys.stdout.fileno()
+
+        # Trame déjà affichée (None : case inconnue, toujours réémise)
+        self.previous_chars: List[Optional[str]] = []
+        self.previous_fgs: List[Optional[Color]] = []
+
+        self.pending_events = deque()
+        self.input_ready = threading.Event()
+        self._stop = threading.Event()
+        self._reader: Optional[threading.Thread] = None
+        self.saved_terminal = None
+        self.saved_stdout = None
+        self.bytes_written = 0
+
+    def initialize(self):
+        """Passe le terminal en mode brut et prépare la console"""
+        self.console = CellConsole(self.screen_width, self.screen_height)
+        self.previous_chars = [None] * (self.screen_width * self.screen_height)
+        self.previous_fgs = [None] * (self.screen_width * self.screen_height)
+
+        if os.isatty(self.input_fd):
+            self.saved_terminal = termios.tcgetattr(self.input_fd)
+            tty.setraw(self.input_fd)
+            self._stop.clear()
+            self._reader = threading.Thread(target=self._read_loop, name='ansi-input', daemon=True)
+            self._reader.start()
+
+        # Les print() du jeu corrompraient l'affichage
+        self.saved_stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+
+        # Écran alternatif, curseur masqué, écran effacé
+        self._write('\x1b[?1049h\x1b[?25l\x1b[2J')
+
+    def close(self):
+        """Restaure le terminal"""
+        self._write('\x1b[0m\x1b[?25h\x1b[?1049l')
+        if self._reader is not None:
+            self._stop.set()
+            self._reader.join()
+            self._reader = None
+        if self.saved_terminal is not None:
+            termios.tcsetattr(self.input_fd, termios.TCSADRAIN, self.saved_terminal)
+            self.saved_terminal = None
+        if self.saved_stdout is not None:
+            sys.stdout.close()
+            sys.stdout = self.saved_stdout
+            self.saved_stdout = None
+
+    def present(self):
+        """Émet uniquement les cases modifiées depuis la trame précédente"""
+        self._write(self.diff_frame())
+
+    def diff_frame(self) -> str:
+        """Construit les séquences ANSI qui transforment la trame précédente en la courante"""
+        chars, fgs = self.console.chars, self.console.fgs
+        previous_chars, previous_fgs = self.previous_chars, self.previous_fgs
+        width = self.screen_width
+        output = []
+        current_fg = None
+
+        for y in range(self.screen_height):
+            start = y * width
+            end = start + width
+            # Comparaison rapide de la ligne entière
+            if chars[start:end] == previous_chars[start:end] and fgs[start:end] == previous_fgs[start:end]:
+                continue
+
+            x = start
+            while x < end:
+                if chars[x] == previous_chars[x] and fgs[x] == previous_fgs[x]:
+                    x += 1
+                    continue
+
+                # Début d'une suite de cases modifiées : déplacer le curseur
+                output.append(f'\x1b[{y + 1};{x - start + 1}H')
+                while x < end and (chars[x] != previous_chars[x] or fgs[x] != previous_fgs[x]):
+                    if fgs[x] != current_fg:
+                        current_fg = fgs[x]
+                        output.append('\x1b[38;2;%d;%d;%dm' % current_fg)
+                    output.append(chars[x])
+                    x += 1
+
+        self.previous_chars = list(chars)
+        self.previous_fgs = list(fgs)
+        return ''.join(output)
+
+    def _write(self, text: str):
+        """Écrit le texte en un seul appel système (sauf écriture partielle)"""
+        if not text:
+            return
+        data = memoryview(text.encode('utf-8'))
+        self.bytes_written += len(data)
+        while data:
+            written = os.write(self.output_fd, data)
+            data = data[written:]
+
+    def wait_for_keypress(self) -> Dict:
+        """Attend une touche et retourne l'événement"""
+        while not self.pending_events:
+            if self._reader is None:
+                self._read_input(timeout=None)
+            else:
+                self.input_ready.wait()
+                self.input_ready.clear()
+        return self.pending_events.popleft()
+
+    def check_for_event(self) -> Dict:
+        """Vérifie si un événement est disponible"""
+        if not self.pending_events and self._reader is None:
+            self._read_input(timeout=0)
+        if self.pending_events:
+            return self.pending_events.popleft()
+        return {}
+
+    def poll_events(self) -> List[Dict]:
+        """Retourne tous les événements disponibles, dans l'ordre (vide la file)"""
+        if self._reader is None:
+            self._read_input(timeout=0)
+        # popleft un par un : le fil de lecture peut ajouter pendant ce temps
+        events = []
+        while self.pending_events:
+            events.append(self.pending_events.popleft())
+        return events
+
+    def _read_loop(self):
+        """Fil de lecture : convertit l'entrée dès son arrivée, jusqu'à l'arrêt ou la fin de l'entrée"""
+        while not self._stop.is_set():
+            if not self._read_input(timeout=self.READ_INTERVAL):
+                break
+
+    def _read_input(self, timeout: Optional[float]) -> bool:
+        """
+        Lit les octets disponibles sur l'entrée et les convertit en événements.
+        Retourne False à la fin de l'entrée.
+        """
+        ready, _, _ = select.select([self.input_fd], [], [], timeout)
+        if not ready:
+            return True
+        data = os.read(self.input_fd, 1024).decode('utf-8', errors='ignore')
+        now = time.perf_counter()
+        events = self._parse_input(data) if data else [{'type': 'QUIT'}]
+        for event in events:
+            # Instant de lecture : avec le fil de lecture, celui de l'arrivée
+            # des octets, temps d'attente dans la file du jeu compris
+            event['time'] = now
+        self.pending_events.extend(events)
+        self.input_ready.set()
+        return bool(data)
+
+    def _parse_input(self, data: str) -> List[Dict]:
+        """Découpe les octets lus en événements au format de TcodUI"""
+        events = []
+        i = 0
+        while i < len(data):
+            sequence = data[i:i + 3]
+            if sequence in self.ARROW_KEYS:
+                events.append(self._key_event(self.ARROW_KEYS[sequence]))
+                i += 3
+                continue
+
+            char = data[i]
+            i += 1
+            if char in self.QUIT_CHARS:
+                events.append({'type': 'QUIT'})
+            elif char == '\x1b':
+                events.append(self._key_event(KEY_ESCAPE))
+            elif char in '\r\n':
+                events.append(self._key_event(KEY_RETURN))
+            elif char.isprintable():
+                # Les codes SDL des touches imprimables sont leurs minuscules
+                events.append(self._key_event(ord(char.lower()), shift=char.isupper()))
+        return events
+
+    def _key_event(self, key: int, shift: bool = False) -> Dict:
+        """Crée un événement KEYDOWN"""
+        return {
+            'type': 'KEYDOWN',
+            'key': key,
+            'alt': False,
+            'ctrl': False,
+            'shift': shift
+        }
@@ -0,0 +1,547 @@
+import random
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from core import kernels
+from core.crowd import separate
+from core.fixed_array import to_cells, div_round_array, isqrt_array
+from core.simulation import (Simulation, EX, EY, EHP, ESTATS, ENEMY_FIELDS,
+                             PX, PY, PVX, PVY, PDAMAGE, PSPLASH, PEFFECT, PROJECTILE_FIELDS, PROJECTILE_SPEED_FIXED,
+                             TX, TY, THP, TRANGE, TDAMAGE, TWEAPON, TEFFECT, TSPLASH, TCHAIN_COUNT, TCHAIN_RANGE,
+                             TOWER_FIELDS, RFIRE_RATE, RRELOAD_TIME, RRELOAD_ELAPSED, RRELOAD_PROGRESS,
+                             RELOAD_FIELDS, TOWER_EFFECTS, new_tower, spawn_position, update_effects, afflict,
+                             enemy_speeds)
+from core.weapons import EnemyIndex, area_damage
+from models.position import to_fixed, to_microseconds
+from utils.constants import UPGRADE_COSTS, WEAPONS, FIXED_ONE, TOWER_COST, TOWER_REFUND
+from utils.archetypes import ARCHETYPES
+
+# Colonne supplémentaire des entités : numéro de la partie
+EGAME = ENEMY_FIELDS
+PGAME = PROJECTILE_FIELDS
+TGAME = TOWER_FIELDS
+
+# Valeurs scalaires d'une Simulation, stockées en un tableau par champ (une case par partie)
+GAME_FIELDS: Dict[str, Any] = {
+    'tick': np.int64,
+    'score': np.int64,
+    'tower_hp': np.int64,
+    'max_tower_hp': np.int64,
+    'game_over': np.bool_,
+    'tower_x': np.int64,
+    'tower_y': np.int64,
+    'tower_range': np.int64,
+    'tower_damage': np.int64,
+    'tower_fire_rate': np.float64,
+    'tower_reload_time': np.float64,
+    'tower_reload_elapsed': np.float64,
+    'tower_reload_progress': np.float64,
+    'tower_weapon': np.int64,  # Indice dans WEAPONS
+    'tower_splash_radius': np.int64,
+    'tower_chain_count': np.int64,
+    'tower_chain_range': np.int64,
+    'tower_effect': np.int64,  # Indice dans TOWER_EFFECTS
+    'build_mode': np.bool_,
+    'cursor_x': np.int64,
+    'cursor_y': np.int64,
+    'effect_time': np.int64,
+    'current_wave': np.int64,
+    'enemies_per_wave': np.int64,
+    'spawn_timer': np.int64,
+    'spawn_interval': np.int64,
+    'spawned_count': np.int64,
+}
+
+# Champs stockés comme indices dans une liste de valeurs
+CODED_FIELDS = {'tower_weapon': WEAPONS, 'tower_effect': TOWER_EFFECTS}
+
+class BatchSimulation:
+    """
+    Plusieurs parties indépendantes de même taille, avancées ensemble.
+
+    Chaque valeur scalaire d'une Simulation devient un tableau (une case
+    par partie) ; les ennemis, projectiles et tours construites de toutes
+    les parties sont dans des tableaux communs, avec une colonne de plus
+    pour le numéro de partie. Un tick coûte ainsi les mêmes appels NumPy pour 1 ou 1000
+    parties. Les règles et les résultats sont ceux de Simulation, partie
+    par partie (mêmes calculs entiers, même ordre des entités d'une partie).
+    """
+    def __init__(self, count: int, world_width: int = 100, world_height: int = 100,
+                 seeds: Optional[Sequence[Optional[int]]] = None):
+        self._allocate(count, world_width, world_height)
+        self.reset(np.arange(count), seeds if seeds is not None else [None] * count)
+
+    @classmethod
+    def from_simulations(cls, sims: Sequence[Simulation]) -> 'BatchSimulation':
+        """Regroupe des simulations (de même taille) ; leur état est copié"""
+        batch = cls.__new__(cls)
+        batch._allocate(len(sims), sims[0].world_width, sims[0].world_height)
+        for game, sim in enumerate(sims):
+            batch.load(game, sim)
+        return batch
+
+    def _allocate(self, count: int, world_width: int, world_height: int) -> None:
+        """Crée les tableaux de parties et d'entités (vides)"""
+        self.count = count
+        self.world_width = world_width
+        self.world_height = world_height
+        for name, dtype in GAME_FIELDS.items():
+            setattr(self, name, np.zeros(count, dtype=dtype))
+        self.rngs: List[random.Random] = [random.Random() for _ in range(count)]
+        self.enemies = np.zeros((0, ENEMY_FIELDS + 1), dtype=np.int64)
+        self.projectiles = np.zeros((0, PROJECTILE_FIELDS + 1), dtype=np.int64)
+        self.towers = np.zeros((0, TOWER_FIELDS + 1), dtype=np.int64)
+        self.tower_reloads = np.zeros((0, RELOAD_FIELDS), dtype=np.float64)  # Lignes alignées sur towers
+
+    def _set_fields(self, games, sim: Simulation) -> None:
+        """Copie les valeurs scalaires d'une simulation dans les parties choisies"""
+        for name in GAME_FIELDS:
+            value = getattr(sim, name)
+            getattr(self, name)[games] = CODED_FIELDS[name].index(value) if name in CODED_FIELDS else value
+
+    def _drop(self, games) -> None:
+        """Retire les entités des parties choisies"""
+        dropped = np.zeros(self.count, dtype=bool)
+        dropped[games] = True
+        self.enemies = self.enemies[~dropped[self.enemies[:, EGAME]]]
+        self.projectiles = self.projectiles[~dropped[self.projectiles[:, PGAME]]]
+        kept = ~dropped[self.towers[:, TGAME]]
+        self.towers, self.tower_reloads = self.towers[kept], self.tower_reloads[kept]
+
+    def reset(self, games: np.ndarray, seeds: Sequence[Optional[int]]) -> None:
+        """Recommence des parties depuis l'état initial d'une Simulation, une graine par partie"""
+        games = np.asarray(games, dtype=np.int64)
+        self._set_fields(games, Simulation(self.world_width, self.world_height))
+        for game, seed in zip(games.tolist(), seeds):
+            self.rngs[game] = random.Random(seed)
+        self._drop(games)
+
+    def load(self, game: int, sim: Simulation) -> None:
+        """Remplace une partie par une copie de l'état d'une simulation"""
+        self._set_fields(game, sim)
+        rng = random.Random()
+        rng.setstate(sim.rng.getstate())
+        self.rngs[game] = rng
+
+        self._drop(game)
+        self.enemies = np.concatenate((self.enemies, np.column_stack((sim.enemies, np.full(len(sim.enemies), game)))))
+        self.projectiles = np.concatenate((self.projectiles, np.column_stack(
+            (sim.projectiles, np.full(len(sim.projectiles), game)))))
+        self.towers = np.concatenate((self.towers, np.column_stack((sim.towers, np.full(len(sim.towers), game)))))
+        self.tower_reloads = np.concatenate((self.tower_reloads, sim.tower_reloads))
+
+    def to_simulation(self, game: int) -> Simulation:
+        """Copie une partie dans une Simulation ordinaire"""
+        sim = Simulation.__new__(Simulation)
+        sim.world_width = self.world_width
+        sim.world_height = self.world_height
+        for name in GAME_FIELDS:
+            value = getattr(self, name)[game].item()
+            setattr(sim, name, CODED_FIELDS[name][value] if name in CODED_FIELDS else value)
+        sim.rng = random.Random()
+        sim.rng.setstate(self.rngs[game].getstate())
+        sim.rng_shared = False
+        sim.enemies = self.enemies[self.enemies[:, EGAME] == game, :ENEMY_FIELDS].copy()
+        sim.projectiles = self.projectiles[self.projectiles[:, PGAME] == game, :PROJECTILE_FIELDS].copy()
+        built = self.towers[:, TGAME] == game
+        sim.towers = self.towers[built, :TOWER_FIELDS].copy()
+        sim.tower_reloads = self.tower_reloads[built].copy()
+        return sim
+
+    # --- Actions du joueur ---
+
+    def apply_actions(self, actions: Sequence[Dict[str, Any]], choices: np.ndarray) -> None:
+        """
+        Applique à chaque partie l'action ``actions[choices[partie]]``
+        (format de TcodInputHandler, voir Simulation.apply_action)
+        """
+        for choice in np.unique(choices).tolist():
+            action = actions[choice]
+            games = choices == choice
+            if action.get('toggle_build'):
+                self.build_mode[games] ^= True
+                self.cursor_x[games], self.cursor_y[games] = self.tower_x[games], self.tower_y[games]
+            if action.get('move'):
+                self.move(games, *action['move'])
+            if action.get('place_tower'):
+                self.place_tower(games)
+            if action.get('sell_tower'):
+                self.sell_tower(games)
+            if action.get('upgrade'):
+                self.upgrade(games, action['upgrade'], action.get('cost'))
+            if action.get('cycle_weapon'):
+                self._cycle(games, 'tower_weapon', TWEAPON, len(WEAPONS))
+            if action.get('cycle_effect'):
+                self._cycle(games, 'tower_effect', TEFFECT, len(TOWER_EFFECTS))
+            if action.get('next_wave'):
+                self.next_wave(games)
+
+    def _built_at(self, games: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Ligne de towers de la tour construite sur la case (x, y) de chaque partie, -1 si aucune"""
+        cells = self.world_width * self.world_height
+        keys = self.towers[:, TGAME] * cells + self.towers[:, TY] * self.world_width + self.towers[:, TX]
+        wanted = games * cells + y * self.world_width + x
+        if len(keys) == 0:
+            return np.full(len(wanted), -1, dtype=np.int64)
+        # Une tour au plus par case et par partie : les clés sont uniques
+        order = np.argsort(keys)
+        found = order[np.minimum(np.searchsorted(keys[order], wanted), len(order) - 1)]
+        return np.where(keys[found] == wanted, found, -1)
+
+    def _selected(self, games: np.ndarray) -> np.ndarray:
+        """Tour visée par les améliorations de chaque partie : construite sous le curseur, sinon -1 (principale)"""
+        games = np.flatnonzero(games)
+        built = self._built_at(games, self.cursor_x[games], self.cursor_y[games])
+        return np.where(self.build_mode[games], built, -1)
+
+    def move(self, games: np.ndarray, dx: int, dy: int) -> None:
+        """Déplace le curseur (mode construction) ou la tour des parties choisies, dans les limites de la carte"""
+        cursor = games & self.build_mode
+        self.cursor_x[cursor] = np.clip(self.cursor_x[cursor] + dx, 0, self.world_width - 1)
+        self.cursor_y[cursor] = np.clip(self.cursor_y[cursor] + dy, 0, self.world_height - 1)
+
+        # La tour principale ne va pas sur la case d'une tour construite
+        tower = np.flatnonzero(games & ~self.build_mode)
+        x = np.clip(self.tower_x[tower] + dx, 0, self.world_width - 1)
+        y = np.clip(self.tower_y[tower] + dy, 0, self.world_height - 1)
+        free = self._built_at(tower, x, y) < 0
+        self.tower_x[tower[free]], self.tower_y[tower[free]] = x[free], y[free]
+
+    def place_tower(self, games: np.ndarray) -> None:
+        """Construit une tour sur la case du curseur des parties choisies (voir Simulation.place_tower)"""
+        games = np.flatnonzero(games)
+        x, y = self.cursor_x[games], self.cursor_y[games]
+        free = ((x != self.tower_x[games]) | (y != self.tower_y[games])) & (self._built_at(games, x, y) < 0) \
+            & (self.score[games] >= TOWER_COST)
+        games = games[free]
+        if len(games) == 0:
+            return
+        self.score[games] -= TOWER_COST
+
+        row, reload = new_tower(0, 0)
+        rows = np.repeat(np.array([row + [0]], dtype=np.int64), len(games), axis=0)
+        rows[:, TX], rows[:, TY], rows[:, TGAME] = self.cursor_x[games], self.cursor_y[games], games
+        self.towers = np.concatenate((self.towers, rows))
+        self.tower_reloads = np.concatenate((self.tower_reloads,
+                                             np.repeat(np.array([reload]), len(games), axis=0)))
+
+    def sell_tower(self, games: np.ndarray) -> None:
+        """Vend la tour construite sous le curseur des parties choisies"""
+        games = np.flatnonzero(games)
+        built = self._built_at(games, self.cursor_x[games], self.cursor_y[games])
+        sold = built >= 0
+        if not sold.any():
+            return
+        self.score[games[sold]] += TOWER_REFUND
+        self.towers = np.delete(self.towers, built[sold], axis=0)
+        self.tower_reloads = np.delete(self.tower_reloads, built[sold], axis=0)
+
+    def _cycle(self, games: np.ndarray, field: str, column: int, choices: int) -> None:
+        """Passe à l'arme ou à l'effet suivant de la tour sélectionnée des parties choisies"""
+        selected = self._selected(games)
+        main = np.flatnonzero(games)[selected < 0]
+        values = getattr(self, field)
+        values[main] = (values[main] + 1) % choices
+        built = selected[selected >= 0]
+        self.towers[built, column] = (self.towers[built, column] + 1) % choices
+
+    def upgrade(self, games: np.ndarray, upgrade_type: str, cost: Optional[int] = None) -> None:
+        """Achète une amélioration de la tour sélectionnée dans les parties choisies"""
+        self.score[games] -= UPGRADE_COSTS[upgrade_type] if cost is None else cost
+
+        if upgrade_type == 'hp':
+            self.max_tower_hp[games] += 5
+            self.tower_hp[games] += 5
+            return
+
+        selected = self._selected(games)
+        main, built = np.flatnonzero(games)[selected < 0], selected[selected >= 0]
+        if upgrade_type == 'damage':
+            self.tower_damage[main] += 1
+            self.towers[built, TDAMAGE] += 1
+        elif upgrade_type == 'range':
+            self.tower_range[main] += 1
+            self.towers[built, TRANGE] += 1
+        elif upgrade_type == 'fire_rate':
+            self.tower_fire_rate[main] += 0.2
+            self.tower_reload_time[main] = 1.0 / self.tower_fire_rate[main]
+            self.tower_reloads[built, RFIRE_RATE] += 0.2
+            self.tower_reloads[built, RRELOAD_TIME] = 1.0 / self.tower_reloads[built, RFIRE_RATE]
+
+    def next_wave(self, games: np.ndarray) -> None:
+        """Passe à la vague suivante dans les parties choisies"""
+        self.current_wave[games] += 1
+        self.spawn_timer[games] = self.spawn_interval[games]
+
+    # --- Boucle de simulation ---
+
+    def step(self, delta_time: float = 0.1) -> None:
+        """Avance d'un tick toutes les parties en cours (les parties finies ne bougent plus)"""
+        active = ~self.game_over
+        self.tick[active] += 1
+        self._spawn(active)
+        self._update_effects(delta_time, active)
+        self._move_enemies(delta_time, active)
+        self._separate_enemies(delta_time, active)
+        self._remove_enemies(active)
+        self._move_projectiles(delta_time, active)
+        damage = np.zeros(len(self.enemies), dtype=np.int64)
+        afflictions: List[Tuple[np.ndarray, np.ndarray]] = []
+        index = self._collide_projectiles(damage, active, afflictions)
+        self._update_towers(delta_time, damage, index, active, afflictions)
+        self.enemies[:, EHP] -= damage
+        afflict(self.enemies, afflictions, self.effect_time[self.enemies[:, EGAME]])
+
+        enemy_counts = np.bincount(self.enemies[:, EGAME], minlength=self.count)
+        self.next_wave(active & (enemy_counts == 0) & (self.spawned_count == 0))
+        self.game_over |= active & (self.tower_hp <= 0)
+
+    def _spawn(self, active: np.ndarray) -> None:
+        """Génère les ennemis des parties dont le minuteur arrive à échéance (voir Simulation._spawn)"""
+        self.spawn_timer[active] += 1
+        due = np.flatnonzero(active & (self.spawn_timer >= self.spawn_interval))
+        if len(due) == 0:
+            return
+        self.spawn_timer[due] = 0
+
+        # Tirages dans l'ordre de chaque partie, lignes construites ensuite d'un bloc
+        draws = []
+        for game in due.tolist():
+            wave = int(self.current_wave[game])
+            count = int(int(self.enemies_per_wave[game]) * wave * 0.6) + 1
+            rng = self.rngs[game]
+            for i in range(count):
+                x, y = spawn_position(rng, self.world_width, self.world_height)
+                draws.append((x, y, ARCHETYPES.row(ARCHETYPES.choose(rng, wave, i), wave), game))
+            self.spawned_count[game] += count
+
+        draws = np.array(draws, dtype=np.int64)
+        rows = np.zeros((len(draws), ENEMY_FIELDS + 1), dtype=np.int64)
+        rows[:, EX] = to_fixed(draws[:, 0])
+        rows[:, EY] = to_fixed(draws[:, 1])
+        rows[:, EHP] = ARCHETYPES.hp_array[draws[:, 2]]
+        rows[:, ESTATS] = draws[:, 2]
+        rows[:, EGAME] = draws[:, 3]
+        self.enemies = np.concatenate((self.enemies, rows))
+
+    def _rows(self, games: np.ndarray, active: np.ndarray):
+        """Lignes des entités des parties en cours (toutes, sans copie, si aucune n'est finie)"""
+        return slice(None) if active.all() else np.flatnonzero(active[games])
+
+    def _update_effects(self, delta_time: float, active: np.ndarray) -> None:
+        """Avance le temps des effets de statut des parties en cours (voir simulation.update_effects)"""
+        elapsed = to_microseconds(delta_time)
+        self.effect_time[active] += elapsed
+        if len(self.enemies) == 0:
+            return
+        rows = self._rows(self.enemies[:, EGAME], active)
+        enemies = self.enemies[rows]
+        update_effects(enemies, self.effect_time[enemies[:, EGAME]], elapsed)
+        self.enemies[rows] = enemies
+
+    def _move_enemies(self, delta_time: float, active: np.ndarray) -> None:
+        """Déplace les ennemis vers la tour de leur partie (voir simulation.move_enemies)"""
+        if len(self.enemies) == 0:
+            return
+        rows = self._rows(self.enemies[:, EGAME], active)
+        enemies = self.enemies[rows]
+        games = enemies[:, EGAME]
+
+        # Coordonnées relatives à la tour : la cible de tous les ennemis est l'origine
+        target_x, target_y = self.tower_x[games] * FIXED_ONE, self.tower_y[games] * FIXED_ONE
+        x, y = enemies[:, EX] - target_x, enemies[:, EY] - target_y
+        kernels.move_enemies(x, y, enemy_speeds(enemies), 0, 0, to_microseconds(delta_time))
+        self.enemies[rows, EX] = x + target_x
+        self.enemies[rows, EY] = y + target_y
+
+    def _separate_enemies(self, delta_time: float, active: np.ndarray) -> None:
+        """Écarte les ennemis empilés, partie par partie (voir core.crowd)"""
+        if len(self.enemies) < 2:
+            return
+        rows = self._rows(self.enemies[:, EGAME], active)
+        enemies = self.enemies[rows]
+        self.enemies[rows, EX], self.enemies[rows, EY] = separate(
+            enemies[:, EX], enemies[:, EY], self.world_width, self.world_height, delta_time,
+            groups=enemies[:, EGAME])
+
+    def _remove_enemies(self, active: np.ndarray) -> None:
+        """Retire les ennemis qui ont atteint leur tour ou sont morts"""
+        enemies = self.enemies
+        if len(enemies) == 0:
+            return
+
+        games = enemies[:, EGAME]
+        playing = active[games]
+        reached = playing & (to_cells(enemies[:, EX]) == self.tower_x[games]) \
+            & (to_cells(enemies[:, EY]) == self.tower_y[games])
+        dead = playing & ~reached & (enemies[:, EHP] <= 0)
+
+        self.tower_hp -= np.bincount(games[reached], minlength=self.count)
+        np.add.at(self.score, games[dead], ARCHETYPES.value_array[enemies[dead, ESTATS]])
+
+        removed = reached | dead
+        if removed.any():
+            self.spawned_count -= np.bincount(games[removed], minlength=self.count)
+            self.enemies = enemies[~removed]
+
+    def _move_projectiles(self, delta_time: float, active: np.ndarray) -> None:
+        """Déplace les projectiles des parties en cours"""
+        if len(self.projectiles) == 0:
+            return
+        rows = self._rows(self.projectiles[:, PGAME], active)
+        projectiles = self.projectiles[rows]
+        kernels.move_projectiles(projectiles[:, PX], projectiles[:, PY], projectiles[:, PVX],
+                                 projectiles[:, PVY], to_microseconds(delta_time))
+        self.projectiles[rows] = projectiles
+
+    def _enemy_index(self) -> EnemyIndex:
+        """Index spatial des ennemis de toutes les parties (un groupe par partie)"""
+        return EnemyIndex(self.enemies[:, EX], self.enemies[:, EY], self.world_width, self.world_height,
+                          groups=self.enemies[:, EGAME])
+
+    def _collide_projectiles(self, damage: np.ndarray, active: np.ndarray,
+                             afflictions: List[Tuple[np.ndarray, np.ndarray]]) -> Optional[EnemyIndex]:
+        """Applique les collisions (voir Simulation._collide_projectiles) ; retourne l'index s'il a été construit"""
+        projectiles = self.projectiles
+        if len(projectiles) == 0:
+            return None
+
+        playing = active[projectiles[:, PGAME]]
+        x, y = to_cells(projectiles[:, PX]), to_cells(projectiles[:, PY])
+        inside = (x >= 0) & (x < self.world_width) & (y >= 0) & (y < self.world_height)
+        hit = np.zeros(len(projectiles), dtype=bool)
+        index = None
+
+        if len(self.enemies):
+            index = self._enemy_index()
+            candidates = np.flatnonzero(playing & inside)
+            targets = index.first_at(x[candidates], y[candidates], projectiles[candidates, PGAME])
+            found = targets >= 0
+            hits, targets = candidates[found], targets[found]
+
+            np.add.at(damage, targets, projectiles[hits, PDAMAGE])
+            afflictions.append((targets, projectiles[hits, PEFFECT]))
+            hit[hits] = True
+
+            splash = projectiles[hits, PSPLASH] > 0
+            if splash.any():
+                shells = projectiles[hits[splash]]
+                impacts, splashed = area_damage(index, shells[:, PX], shells[:, PY], targets[splash],
+                                                shells[:, PSPLASH], shells[:, PDAMAGE], damage,
+                                                groups=shells[:, PGAME])
+                afflictions.append((splashed, shells[impacts, PEFFECT]))
+
+        self.projectiles = projectiles[~playing | (inside & ~hit)]
+        return index
+
+    def _tower_table(self, active: np.ndarray):
+        """
+        Tours des parties en cours : principales puis construites (colonnes
+        de towers, rechargements alignés), et nombre de tours principales
+        """
+        main = np.flatnonzero(active)
+        table = np.empty((len(main), TOWER_FIELDS + 1), dtype=np.int64)
+        table[:, TX], table[:, TY], table[:, THP] = self.tower_x[main], self.tower_y[main], self.tower_hp[main]
+        table[:, TRANGE], table[:, TDAMAGE] = self.tower_range[main], self.tower_damage[main]
+        table[:, TWEAPON], table[:, TEFFECT] = self.tower_weapon[main], self.tower_effect[main]
+        table[:, TSPLASH], table[:, TCHAIN_COUNT] = self.tower_splash_radius[main], self.tower_chain_count[main]
+        table[:, TCHAIN_RANGE], table[:, TGAME] = self.tower_chain_range[main], main
+        reloads = np.column_stack((self.tower_fire_rate[main], self.tower_reload_time[main],
+                                   self.tower_reload_elapsed[main], self.tower_reload_progress[main]))
+
+        built = active[self.towers[:, TGAME]]
+        return (np.concatenate((table, self.towers[built])),
+                np.concatenate((reloads, self.tower_reloads[built])), main, built)
+
+    def _update_towers(self, delta_time: float, damage: np.ndarray, index: Optional[EnemyIndex],
+                       active: np.ndarray, afflictions: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        """Fait tirer chaque tour prête sur l'ennemi le plus proche de sa partie ; les autres rechargent"""
+        towers, reloads, main, built = self._tower_table(active)
+        ready = reloads[:, RRELOAD_PROGRESS] >= 1.0
+        waiting = ~ready
+        reloads[waiting, RRELOAD_ELAPSED] += delta_time
+        reloads[waiting, RRELOAD_PROGRESS] = np.minimum(1.0, reloads[waiting, RRELOAD_ELAPSED] /
+                                                        reloads[waiting, RRELOAD_TIME])
+
+        if len(self.enemies) and ready.any():
+            shooters, targets = self._find_targets(towers, np.flatnonzero(ready))
+            reloads[shooters, RRELOAD_ELAPSED] = 0.0
+            reloads[shooters, RRELOAD_PROGRESS] = 0.0
+            self._shoot(towers, shooters, targets, damage, index, afflictions)
+
+        count = len(main)
+        self.tower_reload_elapsed[main] = reloads[:count, RRELOAD_ELAPSED]
+        self.tower_reload_progress[main] = reloads[:count, RRELOAD_PROGRESS]
+        self.tower_reloads[built] = reloads[count:]
+
+    def _find_targets(self, towers: np.ndarray, ready: np.ndarray):
+        """Ennemi le plus proche à portée de chaque tour prête de la table ; à distance égale, le premier de sa partie"""
+        # Paires (tour, ennemi de la même partie) : ennemis regroupés par partie, dans l'ordre du tableau
+        games = self.enemies[:, EGAME]
+        order = np.argsort(games, kind='stable')
+        counts = np.bincount(games, minlength=self.count)
+        starts = np.cumsum(counts) - counts
+        owners = towers[ready, TGAME]
+        pairs = counts[owners]
+        total = int(pairs.sum())
+        if total == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        tower = np.repeat(ready, pairs)
+        rank = np.arange(total) - np.repeat(np.cumsum(pairs) - pairs, pairs)
+        enemy = order[np.repeat(starts[owners], pairs) + rank]
+
+        # Portée entière : distance <= portée équivaut à dx² + dy² <= portée²
+        dx = to_cells(self.enemies[enemy, EX]) - towers[tower, TX]
+        dy = to_cells(self.enemies[enemy, EY]) - towers[tower, TY]
+        squared = dx * dx + dy * dy
+        found = squared <= towers[tower, TRANGE] ** 2
+        tower, enemy, squared = tower[found], enemy[found], squared[found]
+
+        chosen = np.lexsort((enemy, squared, tower))
+        first = np.ones(len(chosen), dtype=bool)
+        first[1:] = tower[chosen[1:]] != tower[chosen[:-1]]
+        return tower[chosen[first]], enemy[chosen[first]]
+
+    def _shoot(self, towers: np.ndarray, shooters: np.ndarray, targets: np.ndarray, damage: np.ndarray,
+               index: Optional[EnemyIndex], afflictions: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        """Tirs des tours ``shooters`` de la table sur leurs cibles (voir Simulation._shoot)"""
+        # Éclair en chaîne : la cible et ses plus proches voisins, sans projectile
+        chain = towers[shooters, TWEAPON] == WEAPONS.index('chain')
+        if chain.any():
+            if index is None:
+                index = self._enemy_index()
+            primary, chained = targets[chain], towers[shooters[chain]]
+            np.add.at(damage, primary, chained[:, TDAMAGE])
+            impacts, hits = area_damage(index, self.enemies[primary, EX], self.enemies[primary, EY], primary,
+                                        chained[:, TCHAIN_RANGE], chained[:, TDAMAGE], damage,
+                                        limit=chained[:, TCHAIN_COUNT], groups=chained[:, TGAME])
+            afflictions.append((primary, chained[:, TEFFECT]))
+            afflictions.append((hits, chained[impacts, TEFFECT]))
+
+        # Projectiles : même calcul entier que Projectile.__init__
+        targets, fired = targets[~chain], towers[shooters[~chain]]
+        if len(targets) == 0:
+            return
+        dx = (to_cells(self.enemies[targets, EX]) - fired[:, TX]) * FIXED_ONE
+        dy = (to_cells(self.enemies[targets, EY]) - fired[:, TY]) * FIXED_ONE
+        length = isqrt_array(dx * dx + dy * dy)
+        moving = length > 0
+        safe_length = np.where(moving, length, 1)
+        vx = np.where(moving, div_round_array(dx * PROJECTILE_SPEED_FIXED, safe_length), 0)
+        vy = np.where(moving, div_round_array(dy * PROJECTILE_SPEED_FIXED, safe_length), 0)
+
+        splash = np.where(fired[:, TWEAPON] == WEAPONS.index('splash'), fired[:, TSPLASH], 0)
+        projectiles = np.column_stack((fired[:, TX] * FIXED_ONE, fired[:, TY] * FIXED_ONE,
+                                       vx, vy, fired[:, TDAMAGE], splash, fired[:, TEFFECT], fired[:, TGAME]))
+        self.projectiles = np.concatenate((self.projectiles, projectiles))
+
+    def summary(self) -> Dict[str, np.ndarray]:
+        """Résumé de l'état de chaque partie, dans le format de game_state"""
+        return {
+            'game_over': self.game_over,
+            'score': self.score,
+            'wave': self.current_wave,
+            'tower_hp': self.tower_hp,
+            'max_tower_hp': self.max_tower_hp,
+        }
@@ -0,0 +1,118 @@
+import sys
+import time
+from typing import Callable, Dict, List
+import numpy as np
+
+from core import kernels
+from core.simulation import Simulation
+from utils.constants import FIXED_ONE
+
+# Mesure des noyaux de calcul (core.kernels) dans chaque version disponible :
+#     python -m core.benchmark [nombre d'ennemis]
+# La version 'python' (boucles interprétées) n'est mesurée que sur un
+# échantillon réduit, puis ramenée à la taille demandée.
+#
+# Débit des environnements d'entraînement (core.env.VectorEnv, actions au hasard) :
+#     python -m core.benchmark env [nombre de parties] [pas]
+
+PYTHON_SAMPLE = 2_000
+
+def _cases(count: int, seed: int = 0) -> Dict[str, Callable[[], None]]:
+    """Un appel de chaque noyau sur des données aléatoires de ``count`` entités"""
+    rng = np.random.default_rng(seed)
+    width, height = 200, 200
+    enemies = rng.integers(0, width * FIXED_ONE, size=(count, 4))
+    speed = rng.integers(FIXED_ONE // 2, 2 * FIXED_ONE, size=count)
+    projectiles = rng.integers(-5 * FIXED_ONE, 5 * FIXED_ONE, size=(count, 6))
+    cells_x, cells_y = enemies[:, 0] // FIXED_ONE, enemies[:, 1] // FIXED_ONE
+    keys = cells_y * width + cells_x
+    towers = rng.integers(0, width, size=(3, 16))
+    probes = rng.integers(0, width * height, size=count)
+
+    return {
+        'move_enemies': lambda: kernels.move_enemies(enemies[:, 0], enemies[:, 1], speed,
+                                                     100 * FIXED_ONE, 100 * FIXED_ONE, 100_000),
+        'move_projectiles': lambda: kernels.move_projectiles(projectiles[:, 0], projectiles[:, 1],
+                                                             projectiles[:, 2], projectiles[:, 3], 100_000),
+        'closest_in_range': lambda: kernels.closest_in_range(cells_x, cells_y, towers[0], towers[1],
+                                                             towers[2] % 20),
+        'first_enemy_at': lambda: kernels.first_enemy_at(keys, probes, width * height),
+    }
+
+def _time(call: Callable[[], None], repeat: int = 5) -> float:
+    """Meilleure durée (secondes) de plusieurs appels"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(count: int = 100_000, ticks: int = 200) -> List[str]:
+    """Mesure chaque noyau et une partie simulée dans chaque version ; retourne les lignes du rapport"""
+    previous = kernels.backend
+    timings: Dict[str, Dict[str, float]] = {}
+    warm_up: Dict[str, float] = {}
+    try:
+        for backend in kernels.available_backends():
+            kernels.use_backend(backend)
+            warm_up[backend] = kernels.warm_up()
+            size = min(count, PYTHON_SAMPLE) if backend == 'python' else count
+            timings[backend] = {name: _time(call) * count / size
+                                for name, call in _cases(size).items()}
+
+            sim = Simulation(seed=0)
+            sim.enemies_per_wave = 40
+            start = time.perf_counter()
+            sim.run(ticks)
+            timings[backend]['simulation'] = time.perf_counter() - start
+    finally:
+        kernels.use_backend(previous)
+
+    backends = list(timings)
+    lines = [f"{count} entités, partie de {ticks} ticks ; durées en ms (accélération par rapport à numpy)",
+             f"{'':<18}" + ''.join(f"{backend:>20}" for backend in backends)]
+    for name in list(kernels.KERNEL_NAMES) + ['simulation']:
+        reference = timings['numpy'][name]
+        cells = [f"{timings[backend][name] * 1000:>10.2f} ({reference / timings[backend][name]:>5.1f}x)"
+                 for backend in backends]
+        lines.append(f"{name:<18}" + ''.join(f"{cell:>20}" for cell in cells))
+    lines.append(f"{'préchauffage':<18}" + ''.join(f"{warm_up[backend] * 1000:>18.1f}ms"
+                                                   for backend in backends))
+    return lines
+
+def run_env(num_envs: int = 256, steps: int = 500, seed: int = 0) -> List[str]:
+    """Mesure le débit d'un VectorEnv (pas de partie par seconde) ; retourne les lignes du rapport"""
+    from core.env import VectorEnv
+
+    env = VectorEnv(num_envs, seed=seed)
+    env.reset()
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, env.action_count, size=(steps, num_envs))
+    durations = []
+    enemies = []
+    for step_actions in actions:
+        start = time.perf_counter()
+        env.step(step_actions)
+        durations.append(time.perf_counter() - start)
+        enemies.append(len(env.batch.enemies))
+    env.close()
+
+    # Le coût d'un pas croît avec le nombre d'ennemis : débit par tranche de la série
+    lines = [f"{num_envs} parties, {steps} pas (actions au hasard), noyaux {kernels.backend}",
+             f"{'pas':<14}{'ennemis':>10}{'ms par pas':>14}{'pas de partie/s':>18}"]
+    for part in np.array_split(np.arange(steps), 5):
+        if len(part) == 0:
+            continue
+        duration = sum(durations[i] for i in part) / len(part)
+        lines.append(f"{f'{part[0]}-{part[-1]}':<14}{int(np.mean([enemies[i] for i in part])):>10}"
+                     f"{duration * 1000:>14.2f}{num_envs / duration:>18.0f}")
+    lines.append(f"{'total':<14}{'':>10}{sum(durations) / steps * 1000:>14.2f}"
+                 f"{num_envs * steps / sum(durations):>18.0f}")
+    return lines
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['env']:
+        print('\n'.join(run_env(*(int(value) for value in sys.argv[2:4]))))
+    else:
+        print('\n'.join(run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)))
@@ -1,37 +1,141 @@
 import time
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
 from entities.tower import Tower
 from entities.enemy import Enemy
-from entities.base import Entity
 from models.position import Position
 from entities.projectile import Projectile  # À créer
+from core.weapons import EnemyIndex, area_damage
+from models.coverage_map import CoverageMap
+from models.visibility_map import VisibilityMap
+from core.effects import EffectSystem
+from core.metrics import GameMetrics
+from core.particles import ParticleSystem
+from utils.constants import FIXED_ONE
 
 class CombatSystem:
     """
     Gère le système de combat entre les tours et les ennemis
     """
-    def __init__(self):
+    def __init__(self, coverage: Optional[CoverageMap] = None, effects: Optional[EffectSystem] = None,
+                 metrics: Optional[GameMetrics] = None, particles: Optional[ParticleSystem] = None,
+                 visibility: Optional[VisibilityMap] = None):
+        self.coverage = coverage  # Sans carte de couverture, chaque tour parcourt tous les ennemis
+        self.effects = effects  # Sans système d'effets, les effets des tours sont ignorés
+        self.metrics = metrics  # Mesures de jeu (tirs, impacts, dégâts), facultatives
+        self.particles = particles  # Effets visuels (impacts, départs de tir, traînées), facultatifs
+        self.visibility = visibility  # Sans lignes de vue, les murs ne gênent pas le tir
         self.projectiles: List[Projectile] = []
         self.last_shot_time = 0
         self.reload_progress = 1.0  # Prêt à tirer
+        self.damage_dealt = 0  # Dégâts infligés depuis le début de la partie
+        
+        # État du tick en cours (voir update)
+        self._index: Optional[EnemyIndex] = None
+        self._damage = np.zeros(0, dtype=np.int64)
+        self._chain_shots = []
+        self._afflictions: List[Tuple[int, str]] = []
     
     def update(self, towers: List[Tower], enemies: List[Enemy], game_map, delta_time: float) -> None:
         """Met à jour le système de combat"""
+        # Index spatial des ennemis, construit au premier besoin et valable tout le tick
+        self._index = None
+        self._damage = np.zeros(len(enemies), dtype=np.int64)
+        self._chain_shots = []
+        self._afflictions = []
+        if self.visibility is not None:
+            self.visibility.sync_terrain()
+        
+        # Traînées : une particule à la position des projectiles avant leur déplacement
+        if self.particles is not None and self.projectiles:
+            count = len(self.projectiles)
+            self.particles.emit('trail',
+                                np.fromiter((p.position.x for p in self.projectiles), dtype=np.int64, count=count),
+                                np.fromiter((p.position.y for p in self.projectiles), dtype=np.int64, count=count))
+        
         # Mise à jour des projectiles
         self._update_projectiles(delta_time, enemies, game_map)
         
         # Tours attaquent les ennemis à portée
+        targets = self._find_targets([tower for tower in towers if tower.can_shoot()], enemies, game_map)
+        fired = []
         for tower in towers:
             if tower.can_shoot():
-                target = self._find_closest_enemy(tower, enemies, game_map)
-                if target:
+                found = targets.get(id(tower))
+                if found is not None:
+                    slot, target = found
                     self._shoot(tower, target, game_map)
+                    # Départ du tir sur la case voisine côté cible : la tour masque sa propre case
+                    dx = target.position.x - tower.position.x
+                    dy = target.position.y - tower.position.y
+                    fired.append((tower.position.x + (dx > 0) - (dx < 0), tower.position.y + (dy > 0) - (dy < 0)))
+                    if tower.weapon == 'chain':
+                        self._chain_shots.append((tower, slot))
             else:
                 tower.update_reload(delta_time)
+        
+        self._resolve_chains(enemies, game_map)
+        
+        # Tous les coups du tick sont cumulés avant d'être appliqués
+        for slot in np.flatnonzero(self._damage).tolist():
+            enemies[slot].hp -= int(self._damage[slot])
+        damage = int(self._damage.sum())
+        self.damage_dealt += damage
+        if self.particles is not None and fired:
+            self.particles.emit('muzzle', [x for x, _ in fired], [y for _, y in fired])
+        if self.metrics is not None:
+            self.metrics.fired.inc(len(fired))
+            self.metrics.damage.inc(damage)
+        
+        # Puis les effets de statut des ennemis touchés
+        if self.effects is not None:
+            for slot, effect in self._afflictions:
+                self.effects.apply(enemies[slot], effect)
+    
+    def merge_projectiles(self) -> int:
+        """
+        Fusionne les projectiles d'une même case qui visent le même ennemi
+        (même Position suivie) dans le même sens, avec les mêmes éclats et
+        effet : dégâts additionnés, position et vitesse du premier.
+        Dégradation approchée, comme le déplacement grossier hors de la vue :
+        les trajectoires fusionnées ne sont pas identiques et l'impact peut
+        différer. Retourne le nombre de projectiles retirés.
+        """
+        merged: Dict[Tuple, Projectile] = {}
+        for projectile in self.projectiles:
+            position, vx, vy = projectile.position, projectile.velocity_x, projectile.velocity_y
+            key = (position.x, position.y, id(projectile.target_position),
+                   (vx > 0) - (vx < 0), (vy > 0) - (vy < 0), projectile.splash_radius, projectile.effect)
+            first = merged.get(key)
+            if first is None:
+                merged[key] = projectile
+            else:
+                first.damage += projectile.damage
+        
+        removed = len(self.projectiles) - len(merged)
+        if removed:
+            self.projectiles = list(merged.values())
+        return removed
+    
+    def _afflict(self, targets, effects) -> None:
+        """Note les effets de statut à appliquer en fin de tick (None : aucun effet)"""
+        self._afflictions.extend((target, effect) for target, effect in zip(targets, effects)
+                                 if effect is not None)
+    
+    def _enemy_index(self, enemies: List[Enemy], game_map) -> EnemyIndex:
+        """Index spatial des ennemis du tick"""
+        if self._index is None:
+            count = len(enemies)
+            xs = np.fromiter((enemy.fx for enemy in enemies), dtype=np.int64, count=count)
+            ys = np.fromiter((enemy.fy for enemy in enemies), dtype=np.int64, count=count)
+            self._index = EnemyIndex(xs, ys, game_map.width, game_map.height)
+        return self._index
     
     def _update_projectiles(self, delta_time: float, enemies: List[Enemy], game_map) -> None:
         """Met à jour les projectiles et vérifie les collisions"""
         remaining_projectiles = []
+        moved = []
         
         for projectile in self.projectiles:
             projectile.update(delta_time)
@@ -41,34 +145,115 @@ class CombatSystem:
                 projectile.position.y < 0 or projectile.position.y >= game_map.height):
                 continue  # Projectile hors de la carte
             
-            # Vérifier les collisions avec les ennemis
-            hit = False
-            for enemy in enemies:
-                if self._check_collision(projectile, enemy):
-                    enemy.hp -= projectile.damage
-                    hit = True
-                    break
-            
-            if not hit:
+            moved.append(projectile)
+        
+        if not moved or not enemies:
+            self.projectiles = moved
+            return
+        
+        # Collisions : premier ennemi (dans l'ordre de la liste) sur la case du projectile
+        index = self._enemy_index(enemies, game_map)
+        cells_x = np.fromiter((p.position.x for p in moved), dtype=np.int64, count=len(moved))
+        cells_y = np.fromiter((p.position.y for p in moved), dtype=np.int64, count=len(moved))
+        targets = index.first_at(cells_x, cells_y)
+        
+        splashes = []
+        for projectile, target in zip(moved, targets.tolist()):
+            if target < 0:
                 remaining_projectiles.append(projectile)
+                continue
+            self._damage[target] += projectile.damage
+            self._afflict([target], [projectile.effect])
+            if projectile.splash_radius > 0:
+                splashes.append((projectile, target))
+        
+        if self.metrics is not None:
+            self.metrics.hits.inc(len(moved) - len(remaining_projectiles))
+        if self.particles is not None:
+            found = targets >= 0
+            self.particles.emit('hit', cells_x[found], cells_y[found])
+        
+        # Éclats : une seule requête de rayon pour tous les impacts du tick
+        if splashes:
+            impacts, hits = area_damage(index,
+                        np.array([p.fx for p, _ in splashes], dtype=np.int64),
+                        np.array([p.fy for p, _ in splashes], dtype=np.int64),
+                        np.array([target for _, target in splashes], dtype=np.int64),
+                        np.array([round(p.splash_radius * FIXED_ONE) for p, _ in splashes], dtype=np.int64),
+                        np.array([p.damage for p, _ in splashes], dtype=np.int64),
+                        self._damage)
+            self._afflict(hits.tolist(), [splashes[impact][0].effect for impact in impacts.tolist()])
         
         self.projectiles = remaining_projectiles
     
-    def _check_collision(self, projectile: Projectile, entity: Entity) -> bool:
-        """Vérifie si un projectile touche une entité"""
-        return projectile.position == entity.position
+    def _resolve_chains(self, enemies: List[Enemy], game_map) -> None:
+        """Éclairs en chaîne : la cible et ses plus proches voisins, groupés par nombre de rebonds"""
+        by_count = {}
+        for tower, target in self._chain_shots:
+            self._damage[target] += tower.damage
+            self._afflict([target], [tower.effect])
+            by_count.setdefault(tower.chain_count, []).append((tower, target))
+        
+        for chain_count, shots in by_count.items():
+            index = self._enemy_index(enemies, game_map)
+            primary = np.array([target for _, target in shots], dtype=np.int64)
+            impacts, hits = area_damage(index, index.x[primary], index.y[primary], primary,
+                                        np.array([round(tower.chain_range * FIXED_ONE) for tower, _ in shots],
+                                                 dtype=np.int64),
+                                        np.array([tower.damage for tower, _ in shots], dtype=np.int64),
+                                        self._damage, limit=chain_count)
+            self._afflict(hits.tolist(), [shots[impact][0].effect for impact in impacts.tolist()])
     
-    def _find_closest_enemy(self, tower: Tower, enemies: List[Enemy], game_map) -> Optional[Enemy]:
-        """Trouve l'ennemi le plus proche à portée de la tour"""
+    def _find_targets(self, towers: List[Tower], enemies: List[Enemy],
+                      game_map) -> Dict[int, Tuple[int, Enemy]]:
+        """
+        Ennemi le plus proche à portée de chaque tour prête, avec son indice
+        dans ``enemies`` (clé : id de la tour ; absente sans cible)
+        """
+        if not towers:
+            return {}
+        
+        if self.coverage is None:
+            targets = {}
+            for tower in towers:
+                slot = self._find_closest_enemy(tower, enemies, game_map)
+                if slot is not None:
+                    targets[id(tower)] = (slot, enemies[slot])
+            return targets
+        
+        # Un seul passage sur les ennemis : chacun n'est comparé qu'aux tours qui couvrent sa case
+        ready = {id(tower) for tower in towers}
+        obstructed = self.visibility.obstructed if self.visibility is not None else ()
+        best: Dict[int, Tuple[int, int]] = {}
+        for slot, enemy in enumerate(enemies):
+            for tower in self.coverage.towers_at(enemy.position.x, enemy.position.y):
+                if id(tower) not in ready:
+                    continue
+                # Tour dont un mur coupe la vue : l'ennemi doit être dans son champ de vision
+                if id(tower) in obstructed and not self.visibility.sees(tower, enemy.position.x, enemy.position.y):
+                    continue
+                dx = enemy.position.x - tower.position.x
+                dy = enemy.position.y - tower.position.y
+                distance = dx * dx + dy * dy
+                # Inégalité stricte : à distance égale, le premier ennemi de la liste
+                current = best.get(id(tower))
+                if current is None or distance < current[0]:
+                    best[id(tower)] = (distance, slot)
+        
+        return {key: (slot, enemies[slot]) for key, (_, slot) in best.items()}
+    
+    def _find_closest_enemy(self, tower: Tower, enemies: List[Enemy], game_map) -> Optional[int]:
+        """Trouve l'ennemi le plus proche à portée de la tour (son indice dans ``enemies``)"""
         enemies_in_range = []
         
-        for enemy in enemies:
+        for slot, enemy in enumerate(enemies):
             dx = enemy.position.x - tower.position.x
             dy = enemy.position.y - tower.position.y
             distance = (dx**2 + dy**2) ** 0.5
             
-            if distance <= tower.range:
-                enemies_in_range.append((enemy, distance))
+            if distance <= tower.range and (self.visibility is None or
+                                            self.visibility.sees(tower, enemy.position.x, enemy.position.y)):
+                enemies_in_range.append((slot, distance))
         
         if enemies_in_range:
             # Trier par distance
@@ -79,12 +264,19 @@ class CombatSystem:
     
     def _shoot(self, tower: Tower, target: Enemy, game_map) -> None:
         """Fait tirer une tour sur une cible"""
+        tower.shoot()  # Marquer la tour comme ayant tiré
+        
+        # L'éclair touche immédiatement (voir _resolve_chains) : pas de projectile
+        if tower.weapon == 'chain':
+            return
+        
         projectile = Projectile(
             Position(tower.position.x, tower.position.y),
             target.position,
             tower.damage,
-            speed=5.0
+            speed=5.0,
+            splash_radius=tower.splash_radius if tower.weapon == 'splash' else 0.0,
+            effect=tower.effect
         )
         
-        self.projectiles.append(projectile)
-        tower.shoot()  # Marquer la tour comme ayant tiré
\ No newline at end of file
+        self.projectiles.append(projectile)
\ No newline at end of file
@@ -0,0 +1,159 @@
+from typing import Optional, Tuple
+import numpy as np
+
+from core.fixed_array import to_cells, div_round_array, isqrt_array
+from models.position import to_microseconds
+from utils.constants import FIXED_ONE, MICROSECONDS
+
+# Distance (virgule fixe) en dessous de laquelle deux ennemis se repoussent
+SEPARATION_RADIUS = FIXED_ONE
+# Ennemis pris en compte au plus dans chacune des 9 cases voisines
+SEPARATION_NEIGHBORS = 4
+# Part du recouvrement corrigée par seconde
+SEPARATION_RATE = 4
+# Déplacement maximal dû à la séparation en un tick
+MAX_SEPARATION_STEP = FIXED_ONE // 2
+# Nombre de cases (toutes parties comprises) jusqu'auquel les cases occupées
+# sont retrouvées par une table directe plutôt que par recherche dichotomique
+DIRECT_LOOKUP_CELLS = 1 << 20
+
+# Directions de repli pour deux ennemis exactement superposés
+_DIAGONAL = round(FIXED_ONE * 0.7071)
+_FALLBACK_X = np.array([FIXED_ONE, _DIAGONAL, 0, -_DIAGONAL, -FIXED_ONE, -_DIAGONAL, 0, _DIAGONAL])
+_FALLBACK_Y = np.array([0, _DIAGONAL, FIXED_ONE, _DIAGONAL, 0, -_DIAGONAL, -FIXED_ONE, -_DIAGONAL])
+
+def stable_argsort(values: np.ndarray) -> np.ndarray:
+    """
+    Ordre de tri stable (comme np.argsort(kind='stable')). Des entiers
+    positifs tenant sur 16 bits sont triés par base par NumPy, bien plus
+    vite qu'en 64 bits.
+    """
+    if len(values) and values.min() >= 0 and values.max() < 1 << 15:
+        return np.argsort(values.astype(np.int16), kind='stable')
+    return np.argsort(values, kind='stable')
+
+def separate(x: np.ndarray, y: np.ndarray, world_width: int, world_height: int,
+             delta_time: float, groups: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Écarte les ennemis trop proches les uns des autres.
+
+    Les ennemis sont rangés par case (tri stable) ; chacun ne regarde que
+    les SEPARATION_NEIGHBORS premiers occupants de sa case et des 8 cases
+    voisines, ce qui borne le travail par ennemi. Tout le calcul est en
+    entiers, donc identique d'une machine à l'autre. Retourne les
+    nouvelles positions (virgule fixe).
+
+    ``groups`` (numéro de partie de chaque ennemi) sépare plusieurs
+    parties de même taille traitées ensemble : seuls les ennemis d'un
+    même groupe se repoussent, et le résultat de chaque partie est celui
+    qu'elle aurait seule.
+    """
+    count = len(x)
+    if count < 2:
+        return x, y
+
+    cell_x = np.clip(to_cells(x), 0, world_width - 1)
+    cell_y = np.clip(to_cells(y), 0, world_height - 1)
+    keys = cell_y * world_width + cell_x
+    # Tri stable par case ; avec des groupes, par groupe puis par case (deux passes stables)
+    order = stable_argsort(keys)
+    ids = everyone = np.arange(count)
+    if groups is not None:
+        offsets = groups * (world_width * world_height)
+        keys = keys + offsets
+        # Indice de chaque ennemi dans sa partie (départage des superpositions)
+        by_group = stable_argsort(groups)
+        ids = np.empty(count, dtype=np.int64)
+        ids[by_group] = everyone - np.searchsorted(groups[by_group], groups[by_group])
+        order = order[stable_argsort(groups[order])]
+
+    # Cases occupées : début et nombre d'occupants de chaque suite de clés égales
+    sorted_keys = keys[order]
+    boundaries = np.ones(count, dtype=bool)
+    boundaries[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    starts = np.flatnonzero(boundaries)
+    cells = sorted_keys[starts]
+    occupants = np.diff(np.append(starts, count))
+
+    slot_of = None
+    group_count = int(groups.max()) + 1 if groups is not None else 1
+    padded_width = world_width + 2
+    padded_cells = padded_width * (world_height + 2)
+    if padded_cells * group_count <= DIRECT_LOOKUP_CELLS:
+        # Table directe case -> suite d'occupants, sur une grille bordée de cases
+        # vides : un voisin hors de la carte y est simplement inoccupé
+        padded = (cell_y + 1) * padded_width + cell_x + 1
+        if groups is not None:
+            padded += groups * padded_cells
+        slot_of = np.full(padded_cells * group_count, -1, dtype=np.int64)
+        slot_of[padded[order[starts]]] = np.arange(len(starts))
+
+    push_x = np.zeros(count, dtype=np.int64)
+    push_y = np.zeros(count, dtype=np.int64)
+
+    for offset_y in (-1, 0, 1):
+        for offset_x in (-1, 0, 1):
+            if slot_of is not None:
+                slots = slot_of[padded + (offset_y * padded_width + offset_x)]
+                me = np.flatnonzero(slots >= 0)
+            else:
+                neighbor_x = cell_x + offset_x
+                neighbor_y = cell_y + offset_y
+                inside = (neighbor_x >= 0) & (neighbor_x < world_width) & (neighbor_y >= 0) & (neighbor_y < world_height)
+                neighbor_keys = neighbor_y * world_width + neighbor_x
+                if groups is not None:
+                    neighbor_keys += offsets
+                slots = np.minimum(np.searchsorted(cells, neighbor_keys), len(cells) - 1)
+                me = np.flatnonzero(inside & (cells[slots] == neighbor_keys))
+            slots = slots[me]
+            first = starts[slots]
+            available = occupants[slots]
+
+            for rank in range(SEPARATION_NEIGHBORS):
+                present = rank < available
+                if not present.any():
+                    break
+                me, first, available = me[present], first[present], available[present]
+                _accumulate_push(x, y, me, order[first + rank], push_x, push_y, ids)
+
+    elapsed = to_microseconds(delta_time)
+    step_x = np.clip(div_round_array(push_x * SEPARATION_RATE * elapsed, MICROSECONDS),
+                     -MAX_SEPARATION_STEP, MAX_SEPARATION_STEP)
+    step_y = np.clip(div_round_array(push_y * SEPARATION_RATE * elapsed, MICROSECONDS),
+                     -MAX_SEPARATION_STEP, MAX_SEPARATION_STEP)
+
+    new_x = np.clip(x + step_x, 0, (world_width - 1) * FIXED_ONE)
+    new_y = np.clip(y + step_y, 0, (world_height - 1) * FIXED_ONE)
+    return new_x, new_y
+
+def _accumulate_push(x: np.ndarray, y: np.ndarray, me: np.ndarray, other: np.ndarray,
+                     push_x: np.ndarray, push_y: np.ndarray, ids: np.ndarray) -> None:
+    """Ajoute à push_x/push_y la répulsion exercée par other sur me (paires alignées)"""
+    dx = x[me] - x[other]
+    dy = y[me] - y[other]
+    squared = dx * dx + dy * dy
+
+    # Seules les paires distinctes et proches comptent ; le filtre se fait avant la racine
+    close = (squared < SEPARATION_RADIUS * SEPARATION_RADIUS) & (me != other)
+    if not close.any():
+        return
+    me, other, dx, dy = me[close], other[close], dx[close], dy[close]
+    distance = isqrt_array(squared[close])
+    overlap = SEPARATION_RADIUS - distance
+
+    stacked = distance == 0
+    distance[stacked] = 1
+    away_x = div_round_array(dx * overlap, distance)
+    away_y = div_round_array(dy * overlap, distance)
+
+    if stacked.any():
+        # Superposition exacte : direction tirée de la paire, opposée pour chacun
+        a, b = ids[me[stacked]], ids[other[stacked]]
+        direction = (np.minimum(a, b) * 7 + np.maximum(a, b) * 13) % 8
+        sign = np.where(a < b, 1, -1)
+        away_x[stacked] = div_round_array(_FALLBACK_X[direction] * overlap[stacked], FIXED_ONE) * sign
+        away_y[stacked] = div_round_array(_FALLBACK_Y[direction] * overlap[stacked], FIXED_ONE) * sign
+
+    # Somme par ennemi ; les valeurs restent bien en deçà de 2**53, la somme flottante est exacte
+    push_x += np.bincount(me, weights=away_x, minlength=len(push_x)).astype(np.int64)
+    push_y += np.bincount(me, weights=away_y, minlength=len(push_y)).astype(np.int64)
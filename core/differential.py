@@ -0,0 +1,337 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from core import kernels
+from core.batch_simulation import BatchSimulation
+from core.env import ACTION_NAMES, ACTIONS
+from core.game_engine import GameEngine
+from core.simulation import Simulation, TX, TY, TRANGE, TDAMAGE, TWEAPON, TEFFECT, TOWER_EFFECTS, effect_columns
+from utils.constants import FIXED_ONE, WEAPONS
+
+# Tests différentiels : le moteur objet (GameEngine, Enemy.update,
+# CombatSystem) sert de référence exécutable ; chaque moteur rapide est
+# lancé à côté, avec la même graine et les mêmes actions scriptées.
+# Après chaque tick, les états normalisés sont comparés ; le premier tick
+# qui diffère est signalé avec un scénario réduit (repro), et le temps
+# passé dans les ticks de chaque moteur donne l'accélération.
+#     python -m core.differential [--seeds 1 2 3] [--ticks 2000] [--score 300] [--engines simulation batch]
+
+DEFAULT_TICKS = 2000
+DELTA_TIME = 0.1
+# Actions scriptées : une tous les ACTION_PERIOD ticks en moyenne
+ACTION_PERIOD = 40
+# Score de départ donné à chaque moteur : de quoi construire, vendre et
+# améliorer des tours pendant le script (une partie au hasard gagne peu)
+START_SCORE = 300
+
+Script = List[Tuple[int, str]]  # (tick, nom de l'action dans core.env.ACTION_NAMES)
+
+def random_script(seed: int, ticks: int, period: int = ACTION_PERIOD) -> Script:
+    """Actions tirées au hasard (sauf 'noop'), une tous les ``period`` ticks en moyenne"""
+    rng = random.Random(seed)
+    return [(tick, rng.choice(ACTION_NAMES[1:])) for tick in range(ticks) if rng.random() < 1 / period]
+
+def _affordable(action: Dict[str, Any], score: int) -> bool:
+    """Un achat trop cher est ignoré, comme la touche correspondante en jeu"""
+    return action.get('cost', 0) <= score
+
+# --- Moteurs comparés ---
+
+class ReferenceEngine:
+    """Moteur de référence : GameEngine sans interface, sorties console ignorées"""
+    name = 'reference'
+
+    def __init__(self, seed: int, world_width: int, world_height: int):
+        self.engine = GameEngine(frontend='headless', seed=seed, world_width=world_width,
+                                 world_height=world_height)
+        self._null = open(os.devnull, 'w')
+
+    def add_score(self, points: int) -> None:
+        """Crédite la partie (score de départ)"""
+        self.engine.game_state['score'] += points
+
+    def apply(self, action: Dict[str, Any]) -> None:
+        """Applique une action (format de TcodInputHandler)"""
+        if _affordable(action, self.engine.game_state['score']):
+            with contextlib.redirect_stdout(self._null):
+                self.engine._apply_action(action)
+
+    def step(self, delta_time: float) -> None:
+        """Avance d'un tick (la fin de partie est celle de GameEngine._loop)"""
+        engine = self.engine
+        with contextlib.redirect_stdout(self._null):
+            engine._update(delta_time)
+        if engine.game_state['tower_hp'] <= 0:
+            engine.game_state['game_over'] = True
+
+    def state(self) -> Dict[str, Any]:
+        """État normalisé (voir normalize)"""
+        engine = self.engine
+        return normalize(
+            engine.game_state['score'], engine.wave_manager.current_wave, engine.game_state['tower_hp'],
+            engine.game_state['game_over'],
+            [(tower.position.x, tower.position.y, tower.range, tower.damage, tower.weapon, tower.effect)
+             for tower in engine.towers],
+            [[enemy.fx, enemy.fy, enemy.hp, enemy.stats] + effect_columns(engine.effects, enemy)
+             for enemy in engine.enemies],
+            [(projectile.fx, projectile.fy, projectile.velocity_x, projectile.velocity_y, projectile.damage,
+              round(projectile.splash_radius * FIXED_ONE), TOWER_EFFECTS.index(projectile.effect))
+             for projectile in engine.combat_system.projectiles])
+
+    def close(self) -> None:
+        self._null.close()
+
+class SimulationEngine:
+    """Simulation (tableaux NumPy), avec la version des noyaux choisie (core.kernels)"""
+    def __init__(self, seed: int, world_width: int, world_height: int, backend: Optional[str] = None):
+        self.sim = Simulation(world_width, world_height, seed)
+        self.backend = backend or kernels.backend
+        self.name = f"simulation[{self.backend}]"
+
+    def add_score(self, points: int) -> None:
+        """Crédite la partie (score de départ)"""
+        self.sim.score += points
+
+    def apply(self, action: Dict[str, Any]) -> None:
+        """Applique une action (format de TcodInputHandler)"""
+        if _affordable(action, self.sim.score):
+            self.sim.apply_action(action)
+
+    def step(self, delta_time: float) -> None:
+        """Avance d'un tick avec la version des noyaux du moteur"""
+        previous = kernels.backend
+        kernels.use_backend(self.backend)
+        try:
+            self.sim.step(delta_time)
+        finally:
+            kernels.use_backend(previous)
+
+    def state(self) -> Dict[str, Any]:
+        """État normalisé (voir normalize)"""
+        return simulation_state(self.sim)
+
+    def close(self) -> None:
+        pass
+
+class BatchEngine:
+    """Première partie d'une BatchSimulation de ``count`` parties de même graine"""
+    def __init__(self, seed: int, world_width: int, world_height: int, count: int = 1):
+        self.batch = BatchSimulation(count, world_width, world_height, [seed] * count)
+        self.name = f"batch[{count}]"
+
+    def add_score(self, points: int) -> None:
+        """Crédite toutes les parties (score de départ)"""
+        self.batch.score += points
+
+    def apply(self, action: Dict[str, Any]) -> None:
+        """Applique une action (format de TcodInputHandler) à toutes les parties"""
+        if _affordable(action, self.batch.score[0]):
+            self.batch.apply_actions([action], np.zeros(self.batch.count, dtype=np.int64))
+
+    def step(self, delta_time: float) -> None:
+        self.batch.step(delta_time)
+
+    def state(self) -> Dict[str, Any]:
+        """État normalisé de la première partie (voir normalize)"""
+        return simulation_state(self.batch.to_simulation(0))
+
+    def close(self) -> None:
+        pass
+
+def simulation_state(sim: Simulation) -> Dict[str, Any]:
+    """État normalisé d'une Simulation"""
+    towers = [(sim.tower_x, sim.tower_y, sim.tower_range, sim.tower_damage, sim.tower_weapon, sim.tower_effect)]
+    towers.extend((row[TX], row[TY], row[TRANGE], row[TDAMAGE], WEAPONS[row[TWEAPON]], TOWER_EFFECTS[row[TEFFECT]])
+                  for row in sim.towers.tolist())
+    return normalize(sim.score, sim.current_wave, sim.tower_hp, sim.game_over, towers,
+                     sim.enemies.tolist(), sim.projectiles.tolist())
+
+def normalize(score: int, wave: int, tower_hp: int, game_over: bool, towers: Sequence[Tuple],
+              enemies: Sequence[Sequence[int]], projectiles: Sequence[Sequence[int]]) -> Dict[str, Any]:
+    """
+    État comparable d'un moteur : valeurs de la partie, tours (x, y,
+    portée, dégâts, arme, effet ; la principale d'abord, puis les tours
+    construites dans l'ordre de construction), ennemis (x, y, pv, ligne
+    de ARCHETYPES, échéances des effets, fraction de PV) et projectiles
+    (x, y, vx, vy, dégâts, éclats, effet), positions en virgule fixe.
+    Les ennemis et projectiles sont triés : seul leur ensemble compte,
+    pas l'ordre de stockage.
+    """
+    return {
+        'score': int(score),
+        'wave': int(wave),
+        'tower_hp': int(tower_hp),
+        'game_over': bool(game_over),
+        'towers': [tuple(tower) for tower in towers],
+        'enemies': sorted(tuple(map(int, enemy)) for enemy in enemies),
+        'projectiles': sorted(tuple(map(int, projectile)) for projectile in projectiles),
+    }
+
+def differences(expected: Dict[str, Any], actual: Dict[str, Any], limit: int = 3) -> List[str]:
+    """Différences lisibles entre deux états normalisés"""
+    lines = []
+    for key, value in expected.items():
+        other = actual[key]
+        if value == other:
+            continue
+        if isinstance(value, list):
+            missing = [entity for entity in value if entity not in other][:limit]
+            extra = [entity for entity in other if entity not in value][:limit]
+            lines.append(f"{key} : {len(value)} / {len(other)}, attendus {missing}, en trop {extra}")
+        else:
+            lines.append(f"{key} : {value} / {other}")
+    return lines
+
+# Moteurs connus : nom -> constructeur (graine, largeur, hauteur)
+ENGINES: Dict[str, Callable[[int, int, int], Any]] = {
+    'simulation': SimulationEngine,
+    'batch': lambda seed, width, height: BatchEngine(seed, width, height, count=8),
+}
+for _backend in kernels.available_backends():
+    ENGINES[f"simulation[{_backend}]"] = (
+        lambda seed, width, height, backend=_backend: SimulationEngine(seed, width, height, backend))
+
+def register_engine(name: str, factory: Callable[[int, int, int], Any]) -> None:
+    """Enregistre un moteur à comparer (objet avec add_score, apply, step, state et close)"""
+    ENGINES[name] = factory
+
+# --- Comparaison ---
+
+def compare(factory: Callable[[int, int, int], Any], seed: int, ticks: int = DEFAULT_TICKS,
+            script: Optional[Script] = None, world_width: int = 100, world_height: int = 100,
+            delta_time: float = DELTA_TIME, score: int = START_SCORE) -> Dict[str, Any]:
+    """
+    Avance la référence et le moteur ``factory`` côte à côte ; retourne le
+    résultat : ticks joués, premier tick divergent (None si aucun) et ses
+    différences, temps passé dans les ticks de chaque moteur.
+    """
+    script = list(script or [])
+    actions: Dict[int, List[str]] = {}
+    for tick, name in script:
+        actions.setdefault(tick, []).append(name)
+
+    reference = ReferenceEngine(seed, world_width, world_height)
+    candidate = factory(seed, world_width, world_height)
+    result = {'engine': candidate.name, 'seed': seed, 'score': score, 'ticks': 0, 'script': script,
+              'diverged': None, 'differences': [], 'reference_time': 0.0, 'engine_time': 0.0}
+    try:
+        reference.add_score(score)
+        candidate.add_score(score)
+        states = reference.state(), candidate.state()
+        for tick in range(ticks):
+            for name in actions.get(tick, ()):
+                action = ACTIONS[ACTION_NAMES.index(name)]
+                reference.apply(action)
+                candidate.apply(action)
+
+            start = time.perf_counter()
+            reference.step(delta_time)
+            middle = time.perf_counter()
+            candidate.step(delta_time)
+            result['reference_time'] += middle - start
+            result['engine_time'] += time.perf_counter() - middle
+            result['ticks'] = tick + 1
+
+            states = reference.state(), candidate.state()
+            if states[0] != states[1]:
+                result['diverged'] = tick
+                result['differences'] = differences(*states)
+                break
+            if states[0]['game_over']:
+                break
+    finally:
+        reference.close()
+        candidate.close()
+
+    result['final'] = {key: states[0][key] for key in ('score', 'wave', 'tower_hp', 'game_over')}
+    result['speedup'] = result['reference_time'] / max(result['engine_time'], 1e-9)
+    return result
+
+def minimize(factory: Callable[[int, int, int], Any], result: Dict[str, Any], **options) -> Dict[str, Any]:
+    """
+    Réduit un scénario divergent : ticks arrêtés à la divergence, puis
+    actions retirées (par blocs, puis une à une) tant que la divergence
+    demeure. Retourne le résultat du plus petit scénario trouvé.
+    """
+    ticks = result['diverged'] + 1
+    script = [(tick, name) for tick, name in result['script'] if tick < ticks]
+    options.setdefault('score', result['score'])
+    best = compare(factory, result['seed'], ticks, script, **options)
+
+    chunk = max(1, len(script) // 2)
+    while script:
+        removed = False
+        for start in range(0, len(script), chunk):
+            trial = script[:start] + script[start + chunk:]
+            attempt = compare(factory, result['seed'], ticks, trial, **options)
+            if attempt['diverged'] is not None:
+                best, script, ticks = attempt, trial, attempt['diverged'] + 1
+                removed = True
+                break
+        if not removed:
+            if chunk == 1:
+                break
+            chunk = max(1, chunk // 2)
+    return best
+
+def repro(result: Dict[str, Any]) -> str:
+    """Scénario d'un résultat, rejouable avec python -m core.differential --repro"""
+    return json.dumps({'engine': result['engine'], 'seed': result['seed'], 'score': result['score'],
+                       'ticks': result['ticks'], 'script': result['script']})
+
+def format_result(result: Dict[str, Any]) -> List[str]:
+    """Lignes lisibles d'un résultat"""
+    timing = (f"référence {result['reference_time'] * 1000:.0f} ms, moteur {result['engine_time'] * 1000:.0f} ms, "
+              f"accélération {result['speedup']:.1f}x")
+    if result['diverged'] is None:
+        final = result['final']
+        return [f"{result['engine']:<20} graine {result['seed']:<4} identique sur {result['ticks']} ticks "
+                f"(vague {final['wave']}, score {final['score']}) ; {timing}"]
+    lines = [f"{result['engine']:<20} graine {result['seed']:<4} DIVERGE au tick {result['diverged']} ; {timing}"]
+    lines.extend(f"  {line}" for line in result['differences'])
+    return lines
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Compare les moteurs demandés à la référence ; code de sortie 1 en cas de divergence"""
+    parser = argparse.ArgumentParser(description="Tests différentiels des moteurs rapides")
+    parser.add_argument('--engines', nargs='+', default=['simulation', 'batch'], choices=sorted(ENGINES))
+    parser.add_argument('--seeds', nargs='+', type=int, default=[1, 2, 3])
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS)
+    parser.add_argument('--score', type=int, default=START_SCORE, help="score de départ de chaque moteur")
+    parser.add_argument('--repro', help="rejoue un scénario (JSON affiché lors d'une divergence)")
+    parser.add_argument('--json', help="écrit les résultats (temps et accélérations compris) dans ce fichier")
+    args = parser.parse_args(argv)
+
+    if args.repro:
+        scenario = json.loads(args.repro)
+        runs = [(scenario['engine'], scenario['seed'], scenario.get('score', 0), scenario['ticks'],
+                 scenario['script'])]
+    else:
+        runs = [(engine, seed, args.score, args.ticks, random_script(seed, args.ticks))
+                for engine in args.engines for seed in args.seeds]
+
+    results = []
+    for engine, seed, score, ticks, script in runs:
+        result = compare(ENGINES[engine], seed, ticks, [tuple(entry) for entry in script], score=score)
+        result['engine'] = engine
+        print('\n'.join(format_result(result)))
+        if result['diverged'] is not None and not args.repro:
+            reduced = minimize(ENGINES[engine], result)
+            reduced['engine'] = engine
+            print(f"  repro ({len(reduced['script'])} actions, {reduced['ticks']} ticks) : "
+                  f"python -m core.differential --repro '{repro(reduced)}'")
+        results.append(result)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2, default=list)
+    return 1 if any(result['diverged'] is not None for result in results) else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+from typing import List
+import numpy as np
+
+from core.timer_wheel import TimerWheel
+from models.position import to_microseconds
+from utils.constants import (EFFECTS, EFFECT_DURATIONS, SLOW_FACTOR, DAMAGE_PER_SECOND,
+                             FIXED_ONE, MICROSECONDS)
+
+SLOW_SCALE = round(SLOW_FACTOR * FIXED_ONE)
+
+class EffectSystem:
+    """
+    Effets de statut actifs (ralentissement, brûlure, poison) des ennemis.
+
+    Un ennemi touché reçoit un emplacement dans des tableaux compacts :
+    échéance de chaque effet, facteur de vitesse et dégâts par seconde
+    cumulés. Les fins d'effet passent par une roue temporelle, donc un
+    tick ne traite que les effets qui expirent ; les dégâts continus sont
+    appliqués en un calcul sur les emplacements concernés. L'emplacement
+    est rendu quand le dernier effet de l'ennemi se termine.
+    """
+    def __init__(self, capacity: int = 256):
+        self.now = 0  # Temps simulé, en microsecondes
+        self.wheel = TimerWheel()
+
+        self.owners: List = [None] * capacity
+        self.expiry = np.zeros((capacity, len(EFFECTS)), dtype=np.int64)  # 0 : inactif
+        self.speed_scale = np.full(capacity, FIXED_ONE, dtype=np.int64)
+        self.damage_rate = np.zeros(capacity, dtype=np.int64)  # PV par seconde
+        self.damage_remainder = np.zeros(capacity, dtype=np.int64)  # Fraction de PV (millionièmes)
+        self.free = list(range(capacity - 1, -1, -1))
+
+    @property
+    def active(self) -> int:
+        """Nombre d'effets actifs"""
+        return int(np.count_nonzero(self.expiry))
+
+    def _grow(self) -> None:
+        """Double la capacité des tableaux"""
+        capacity = len(self.owners)
+        self.owners.extend([None] * capacity)
+        self.expiry = np.concatenate((self.expiry, np.zeros_like(self.expiry)))
+        self.speed_scale = np.concatenate((self.speed_scale, np.full(capacity, FIXED_ONE, dtype=np.int64)))
+        self.damage_rate = np.concatenate((self.damage_rate, np.zeros(capacity, dtype=np.int64)))
+        self.damage_remainder = np.concatenate((self.damage_remainder, np.zeros(capacity, dtype=np.int64)))
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def apply(self, enemy, effect: str) -> None:
+        """Applique (ou prolonge) un effet sur un ennemi"""
+        slot = enemy.effect_slot
+        if slot < 0:
+            if not self.free:
+                self._grow()
+            slot = self.free.pop()
+            self.owners[slot] = enemy
+            enemy.effect_slot = slot
+
+        kind = EFFECTS.index(effect)
+        if self.expiry[slot, kind] == 0:
+            self._start(slot, effect)
+
+        # Une fin déjà programmée devient caduque : seule la plus récente compte
+        expiry = self.now + to_microseconds(EFFECT_DURATIONS[effect])
+        self.expiry[slot, kind] = expiry
+        self.wheel.schedule(expiry, (slot, kind, expiry))
+
+    def _start(self, slot: int, effect: str) -> None:
+        """Ajoute la contribution d'un effet aux valeurs cumulées de l'emplacement"""
+        if effect == 'slow':
+            self.speed_scale[slot] = SLOW_SCALE
+            self.owners[slot].speed_scale = SLOW_SCALE
+        else:
+            self.damage_rate[slot] += DAMAGE_PER_SECOND[effect]
+
+    def _stop(self, slot: int, kind: int) -> None:
+        """Termine un effet, et libère l'emplacement si c'était le dernier"""
+        effect = EFFECTS[kind]
+        self.expiry[slot, kind] = 0
+        if effect == 'slow':
+            self.speed_scale[slot] = FIXED_ONE
+            self.owners[slot].speed_scale = FIXED_ONE
+        else:
+            self.damage_rate[slot] -= DAMAGE_PER_SECOND[effect]
+
+        if not self.expiry[slot].any():
+            self.release(self.owners[slot])
+
+    def release(self, enemy) -> None:
+        """Retire tous les effets d'un ennemi (fin des effets, mort ou arrivée)"""
+        slot = enemy.effect_slot
+        if slot < 0:
+            return
+        # Les fins encore programmées ne correspondront plus à self.expiry : ignorées
+        self.expiry[slot] = 0
+        self.speed_scale[slot] = FIXED_ONE
+        self.damage_rate[slot] = 0
+        self.damage_remainder[slot] = 0
+        self.owners[slot] = None
+        self.free.append(slot)
+        enemy.effect_slot = -1
+        enemy.speed_scale = FIXED_ONE
+
+    def update(self, delta_time: float) -> None:
+        """
+        Avance le temps : inflige les dégâts continus du tick (en un calcul
+        sur les emplacements touchés), puis termine les effets échus
+        """
+        elapsed = to_microseconds(delta_time)
+        self.now += elapsed
+
+        burning = np.flatnonzero(self.damage_rate)
+        if len(burning):
+            total = self.damage_rate[burning] * elapsed + self.damage_remainder[burning]
+            damage = total // MICROSECONDS
+            self.damage_remainder[burning] = total % MICROSECONDS
+
+            hurt = damage > 0
+            for slot, amount in zip(burning[hurt].tolist(), damage[hurt].tolist()):
+                self.owners[slot].hp -= amount
+
+        for slot, kind, expiry in self.wheel.advance(self.now):
+            if self.expiry[slot, kind] == expiry:
+                self._stop(slot, kind)
+
+    def effects_of(self, enemy) -> List[str]:
+        """Effets actifs d'un ennemi"""
+        if enemy.effect_slot < 0:
+            return []
+        return [effect for kind, effect in enumerate(EFFECTS) if self.expiry[enemy.effect_slot, kind]]
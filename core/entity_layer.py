@@ -0,0 +1,105 @@
+from operator import attrgetter
+from typing import List, Sequence, Tuple
+import numpy as np
+
+from utils.archetypes import ARCHETYPES
+
+# Lecture des attributs sans boucle Python (positions de toutes les entités d'une famille)
+_X = attrgetter('position.x')
+_Y = attrgetter('position.y')
+_STATS = attrgetter('stats')
+
+class EntityLayer:
+    """
+    Calque des entités visibles, composé dans des tampons de la taille de la vue.
+
+    Pour chaque famille d'entités, une seule requête sur les tableaux de
+    positions garde celles de la vue ; seules celles-ci reçoivent un glyphe
+    et une couleur, dispersés dans le tampon. Les familles sont posées dans
+    l'ordre de ``layers`` (la dernière passe au-dessus) ; dans une famille,
+    la dernière entité d'une case l'emporte, comme avec des print()
+    successifs. Avec ``stack_counts``, une case qui contient plusieurs
+    ennemis affiche leur nombre (2-9, puis '+'). Les particules (voir
+    core.particles) passent sous les entités.
+    """
+    LAYERS = ('particle', 'tower', 'enemy', 'projectile')
+
+    TOWER_GLYPH = ('T', (255, 255, 0))
+    PROJECTILE_GLYPH = ('*', (0, 255, 0))
+    STACK_CHARS = '0123456789+'
+
+    def __init__(self, width: int, height: int, layers: Sequence[str] = LAYERS, stack_counts: bool = False):
+        self.width = width
+        self.height = height
+        self.layers = tuple(layers)
+        self.stack_counts = stack_counts
+
+        # Tampons réutilisés d'une trame à l'autre : code du glyphe (0 : vide) et couleur
+        self.codes = np.zeros((height, width), dtype=np.int32)
+        self.colors = np.zeros((height, width, 3), dtype=np.uint8)
+
+        # Glyphes et couleurs des types d'ennemis, par type
+        self.archetype_codes = np.array([ord(char) for char in ARCHETYPES.chars], dtype=np.int32)
+        self.archetype_colors = np.array(ARCHETYPES.colors, dtype=np.uint8).reshape(-1, 3)
+        self.stack_codes = np.array([ord(char) for char in self.STACK_CHARS], dtype=np.int32)
+
+    def compose(self, game_map, towers: List, enemies: List, projectiles: List,
+                particles=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Remplit les tampons avec les entités visibles ; retourne (codes, couleurs).
+
+        Les tampons couvrent la vue de ``game_map`` (limitée à la taille du
+        calque), case (0, 0) en haut à gauche ; un code 0 laisse le fond.
+        """
+        self.codes[:] = 0
+        entities = {'tower': towers, 'enemy': enemies, 'projectile': projectiles}
+        for layer in self.layers:
+            if layer == 'particle':
+                if particles is not None:
+                    particles.composite(game_map, self.codes, self.colors)
+                continue
+            group = entities[layer]
+            if not group:
+                continue
+            slots, keys = self._visible(game_map, group)
+            if len(slots) == 0:
+                continue
+            codes, colors = self._glyphs(layer, group, slots, keys)
+
+            # Dernière entité de chaque case : premières occurrences dans l'ordre inverse
+            keys, last = np.unique(keys[::-1], return_index=True)
+            last = len(slots) - 1 - last
+            self.codes.reshape(-1)[keys] = codes[last]
+            self.colors.reshape(-1, 3)[keys] = colors[last]
+        return self.codes, self.colors
+
+    def _visible(self, game_map, group: List) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices des entités dans la vue et leur case dans le tampon (ligne * largeur + colonne)"""
+        count = len(group)
+        xs = np.fromiter(map(_X, group), dtype=np.int64, count=count) - game_map.viewport_x
+        ys = np.fromiter(map(_Y, group), dtype=np.int64, count=count) - game_map.viewport_y
+        width = min(self.width, game_map.viewport_width)
+        height = min(self.height, game_map.viewport_height)
+        slots = np.flatnonzero((xs >= 0) & (xs < width) & (ys >= 0) & (ys < height))
+        return slots, ys[slots] * self.width + xs[slots]
+
+    def _glyphs(self, layer: str, group: List, slots: np.ndarray,
+                keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Codes et couleurs des entités visibles d'une famille"""
+        count = len(slots)
+        if layer == 'tower':
+            char, color = self.TOWER_GLYPH
+            return np.full(count, ord(char), dtype=np.int32), np.tile(np.array(color, dtype=np.uint8), (count, 1))
+        if layer == 'projectile':
+            char, color = self.PROJECTILE_GLYPH
+            return np.full(count, ord(char), dtype=np.int32), np.tile(np.array(color, dtype=np.uint8), (count, 1))
+
+        rows = np.fromiter(map(_STATS, map(group.__getitem__, slots.tolist())), dtype=np.int64, count=count)
+        archetypes = rows // ARCHETYPES.max_wave
+        codes = self.archetype_codes[archetypes]
+        if self.stack_counts:
+            _, inverse, stacked = np.unique(keys, return_inverse=True, return_counts=True)
+            stacked = stacked[inverse]
+            piles = stacked > 1
+            codes = np.where(piles, self.stack_codes[np.minimum(stacked, len(self.stack_codes) - 1)], codes)
+        return codes, self.archetype_colors[archetypes]
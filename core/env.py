@@ -0,0 +1,330 @@
+import random
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from core import kernels
+from core.batch_simulation import BatchSimulation, EGAME
+from core.crowd import stable_argsort
+from core.fixed_array import to_cells
+from core.parallel import SharedArray
+from core.planner import TOWER_HP_WEIGHT, GAME_OVER_PENALTY
+from core.simulation import EX, EY, EHP
+from core.tcod_input_handler import GLOBAL_BINDINGS, TAB_BINDINGS, BUILD_BINDINGS
+from utils.constants import (KEY_1, KEY_2, KEY_3, KEY_B, KEY_E, KEY_S, KEY_W, KEY_X, KEY_RETURN, KEY_SPACE,
+                             KEY_LEFT, KEY_RIGHT, KEY_UP, KEY_DOWN)
+
+# Environnements d'entraînement (interface à la Gym) au-dessus de BatchSimulation :
+# - TowerDefenseEnv : une partie, reset() / step(action) ;
+# - VectorEnv : N parties avancées ensemble dans le processus, relancées
+#   automatiquement à leur fin ;
+# - ShardedVectorEnv : les N parties réparties entre plusieurs processus.
+# Les actions sont celles de TcodInputHandler ; un achat trop cher est
+# ignoré, comme la touche correspondante en jeu. En mode construction,
+# les déplacements portent sur le curseur et les améliorations sur la
+# tour construite qui s'y trouve (la tour principale sinon).
+
+ACTION_NAMES = ('noop', 'damage', 'range', 'fire_rate', 'hp', 'next_wave',
+                'left', 'right', 'up', 'down', 'cycle_weapon', 'cycle_effect',
+                'toggle_build', 'place_tower', 'sell_tower')
+
+ACTIONS: List[Dict[str, Any]] = [
+    {},
+    TAB_BINDINGS['attack'][KEY_1],
+    TAB_BINDINGS['attack'][KEY_2],
+    TAB_BINDINGS['attack'][KEY_S],
+    TAB_BINDINGS['defense'][KEY_3],
+    GLOBAL_BINDINGS[KEY_SPACE],
+    GLOBAL_BINDINGS[KEY_LEFT],
+    GLOBAL_BINDINGS[KEY_RIGHT],
+    GLOBAL_BINDINGS[KEY_UP],
+    GLOBAL_BINDINGS[KEY_DOWN],
+    TAB_BINDINGS['attack'][KEY_W],
+    TAB_BINDINGS['attack'][KEY_E],
+    GLOBAL_BINDINGS[KEY_B],
+    BUILD_BINDINGS[KEY_RETURN],
+    BUILD_BINDINGS[KEY_X],
+]
+
+ACTION_COSTS = np.array([action.get('cost', 0) for action in ACTIONS], dtype=np.int64)
+
+# Observation : valeurs de la partie, puis (dx, dy, pv) des ennemis les plus proches de la tour
+SCALAR_NAMES = ('score', 'tower_hp', 'max_tower_hp', 'current_wave', 'tower_x', 'tower_y', 'tower_range',
+                'tower_damage', 'tower_fire_rate', 'tower_reload_progress', 'tower_weapon', 'tower_effect',
+                'spawned_count', 'build_mode', 'cursor_x', 'cursor_y')
+NEAREST_ENEMIES = 8
+
+def observation_size(nearest: int = NEAREST_ENEMIES) -> int:
+    """Nombre de valeurs d'une observation"""
+    return len(SCALAR_NAMES) + 1 + 3 * nearest
+
+def observe(batch: BatchSimulation, nearest: int = NEAREST_ENEMIES,
+            out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Observations de toutes les parties, tableau (parties, observation_size) en float32.
+
+    Colonnes : SCALAR_NAMES, nombre d'ennemis présents, puis pour les
+    ``nearest`` ennemis les plus proches de la tour leur écart (en cases)
+    et leurs points de vie ; les places libres valent 0.
+    """
+    if out is None:
+        out = np.empty((batch.count, observation_size(nearest)), dtype=np.float32)
+    for column, name in enumerate(SCALAR_NAMES):
+        out[:, column] = getattr(batch, name)
+
+    games = batch.enemies[:, EGAME]
+    out[:, len(SCALAR_NAMES)] = np.bincount(games, minlength=batch.count)
+    base = len(SCALAR_NAMES) + 1
+    out[:, base:] = 0
+    if len(games) == 0 or nearest == 0:
+        return out
+
+    dx = to_cells(batch.enemies[:, EX]) - batch.tower_x[games]
+    dy = to_cells(batch.enemies[:, EY]) - batch.tower_y[games]
+    # Tri par partie puis par distance : deux passes stables (bien plus rapide que lexsort)
+    order = stable_argsort(dx * dx + dy * dy)
+    order = order[stable_argsort(games[order])]
+    sorted_games = games[order]
+    rank = np.arange(len(order)) - np.searchsorted(sorted_games, sorted_games)
+    kept = rank < nearest
+    order, rows, rank = order[kept], sorted_games[kept], rank[kept]
+    columns = base + 3 * rank
+    out[rows, columns] = dx[order]
+    out[rows, columns + 1] = dy[order]
+    out[rows, columns + 2] = batch.enemies[order, EHP]
+    return out
+
+def evaluate(batch: BatchSimulation) -> np.ndarray:
+    """Valeur de chaque partie (même formule que core.planner.evaluate)"""
+    return (batch.score + TOWER_HP_WEIGHT * batch.tower_hp - GAME_OVER_PENALTY * batch.game_over).astype(np.float64)
+
+class VectorEnv:
+    """
+    N parties indépendantes avancées ensemble (pas synchronisés).
+
+    step() reçoit une action (indice dans ACTIONS) par partie, avance de
+    ``ticks_per_step`` ticks et retourne les observations, récompenses
+    (variation de la valeur de planner.evaluate), fins de partie et
+    coupures à ``max_steps``. Une partie finie est relancée aussitôt ;
+    sa dernière observation est dans info['final_observation'].
+    """
+    def __init__(self, num_envs: int, world_width: int = 40, world_height: int = 30,
+                 seed: Optional[int] = None, ticks_per_step: int = 1, max_steps: int = 1000,
+                 delta_time: float = 0.1, nearest: int = NEAREST_ENEMIES, autoreset: bool = True):
+        self.num_envs = num_envs
+        self.ticks_per_step = ticks_per_step
+        self.max_steps = max_steps
+        self.delta_time = delta_time
+        self.nearest = nearest
+        self.autoreset = autoreset
+        self.observation_size = observation_size(nearest)
+        self.action_count = len(ACTIONS)
+
+        self.seeds = random.Random(seed)
+        self.batch = BatchSimulation(num_envs, world_width, world_height, self._seeds(num_envs))
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.values = evaluate(self.batch)
+        self.observations = np.empty((num_envs, self.observation_size), dtype=np.float32)
+
+    def _seeds(self, count: int) -> List[int]:
+        """Graines des prochaines parties (reproductibles si l'environnement a une graine)"""
+        return [self.seeds.getrandbits(32) for _ in range(count)]
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Relance toutes les parties ; retourne (observations, info)"""
+        if seed is not None:
+            self.seeds = random.Random(seed)
+        self._reset_games(np.arange(self.num_envs))
+        return observe(self.batch, self.nearest, self.observations).copy(), self._info()
+
+    def _reset_games(self, games: np.ndarray) -> None:
+        """Relance des parties"""
+        self.batch.reset(games, self._seeds(len(games)))
+        self.steps[games] = 0
+        self.values[games] = evaluate(self.batch)[games]
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """Applique une action par partie et avance ; retourne (obs, récompenses, terminées, coupées, info)"""
+        actions = np.asarray(actions, dtype=np.int64)
+        batch = self.batch
+        # Achat trop cher : ignoré, comme par TcodInputHandler
+        actions = np.where(batch.score >= ACTION_COSTS[actions], actions, 0)
+        batch.apply_actions(ACTIONS, actions)
+        for _ in range(self.ticks_per_step):
+            batch.step(self.delta_time)
+
+        values = evaluate(batch)
+        rewards = values - self.values
+        self.values = values
+        self.steps += 1
+        terminated = batch.game_over.copy()
+        truncated = ~terminated & (self.steps >= self.max_steps)
+
+        observations = observe(batch, self.nearest, self.observations)
+        info = self._info()
+        done = np.flatnonzero(terminated | truncated)
+        if self.autoreset and len(done):
+            info['final_observation'] = observations.copy()
+            self._reset_games(done)
+            observations = observe(batch, self.nearest, self.observations)
+        return observations.copy(), rewards, terminated, truncated, info
+
+    def _info(self) -> Dict[str, Any]:
+        """Informations par partie, au format de game_state"""
+        return {name: values.copy() for name, values in self.batch.summary().items()}
+
+    def close(self) -> None:
+        """Rien à libérer (interface commune avec ShardedVectorEnv)"""
+
+class TowerDefenseEnv:
+    """Une seule partie : reset() et step(action) retournent des valeurs scalaires"""
+    def __init__(self, **options):
+        self.vector = VectorEnv(1, autoreset=False, **options)
+        self.observation_size = self.vector.observation_size
+        self.action_count = self.vector.action_count
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Nouvelle partie ; retourne (observation, info)"""
+        observations, info = self.vector.reset(seed)
+        return observations[0], {name: values[0].item() for name, values in info.items()}
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
+        """Applique une action et avance ; retourne (obs, récompense, terminée, coupée, info)"""
+        observations, rewards, terminated, truncated, info = self.vector.step(np.array([action]))
+        return (observations[0], float(rewards[0]), bool(terminated[0]), bool(truncated[0]),
+                {name: values[0].item() for name, values in info.items()})
+
+    def close(self) -> None:
+        self.vector.close()
+
+# Informations par partie (clés de BatchSimulation.summary) : nom -> type
+INFO_FIELDS = {'game_over': '?', 'score': 'i8', 'wave': 'i8', 'tower_hp': 'i8', 'max_tower_hp': 'i8'}
+
+# Tampons partagés de ShardedVectorEnv : nom -> (colonnes, type) ; 0 colonne = taille d'observation
+_BUFFERS = {
+    'actions': (1, 'i8'),
+    'observations': (0, 'f4'),
+    'final_observation': (0, 'f4'),
+    'rewards': (1, 'f8'),
+    'terminated': (1, 'i1'),
+    'truncated': (1, 'i1'),
+    **{name: (1, dtype) for name, dtype in INFO_FIELDS.items()},
+}
+
+def _shard_worker(start: int, stop: int, specs: Dict[str, Tuple], options: Dict[str, Any], connection) -> None:
+    """
+    Processus d'un groupe de parties : un VectorEnv qui lit ses actions et
+    écrit ses résultats dans les lignes [start, stop) des tampons partagés
+    """
+    # Les parties sont déjà réparties entre processus : pas de fils Numba en plus
+    if kernels.backend == 'numba':
+        kernels.use_backend('numpy')
+
+    shared = {name: SharedArray(*spec) for name, spec in specs.items()}
+    buffers = {name: array.array[start:stop] for name, array in shared.items()}
+    env = VectorEnv(stop - start, **options)
+    try:
+        while True:
+            message = connection.recv()
+            command = message[0]
+
+            if command == 'stop':
+                break
+
+            if command == 'reset':
+                buffers['observations'][:], info = env.reset(message[1])
+            elif command == 'step':
+                (buffers['observations'][:], buffers['rewards'][:, 0], buffers['terminated'][:, 0],
+                 buffers['truncated'][:, 0], info) = env.step(buffers['actions'][:, 0])
+                buffers['final_observation'][:] = info.get('final_observation', buffers['observations'])
+
+            for name in INFO_FIELDS:
+                buffers[name][:, 0] = info[name]
+            connection.send(True)
+    finally:
+        buffers = None
+        for array in shared.values():
+            array.close()
+        connection.close()
+
+class ShardedVectorEnv:
+    """
+    VectorEnv réparti entre plusieurs processus.
+
+    Chaque processus avance un groupe de parties ; actions, observations
+    et récompenses passent par des tampons en mémoire partagée, seuls
+    des messages courts circulent dans les tubes. Même interface que
+    VectorEnv (info['final_observation'] est toujours présent).
+    """
+    def __init__(self, num_envs: int, shards: int = 4, seed: Optional[int] = None, **options):
+        self.num_envs = num_envs
+        self.observation_size = observation_size(options.get('nearest', NEAREST_ENEMIES))
+        self.action_count = len(ACTIONS)
+        self.shared = {name: SharedArray(num_envs, columns or self.observation_size, dtype=dtype)
+                       for name, (columns, dtype) in _BUFFERS.items()}
+        specs = {name: array.spec for name, array in self.shared.items()}
+
+        bounds = np.linspace(0, num_envs, shards + 1).astype(int)
+        context = kernels.process_context()
+        self.connections: List = []
+        self.processes: List = []
+        for shard in range(shards):
+            shard_seed = None if seed is None else seed * shards + shard
+            parent, child = context.Pipe()
+            process = context.Process(target=_shard_worker, daemon=True,
+                                      args=(int(bounds[shard]), int(bounds[shard + 1]), specs,
+                                            dict(options, seed=shard_seed), child))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def _broadcast(self, message) -> None:
+        """Envoie un message à tous les processus et attend leur réponse (barrière)"""
+        for connection in self.connections:
+            connection.send(message)
+        for connection in self.connections:
+            connection.recv()
+
+    def _info(self) -> Dict[str, Any]:
+        """Informations par partie, copiées des tampons partagés (mêmes clés que VectorEnv)"""
+        return {name: self.shared[name].array[:, 0].copy() for name in INFO_FIELDS}
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Relance toutes les parties ; retourne (observations, info)"""
+        for shard, connection in enumerate(self.connections):
+            connection.send(('reset', None if seed is None else seed * len(self.connections) + shard))
+        for connection in self.connections:
+            connection.recv()
+        return self.shared['observations'].array.copy(), self._info()
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """Applique une action par partie et avance ; retourne (obs, récompenses, terminées, coupées, info)"""
+        self.shared['actions'].array[:, 0] = actions
+        self._broadcast(('step',))
+        info = self._info()
+        info['final_observation'] = self.shared['final_observation'].array.copy()
+        return (self.shared['observations'].array.copy(), self.shared['rewards'].array[:, 0].copy(),
+                self.shared['terminated'].array[:, 0].astype(bool), self.shared['truncated'].array[:, 0].astype(bool),
+                info)
+
+    def close(self) -> None:
+        """Arrête les processus et libère la mémoire partagée"""
+        if not self.processes:
+            return
+        for connection in self.connections:
+            connection.send(('stop',))
+        for process in self.processes:
+            process.join()
+        for connection in self.connections:
+            connection.close()
+        self.connections = []
+        self.processes = []
+        for array in self.shared.values():
+            array.close(unlink=True)
+        self.shared = {}
+
+    def __enter__(self) -> 'ShardedVectorEnv':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,22 @@
+import numpy as np
+
+from utils.constants import FIXED_SHIFT, FIXED_HALF
+
+# Versions vectorisées des calculs en virgule fixe de models.position
+
+def to_cells(fixed: np.ndarray) -> np.ndarray:
+    """Case la plus proche de coordonnées en virgule fixe (voir models.position.to_cell)"""
+    return (fixed + FIXED_HALF) >> FIXED_SHIFT
+
+def div_round_array(a: np.ndarray, b) -> np.ndarray:
+    """Division entière arrondie, symétrique autour de zéro (voir models.position.div_round)"""
+    quotient = (np.abs(a) * 2 + b) // (b * 2)
+    return np.where(a >= 0, quotient, -quotient)
+
+def isqrt_array(values: np.ndarray) -> np.ndarray:
+    """Racine carrée entière (comme math.isqrt) d'un tableau d'entiers positifs"""
+    root = np.sqrt(values.astype(np.float64)).astype(np.int64)
+    # L'approximation flottante est exacte à une unité près : corriger
+    root -= root * root > values
+    root += (root + 1) * (root + 1) <= values
+    return root
@@ -0,0 +1,32 @@
+import importlib
+from typing import Dict, Type
+
+# Interfaces connues : nom -> "module:Classe"
+# Le module n'est importé qu'à la première utilisation, pour que la
+# simulation seule ne charge ni tcod ni SDL.
+FRONTENDS: Dict[str, str] = {
+    'tcod': 'core.tcod_ui:TcodUI',
+    'ansi': 'core.ansi_ui:AnsiUI',
+    'headless': 'core.headless_ui:HeadlessUI',
+}
+
+_loaded: Dict[str, Type] = {}
+
+def register_frontend(name: str, path: str) -> None:
+    """Enregistre une interface sous la forme "module:Classe" """
+    FRONTENDS[name] = path
+    _loaded.pop(name, None)
+
+def load_frontend(name: str) -> Type:
+    """Importe (une seule fois) et retourne la classe d'interface demandée"""
+    if name not in _loaded:
+        if name not in FRONTENDS:
+            raise ValueError(f"Interface inconnue : {name}")
+        module_name, class_name = FRONTENDS[name].split(':')
+        module = importlib.import_module(module_name)
+        _loaded[name] = getattr(module, class_name)
+    return _loaded[name]
+
+def create_frontend(name: str, *args, **kwargs):
+    """Crée une instance de l'interface demandée"""
+    return load_frontend(name)(*args, **kwargs)
@@ -1,23 +1,42 @@
 import time
-from typing import List, Dict, Any
+import random
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 
-from core.tcod_ui import TcodUI
+from core.frontends import create_frontend
 from core.tcod_input_handler import TcodInputHandler
-from models.position import Position
+from models.position import Position, to_cell
 from models.game_map import GameMap
+from models.coverage_map import CoverageMap
+from models.visibility_map import VisibilityMap
 from entities.tower import Tower
 from entities.enemy import Enemy
 from entities.projectile import Projectile
 from core.combat_system import CombatSystem
 from core.wave_manager import WaveManager
+from core.recorder import SessionRecorder
+from core.crowd import separate
+from core.effects import EffectSystem
+from core.memory import MemoryMonitor
+from core.metrics import GameMetrics
+from core.particles import ParticleSystem
+from core.watchdog import TickWatchdog
+from utils.constants import TOWER_COST, TOWER_REFUND
 
 class GameEngine:
     """
     Moteur de jeu principal
     """
+    # Pas du rewind avec les flèches haut/bas (1 s à 10 ticks par seconde)
+    REWIND_SECOND_TICKS = 10
+    
     def __init__(self, screen_width: int = 80, screen_height: int = 40,
                 map_width: int = 50, map_height: int = 30,
-                world_width: int = 100, world_height: int = 100):
+                world_width: int = 100, world_height: int = 100,
+                frontend: str = 'tcod', seed: Optional[int] = None,
+                record: Optional[str] = None, runs: Optional[str] = None,
+                metrics: Optional[str] = None, particles: str = 'high',
+                fog: bool = False):
         
         # Configuration de l'écran et de la carte
         self.screen_width = screen_width
@@ -34,12 +53,18 @@ class GameEngine:
             'tower_hp': 10,
             'max_tower_hp': 10,
             'current_tab': 'attack',
+            'build_mode': False,  # Les flèches déplacent le curseur de construction
             'game_speed': 0.1  # Temps entre chaque mise à jour (en secondes)
         }
         
         # Initialisation des composants
         self.game_map = GameMap(world_width, world_height)
-        self.ui = TcodUI(screen_width, screen_height, map_width, map_height)
+        self.frontend = frontend
+        self._ui = None  # Créée à la première utilisation (import paresseux)
+        self.record = record  # Fichier d'enregistrement de la partie (voir core.recorder)
+        self.runs = runs  # Base de l'historique des parties (voir core.run_store)
+        self.metrics_target = metrics  # Export des mesures : fichier OpenMetrics ou http://hôte:port
+        self.seed = seed
         self.input_handler = TcodInputHandler(self.game_state)
         
         # Position initiale de la tour
@@ -49,12 +74,37 @@ class GameEngine:
         self.tower = Tower(tower_position, range=5, damage=1, fire_rate=1.0)
         self.tower.hp = self.game_state['tower_hp']  # Synchroniser HP avec game_state
         self.towers: List[Tower] = [self.tower]
+        self.tower_cells: Dict[Tuple[int, int], Tower] = {(tower_position.x, tower_position.y): self.tower}
+        
+        # Couverture des cases par les tours, tenue à jour à chaque pose/vente/amélioration
+        self.coverage = CoverageMap(world_width, world_height)
+        self.coverage.add(self.tower)
+        self.game_state['coverage'] = self.coverage.counts
+        
+        # Lignes de vue des tours (murs de la grille) et brouillard de guerre, affiché sur demande
+        self.visibility = VisibilityMap(self.game_map)
+        self.visibility.add(self.tower)
+        self.game_state['visibility'] = self.visibility
+        self.game_state['fog'] = fog
+        
+        # Curseur du mode construction
+        self.cursor = Position(tower_position.x, tower_position.y)
+        self.game_state['build_cursor'] = self.cursor
         
-        # Système de combat
-        self.combat_system = CombatSystem()
+        # Mesures de jeu (compteurs, jauges, quantiles), tenues à jour par les sous-systèmes
+        self.metrics = GameMetrics()
+        
+        # Effets visuels (impacts, morts, tirs), sans effet sur la partie
+        self.particles = ParticleSystem(quality=particles, seed=seed)
+        self.game_state['particles'] = self.particles
+        
+        # Effets de statut des ennemis et système de combat
+        self.effects = EffectSystem()
+        self.combat_system = CombatSystem(self.coverage, self.effects, self.metrics, self.particles,
+                                          self.visibility)
         
         # Gestionnaire de vagues
-        self.wave_manager = WaveManager(self.game_map, tower_position)
+        self.wave_manager = WaveManager(self.game_map, tower_position, random.Random(seed), self.metrics)
         
         # Liste des entités
         self.enemies: List[Enemy] = []
@@ -63,14 +113,82 @@ class GameEngine:
         # Centrer la vue sur la tour
         self.game_map.center_viewport_on(tower_position)
         
+        # Historique des derniers ticks (rewind), créé au premier accès ; rewind_tick None : jeu en direct
+        self._rewind = None
+        self.rewind_tick: Optional[int] = None
+        
+        # Budget mémoire et ramasse-miettes (collecte entre les vagues)
+        self.memory = MemoryMonitor()
+        
+        # Budget de temps d'une trame : la qualité baisse plutôt que le rythme des ticks
+        self.watchdog = TickWatchdog(self.game_state['game_speed'])
+        
+        # Statistiques de la partie et de la vague en cours (historique)
+        self.run_store = None  # core.run_store.RunStore, ouvert par run() si self.runs
+        self.run_id: Optional[int] = None
+        self.ticks = 0
+        self.upgrades: Dict[str, int] = {}
+        self.wave_stats = self._new_wave_stats()
+        
         # Temps
         self.last_update_time = time.time()
     
+    @property
+    def ui(self):
+        """Interface d'affichage, chargée depuis le registre au premier accès"""
+        if self._ui is None:
+            self._ui = create_frontend(self.frontend, self.screen_width, self.screen_height,
+                                       self.map_width, self.map_height)
+        return self._ui
+    
+    @property
+    def rewind(self):
+        """Historique des derniers ticks (import paresseux de la simulation sur tableaux)"""
+        if self._rewind is None:
+            from core.rewind import RewindBuffer
+            self._rewind = RewindBuffer()
+        return self._rewind
+    
     def run(self):
         """Lance le jeu"""
         # Initialiser l'interface
         self.ui.initialize()
+        if self.record:
+            self.ui.recorder = SessionRecorder(self.record, self.screen_width, self.screen_height)
+        
+        if self.runs:
+            from core.run_store import RunStore
+            self.run_store = RunStore(self.runs)
+            self.run_id = self.run_store.start_run(seed=self.seed, frontend=self.frontend,
+                                                   params={'world': [self.game_map.width, self.game_map.height]})
         
+        # Export des mesures de jeu par un fil dédié
+        exporter = None
+        if self.metrics_target:
+            from core.metrics import MetricsExporter
+            exporter = MetricsExporter(self.metrics.registry, self.metrics_target)
+            exporter.start()
+        
+        # Les objets du démarrage (carte, interface, tables) ne sont plus parcourus par le GC
+        self.memory.start()
+        
+        try:
+            self._loop()
+        finally:
+            self.memory.stop()
+            if exporter is not None:
+                exporter.stop()
+            if self.run_store is not None:
+                self._close_wave()
+                self.run_store.finish_run(self.run_id, self.game_state['score'], self.wave_manager.current_wave,
+                                          self.ticks, self.upgrades)
+                self.run_store.close()
+            if self.ui.recorder is not None:
+                self.ui.recorder.close()
+            self.ui.close()
+    
+    def _loop(self):
+        """Boucle principale du jeu"""
         while self.game_state['is_running']:
             # Calcul du delta time
             current_time = time.time()
@@ -83,22 +201,32 @@ class GameEngine:
                 delta_time = current_time - self.last_update_time
             
             self.last_update_time = current_time
+            self.watchdog.begin_frame()
             
-            # Traiter les entrées
-            event = self.ui.check_for_event()
+            # Traiter toutes les entrées reçues depuis la trame précédente
+            with self.watchdog.phase('input'):
+                events = self.ui.poll_events()
+                if events:
+                    self._handle_input(events)
             
             # Mettre à jour la currentTab de l'UI basé sur le gameState
             self.ui.current_tab = self.game_state['current_tab']
             
-            if event:
-                self._handle_input(event)
-            
-            # Mettre à jour l'état du jeu
-            if not self.game_state['game_over']:
-                self._update(delta_time)
+            # Mettre à jour l'état du jeu (en pause pendant le rewind)
+            if not self.game_state['game_over'] and self.rewind_tick is None:
+                with self.watchdog.phase('update'):
+                    tick_start = time.perf_counter()
+                    self._update(delta_time)
+                    self._record_tick(time.perf_counter() - tick_start)
+                    self.rewind.record(self.fork())
+                    self.memory.update(self)
             
-            # Afficher l'état du jeu
-            self._render()
+            # Afficher l'état du jeu (une trame sur deux si le budget est dépassé)
+            self.game_state['quality'] = self.watchdog.status()
+            if self.watchdog.should_render() or self.rewind_tick is not None:
+                with self.watchdog.phase('render'):
+                    self._render()
+            self.watchdog.end_frame()
             
             # Synchroniser l'état de la tour avec game_state
             self.tower.hp = self.game_state['tower_hp']
@@ -107,105 +235,321 @@ class GameEngine:
             if self.game_state['tower_hp'] <= 0:
                 self.game_state['game_over'] = True
             
-            # Si Game Over, attendre une touche pour quitter
-            if self.game_state['game_over']:
+            # Si Game Over, attendre une touche pour quitter (ou R pour revoir la fin)
+            if self.game_state['game_over'] and self.rewind_tick is None:
                 self._render()  # Afficher l'écran de Game Over
-                self.ui.wait_for_keypress()
-                self.game_state['is_running'] = False
+                event = self.ui.wait_for_keypress()
+                if self.input_handler.handle_input(event).get('rewind') and len(self.rewind):
+                    self.rewind_tick = self.rewind.last_tick
+                else:
+                    self.game_state['is_running'] = False
     
-    def _handle_input(self, event: Dict[str, Any]):
-        """Traite les entrées utilisateur"""
-        action = self.input_handler.handle_input(event)
+    def fork(self):
+        """Retourne une simulation indépendante (sans interface) de l'état courant (core.simulation)"""
+        from core.simulation import Simulation
+        return Simulation.from_engine(self)
+    
+    def _handle_input(self, events: List[Dict[str, Any]]):
+        """Traite les entrées utilisateur d'une trame et mesure leur latence"""
+        actions = self.input_handler.handle_events(events)
+        for action in actions:
+            self._apply_action(action)
         
+        # Latence entrée -> action : la plus grande de la trame (en secondes)
+        now = time.perf_counter()
+        latencies = [now - action['time'] for action in actions if 'time' in action]
+        if latencies:
+            self.game_state['input_latency'] = max(latencies)
+    
+    def _apply_action(self, action: Dict[str, Any]):
+        """Applique une action du gestionnaire d'entrée"""
         if action.get('quit'):
             self.game_state['is_running'] = False
         
+        # Entrer dans l'historique ou revenir au direct
+        if action.get('rewind'):
+            if self.rewind_tick is None and len(self.rewind):
+                self.rewind_tick = self.rewind.last_tick
+            else:
+                self.rewind_tick = None
+            return
+        
+        # Pendant le rewind, les flèches parcourent l'historique
+        # (gauche/droite : un tick, haut/bas : une seconde)
+        if self.rewind_tick is not None:
+            if action.get('move'):
+                for dx, dy in action.get('steps', (action['move'],)):
+                    step = dx + dy * self.REWIND_SECOND_TICKS
+                    self.rewind_tick = max(self.rewind.first_tick,
+                                           min(self.rewind.last_tick, self.rewind_tick + step))
+            return
+        
         # Changement d'onglet
         if action.get('change_tab'):
             self.game_state['current_tab'] = action['change_tab']
         
-        # Déplacement de la tour
-        if action.get('move') and self.tower:
-            dx, dy = action['move']
-            self.tower.position.x += dx
-            self.tower.position.y += dy
+        # Entrer dans le mode construction ou en sortir
+        if action.get('toggle_build'):
+            self.game_state['build_mode'] = not self.game_state['build_mode']
+            self.cursor.x, self.cursor.y = self.tower.position.x, self.tower.position.y
+            self.game_map.center_viewport_on(self.tower.position)
+        
+        # Déplacement du curseur (mode construction) ou de la tour principale,
+        # pas à pas pour les déplacements regroupés d'une trame ('steps')
+        if action.get('move') and self.game_state['build_mode']:
+            for dx, dy in action.get('steps', (action['move'],)):
+                self.cursor.x = max(0, min(self.cursor.x + dx, self.game_map.width - 1))
+                self.cursor.y = max(0, min(self.cursor.y + dy, self.game_map.height - 1))
+            self.game_map.center_viewport_on(self.cursor)
+        elif action.get('move') and self.tower:
+            # Maintenir la tour dans les limites de la carte, hors des cases déjà construites
+            x, y = self.tower.position.x, self.tower.position.y
+            for dx, dy in action.get('steps', (action['move'],)):
+                step_x = max(0, min(x + dx, self.game_map.width - 1))
+                step_y = max(0, min(y + dy, self.game_map.height - 1))
+                if self.tower_cells.get((step_x, step_y), self.tower) is self.tower:
+                    x, y = step_x, step_y
             
-            # Maintenir la tour dans les limites de la carte
-            self.tower.position.x = max(0, min(self.tower.position.x, self.game_map.width - 1))
-            self.tower.position.y = max(0, min(self.tower.position.y, self.game_map.height - 1))
+            # Couverture et lignes de vue mises à jour une fois, à l'arrivée
+            if (x, y) != (self.tower.position.x, self.tower.position.y):
+                del self.tower_cells[(self.tower.position.x, self.tower.position.y)]
+                self.tower.position.x = x
+                self.tower.position.y = y
+                self.tower_cells[(x, y)] = self.tower
+                self.coverage.update(self.tower)
+                self.visibility.update(self.tower)
             
             # Centrer la vue sur la tour
             self.game_map.center_viewport_on(self.tower.position)
         
-        # Amélioration de la tour
-        if action.get('upgrade'):
+        # Construction
+        if action.get('place_tower'):
+            self._place_tower()
+        if action.get('sell_tower'):
+            self._sell_tower()
+        
+        # Amélioration de la tour (celle sous le curseur en mode construction) ;
+        # le score a pu baisser depuis la traduction (tour posée dans la même trame)
+        if action.get('upgrade') and self.game_state['score'] >= action['cost']:
             upgrade_type = action['upgrade']
             cost = action['cost']
+            tower = self._selected_tower()
             
             # Soustraire le coût
             self.game_state['score'] -= cost
+            self.upgrades[upgrade_type] = self.upgrades.get(upgrade_type, 0) + 1
             
             if upgrade_type == 'damage':
-                self.tower.upgrade_damage()
+                tower.upgrade_damage()
             elif upgrade_type == 'range':
-                self.tower.upgrade_range()
+                tower.upgrade_range()
+                self.coverage.update(tower)
+                self.visibility.update(tower)
             elif upgrade_type == 'fire_rate':
-                self.tower.upgrade_fire_rate()
+                tower.upgrade_fire_rate()
             elif upgrade_type == 'hp':
                 self.game_state['max_tower_hp'] += 5
                 self.game_state['tower_hp'] += 5
         
+        # Changement d'arme ou d'effet de statut
+        if action.get('cycle_weapon'):
+            self._selected_tower().cycle_weapon()
+        if action.get('cycle_effect'):
+            self._selected_tower().cycle_effect()
+        
         # Déclencher une nouvelle vague
         if action.get('next_wave'):
+            self._close_wave()
             self.wave_manager.next_wave()
     
+    def _selected_tower(self) -> Tower:
+        """Tour visée par les améliorations : sous le curseur en mode construction, sinon la tour principale"""
+        if self.game_state['build_mode']:
+            return self.tower_cells.get((self.cursor.x, self.cursor.y), self.tower)
+        return self.tower
+    
+    def _place_tower(self):
+        """Construit une tour sur la case du curseur si elle est libre et payable"""
+        cell = (self.cursor.x, self.cursor.y)
+        if cell in self.tower_cells or self.game_state['score'] < TOWER_COST:
+            return
+        
+        tower = Tower(Position(*cell), range=3, damage=1, fire_rate=1.0)
+        self.game_state['score'] -= TOWER_COST
+        self.towers.append(tower)
+        self.tower_cells[cell] = tower
+        self.coverage.add(tower)
+        self.visibility.add(tower)
+    
+    def _sell_tower(self):
+        """Vend la tour sous le curseur (la tour principale ne peut pas être vendue)"""
+        tower = self.tower_cells.get((self.cursor.x, self.cursor.y))
+        if tower is None or tower is self.tower:
+            return
+        
+        self.game_state['score'] += TOWER_REFUND
+        self.towers.remove(tower)
+        del self.tower_cells[(self.cursor.x, self.cursor.y)]
+        self.coverage.remove(tower)
+        self.visibility.remove(tower)
+    
     def _update(self, delta_time: float):
         """Met à jour l'état du jeu"""
         # Générer de nouveaux ennemis
         new_enemies = self.wave_manager.update(delta_time)
         self.enemies.extend(new_enemies)
+        if new_enemies:
+            self.memory.check_enemies(self)
         
         # Mettre à jour les ennemis
         self._update_enemies(delta_time)
         
-        # Mettre à jour le système de combat
+        # Mettre à jour le système de combat (les particules sous charge réduite)
+        self.particles.throttle = 0.25 if self.watchdog.active('particles') else 1.0
+        self.particles.update(delta_time)
         self.combat_system.update(self.towers, self.enemies, self.game_map, delta_time)
         
+        # Sous charge : projectiles superposés de même trajectoire fusionnés
+        if self.watchdog.active('merge_projectiles'):
+            self.combat_system.merge_projectiles()
+        
         # Récupérer les projectiles du système de combat
         self.projectiles = self.combat_system.projectiles
         
         # Vérifier si tous les ennemis sont vaincus
         if len(self.enemies) == 0 and self.wave_manager.all_enemies_defeated():
+            self._close_wave()
             self.wave_manager.next_wave()
             self.game_state['wave'] = self.wave_manager.current_wave
+            self.memory.wave_boundary(self)
     
     def _update_enemies(self, delta_time: float):
         """Met à jour les ennemis"""
+        # Effets de statut : fins échues, vitesse et dégâts continus, en un seul passage
+        self.effects.update(delta_time)
+        
+        if self.watchdog.active('coarse_offscreen'):
+            self._update_enemies_coarse(delta_time)
+        else:
+            for enemy in self.enemies:
+                enemy.update(delta_time)
+        
+        # Séparation de la foule, en une passe sur tous les ennemis
+        self._separate_enemies(delta_time)
+        
         remaining_enemies = []
+        deaths = []
         
         for enemy in self.enemies:
-            enemy.update(delta_time)
-            
             # Vérifier si l'ennemi a atteint la tour
             if enemy.has_reached_target():
                 # Infliger des dégâts à la tour
                 self.game_state['tower_hp'] -= 1
+                self.wave_stats['leaks'] += 1
+                self.metrics.leaked.inc()
                 self.wave_manager.remove_enemy(enemy)
+                self.effects.release(enemy)
             elif not enemy.is_alive():
                 # L'ennemi est mort, ajouter des points
                 self.game_state['score'] += enemy.value
+                self.wave_stats['kills'] += 1
+                self.metrics.killed.inc()
+                self.metrics.score_earned.inc(enemy.value)
+                deaths.append(enemy.position)
                 self.wave_manager.remove_enemy(enemy)
+                self.effects.release(enemy)
             else:
                 remaining_enemies.append(enemy)
         
         self.enemies = remaining_enemies
+        if deaths:
+            self.particles.emit('death', [p.x for p in deaths], [p.y for p in deaths])
+    
+    def _update_enemies_coarse(self, delta_time: float):
+        """Déplace les ennemis, ceux hors de la vue un tick sur deux (de deux ticks à la fois)"""
+        game_map = self.game_map
+        left, top = game_map.viewport_x, game_map.viewport_y
+        right, bottom = left + game_map.viewport_width, top + game_map.viewport_height
+        parity = self.ticks % 2
+        
+        for enemy in self.enemies:
+            position = enemy.position
+            if left <= position.x < right and top <= position.y < bottom:
+                enemy.update(delta_time)
+            elif enemy.serial % 2 == parity:  # Moitié des ennemis à chaque tick, selon leur numéro
+                enemy.update(delta_time * 2)
+    
+    def _new_wave_stats(self) -> Dict[str, Any]:
+        """Compteurs d'une vague qui commence"""
+        return {'ticks': 0, 'kills': 0, 'leaks': 0, 'tick_time': 0.0, 'tick_max': 0.0,
+                'damage_start': self.combat_system.damage_dealt}
+    
+    def _record_tick(self, duration: float):
+        """Compte un tick de jeu et sa durée (secondes)"""
+        self.ticks += 1
+        stats = self.wave_stats
+        stats['ticks'] += 1
+        stats['tick_time'] += duration
+        stats['tick_max'] = max(stats['tick_max'], duration)
+        
+        metrics = self.metrics
+        metrics.tick_seconds.observe(duration)
+        metrics.enemies.set(len(self.enemies))
+        metrics.projectiles.set(len(self.projectiles))
+        metrics.towers.set(len(self.towers))
+        metrics.score.set(self.game_state['score'])
+        metrics.tower_hp.set(self.game_state['tower_hp'])
+    
+    def _close_wave(self):
+        """Enregistre les statistiques de la vague en cours (si elle a duré) et en commence d'autres"""
+        stats = self.wave_stats
+        if self.run_store is not None and stats['ticks']:
+            stats['damage'] = self.combat_system.damage_dealt - stats['damage_start']
+            stats['score'] = self.game_state['score']
+            self.run_store.record_wave(self.run_id, self.wave_manager.current_wave, stats)
+        self.wave_stats = self._new_wave_stats()
+    
+    def _separate_enemies(self, delta_time: float):
+        """Écarte les ennemis empilés sur les mêmes cases (voir core.crowd)"""
+        if len(self.enemies) < 2:
+            return
+        
+        count = len(self.enemies)
+        xs = np.fromiter((enemy.fx for enemy in self.enemies), dtype=np.int64, count=count)
+        ys = np.fromiter((enemy.fy for enemy in self.enemies), dtype=np.int64, count=count)
+        xs, ys = separate(xs, ys, self.game_map.width, self.game_map.height, delta_time)
+        
+        for enemy, x, y in zip(self.enemies, xs.tolist(), ys.tolist()):
+            enemy.fx, enemy.fy = x, y
+            enemy.position.x = to_cell(x)
+            enemy.position.y = to_cell(y)
     
     def _render(self):
         """Affiche l'état du jeu"""
+        if self.rewind_tick is not None:
+            self._render_rewind()
+            return
+        
         self.ui.render(
             self.game_map,
             self.towers,
             self.enemies,
             self.projectiles,
             self.game_state
-        )
\ No newline at end of file
+        )
+    
+    def _render_rewind(self):
+        """Affiche un tick de l'historique à la place de l'état courant"""
+        snapshot = self.rewind.seek(self.rewind_tick)
+        towers, enemies, projectiles = snapshot.to_entities()
+        
+        game_state = dict(self.game_state)
+        game_state.update(snapshot.summary())
+        game_state['build_mode'] = False
+        game_state['particles'] = None
+        game_state['rewind'] = {
+            'offset': (self.rewind_tick - self.rewind.last_tick) * self.game_state['game_speed'],
+            'bytes': self.rewind.bytes_used,
+        }
+        
+        self.ui.render(self.game_map, towers, enemies, projectiles, game_state)
@@ -0,0 +1,27 @@
+from typing import List, Dict, Any
+from core.renderer import Renderer
+
+class HeadlessUI(Renderer):
+    """
+    Interface vide pour les exécutions sans affichage (tests, lots de parties)
+    """
+    def initialize(self):
+        """Aucun affichage à préparer"""
+        pass
+    
+    def render(self, game_map, towers: List, enemies: List,
+               projectiles: List, game_state: Dict[str, Any]):
+        """Ne dessine rien"""
+        pass
+    
+    def present(self):
+        """Ne présente rien"""
+        pass
+    
+    def wait_for_keypress(self) -> Dict:
+        """Aucune touche à attendre"""
+        return {}
+    
+    def check_for_event(self) -> Dict:
+        """Aucun événement"""
+        return {}
@@ -0,0 +1,235 @@
+import importlib.util
+import math
+import os
+import time
+from typing import Callable, Dict, Tuple
+import numpy as np
+
+from core.fixed_array import div_round_array, isqrt_array
+from utils.constants import MICROSECONDS
+
+# Noyaux de calcul sur tableaux (déplacement, ciblage, collisions), en trois
+# versions aux résultats identiques (arithmétique entière) :
+# - 'numpy' : opérations vectorisées, toujours disponible ;
+# - 'python' : boucles simples, la référence lisible (lente) ;
+# - 'numba' : les mêmes boucles compilées et parallélisées, si Numba est
+#   installé, avec compilation mise en cache sur disque (voir warm_up) ;
+#   sur demande seulement (TOWER_KERNELS=numba) : Numba n'est importé
+#   qu'à ce moment-là, son import coûte plus que le reste du jeu.
+# Le module expose les noyaux de la version active ; use_backend() en change.
+
+# Boucle parallèle : range, remplacé par numba.prange au chargement de Numba
+prange = range
+
+# --- Version NumPy ---
+
+def _move_enemies_numpy(x: np.ndarray, y: np.ndarray, speed: np.ndarray,
+                        target_x: int, target_y: int, elapsed: int) -> None:
+    """Avance sur place chaque ennemi vers la cible, d'au plus speed * elapsed"""
+    dx = target_x - x
+    dy = target_y - y
+    distance = isqrt_array(dx * dx + dy * dy)
+    step = speed * elapsed // MICROSECONDS
+
+    arrived = distance <= step
+    safe_distance = np.where(arrived, 1, distance)
+    x[:] = np.where(arrived, target_x, x + div_round_array(dx * step, safe_distance))
+    y[:] = np.where(arrived, target_y, y + div_round_array(dy * step, safe_distance))
+
+def _move_projectiles_numpy(x: np.ndarray, y: np.ndarray, vx: np.ndarray, vy: np.ndarray,
+                            elapsed: int) -> None:
+    """Avance sur place chaque projectile de sa vitesse pendant elapsed microsecondes"""
+    x += div_round_array(vx * elapsed, MICROSECONDS)
+    y += div_round_array(vy * elapsed, MICROSECONDS)
+
+def _closest_in_range_numpy(enemy_x: np.ndarray, enemy_y: np.ndarray, tower_x: np.ndarray,
+                            tower_y: np.ndarray, ranges: np.ndarray) -> np.ndarray:
+    """Pour chaque tour, indice de l'ennemi (en cases) le plus proche à portée, -1 si aucun"""
+    targets = np.full(len(tower_x), -1, dtype=np.int64)
+    if len(enemy_x) == 0:
+        return targets
+    for tower in range(len(tower_x)):
+        dx = enemy_x - tower_x[tower]
+        dy = enemy_y - tower_y[tower]
+        distance = dx * dx + dy * dy
+        distance = np.where(distance <= ranges[tower] * ranges[tower], distance, np.iinfo(np.int64).max)
+        closest = int(np.argmin(distance))  # Premier indice en cas d'égalité
+        if distance[closest] != np.iinfo(np.int64).max:
+            targets[tower] = closest
+    return targets
+
+def _first_enemy_at_numpy(enemy_keys: np.ndarray, projectile_keys: np.ndarray, cells: int) -> np.ndarray:
+    """Pour chaque projectile, premier ennemi (ordre du tableau) sur sa case, -1 si aucun"""
+    first = np.full(len(projectile_keys), -1, dtype=np.int64)
+    if len(enemy_keys) == 0:
+        return first
+    keys, first_enemy = np.unique(enemy_keys, return_index=True)
+    slots = np.minimum(np.searchsorted(keys, projectile_keys), len(keys) - 1)
+    found = keys[slots] == projectile_keys
+    first[found] = first_enemy[slots[found]]
+    return first
+
+# --- Version en boucles (référence, compilée par Numba si disponible) ---
+
+# Les boucles n'appellent pas d'autres fonctions Python : Numba les compile
+# telles quelles (racine entière et division arrondie sont écrites en place).
+
+def _move_enemies_loop(x, y, speed, target_x, target_y, elapsed):
+    """Avance sur place chaque ennemi vers la cible, d'au plus speed * elapsed"""
+    for i in prange(len(x)):
+        dx = target_x - x[i]
+        dy = target_y - y[i]
+        squared = dx * dx + dy * dy
+        distance = np.int64(math.sqrt(squared))
+        if distance * distance > squared:
+            distance -= 1
+        if (distance + 1) * (distance + 1) <= squared:
+            distance += 1
+
+        step = speed[i] * elapsed // MICROSECONDS
+        if distance <= step:
+            x[i] = target_x
+            y[i] = target_y
+        else:
+            # Division arrondie, symétrique autour de zéro (voir models.position.div_round)
+            shift_x = (abs(dx * step) * 2 + distance) // (distance * 2)
+            shift_y = (abs(dy * step) * 2 + distance) // (distance * 2)
+            x[i] += shift_x if dx >= 0 else -shift_x
+            y[i] += shift_y if dy >= 0 else -shift_y
+
+def _move_projectiles_loop(x, y, vx, vy, elapsed):
+    """Avance sur place chaque projectile de sa vitesse pendant elapsed microsecondes"""
+    for i in prange(len(x)):
+        shift_x = (abs(vx[i] * elapsed) * 2 + MICROSECONDS) // (MICROSECONDS * 2)
+        shift_y = (abs(vy[i] * elapsed) * 2 + MICROSECONDS) // (MICROSECONDS * 2)
+        x[i] += shift_x if vx[i] >= 0 else -shift_x
+        y[i] += shift_y if vy[i] >= 0 else -shift_y
+
+def _closest_in_range_loop(enemy_x, enemy_y, tower_x, tower_y, ranges):
+    """Pour chaque tour, indice de l'ennemi (en cases) le plus proche à portée, -1 si aucun"""
+    targets = np.full(len(tower_x), -1, dtype=np.int64)
+    for tower in prange(len(tower_x)):
+        best = ranges[tower] * ranges[tower] + 1
+        for i in range(len(enemy_x)):
+            dx = enemy_x[i] - tower_x[tower]
+            dy = enemy_y[i] - tower_y[tower]
+            distance = dx * dx + dy * dy
+            if distance < best:
+                best = distance
+                targets[tower] = i
+    return targets
+
+def _first_enemy_at_loop(enemy_keys, projectile_keys, table):
+    """
+    Pour chaque projectile, premier ennemi (ordre du tableau) sur sa case,
+    -1 si aucun ; ``table`` a une case par case de la carte, toutes à -1,
+    et est rendue dans cet état
+    """
+    # Table dense des cases : parcourue à l'envers, le premier ennemi écrit en dernier
+    cells = len(table)
+    for i in range(len(enemy_keys) - 1, -1, -1):
+        if 0 <= enemy_keys[i] < cells:
+            table[enemy_keys[i]] = i
+    first = np.full(len(projectile_keys), -1, dtype=np.int64)
+    for j in prange(len(projectile_keys)):
+        if 0 <= projectile_keys[j] < cells:
+            first[j] = table[projectile_keys[j]]
+    for i in range(len(enemy_keys)):
+        if 0 <= enemy_keys[i] < cells:
+            table[enemy_keys[i]] = -1
+    return first
+
+# Tables des cases de _first_enemy_at_loop, une par taille de carte, réutilisées d'un appel à l'autre
+_tables: Dict[int, np.ndarray] = {}
+
+def _with_table(kernel: Callable) -> Callable:
+    """first_enemy_at(enemy_keys, projectile_keys, cells) sur une table des cases déjà allouée"""
+    def first_enemy_at(enemy_keys, projectile_keys, cells):
+        table = _tables.get(cells)
+        if table is None:
+            table = _tables[cells] = np.full(cells, -1, dtype=np.int64)
+        return kernel(enemy_keys, projectile_keys, table)
+    return first_enemy_at
+
+KERNEL_NAMES = ('move_enemies', 'move_projectiles', 'closest_in_range', 'first_enemy_at')
+
+BACKENDS: Dict[str, Dict[str, Callable]] = {
+    'numpy': {
+        'move_enemies': _move_enemies_numpy,
+        'move_projectiles': _move_projectiles_numpy,
+        'closest_in_range': _closest_in_range_numpy,
+        'first_enemy_at': _first_enemy_at_numpy,
+    },
+    'python': {
+        'move_enemies': _move_enemies_loop,
+        'move_projectiles': _move_projectiles_loop,
+        'closest_in_range': _closest_in_range_loop,
+        'first_enemy_at': _with_table(_first_enemy_at_loop),
+    },
+}
+
+def _load_numba() -> None:
+    """Importe Numba et ajoute la version 'numba' (boucles compilées au premier appel)"""
+    global prange
+    import numba
+    # Les boucles lisent prange à la compilation : parallèles une fois compilées
+    prange = numba.prange
+    BACKENDS['numba'] = {
+        'move_enemies': numba.njit(parallel=True, cache=True)(_move_enemies_loop),
+        'move_projectiles': numba.njit(parallel=True, cache=True)(_move_projectiles_loop),
+        'closest_in_range': numba.njit(parallel=True, cache=True)(_closest_in_range_loop),
+        'first_enemy_at': _with_table(numba.njit(parallel=True, cache=True)(_first_enemy_at_loop)),
+    }
+
+def available_backends() -> Tuple[str, ...]:
+    """Versions utilisables ; 'numba' si Numba est installé (sans l'importer)"""
+    names = tuple(BACKENDS)
+    if 'numba' not in BACKENDS and importlib.util.find_spec('numba') is not None:
+        names += ('numba',)
+    return names
+
+# Version par défaut : NumPy ; TOWER_KERNELS=numba pour les boucles compilées
+DEFAULT_BACKEND = os.environ.get('TOWER_KERNELS', 'numpy')
+backend = None
+
+move_enemies: Callable = None
+move_projectiles: Callable = None
+closest_in_range: Callable = None
+first_enemy_at: Callable = None
+
+def use_backend(name: str) -> None:
+    """Active une version des noyaux ('numpy', 'python' ou 'numba')"""
+    global backend
+    if name == 'numba' and name not in BACKENDS and importlib.util.find_spec('numba') is not None:
+        _load_numba()
+    if name not in BACKENDS:
+        raise ValueError(f"Version de noyaux indisponible : {name} "
+                         f"(disponibles : {', '.join(available_backends())})")
+    backend = name
+    globals().update(BACKENDS[name])
+
+def warm_up() -> float:
+    """
+    Compile les noyaux de la version active sur de petits tableaux ; avec
+    le cache de Numba, seul le premier lancement paie la compilation.
+    Retourne la durée (secondes).
+    """
+    start = time.perf_counter()
+    # Mêmes types que dans la Simulation : colonnes (non contiguës) de tableaux 2D
+    rows = np.zeros((2, 6), dtype=np.int64)
+    values = np.zeros(2, dtype=np.int64)
+    move_enemies(rows[:, 0], rows[:, 1], values, 0, 0, 1)
+    move_projectiles(rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3], 1)
+    closest_in_range(values, values, values, values, values)
+    first_enemy_at(values, values, 1)
+    return time.perf_counter() - start
+
+def process_context():
+    """
+    Contexte multiprocessing pour les processus de calcul : les fils de
+    Numba ne survivent pas à fork, de nouveaux processus sont alors lancés
+    """
+    import multiprocessing
+    return multiprocessing.get_context('spawn' if backend == 'numba' else None)
+
+use_backend(DEFAULT_BACKEND)
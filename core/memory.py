@@ -0,0 +1,269 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Suivi de la mémoire et pilotage du ramasse-miettes (GC) du jeu :
+# - les objets construits au démarrage sont gelés (gc.freeze) : les
+#   collectes suivantes ne les parcourent plus ;
+# - le seuil de la génération 0 est relevé, pour que les objets éphémères
+#   (Position, Projectile...) ne déclenchent pas de collecte en pleine
+#   vague ; la collecte est faite entre deux vagues ;
+# - les rapports (à la demande, ou périodiques avec TOWER_MEMORY=secondes)
+#   donnent les entités vivantes et, si tracemalloc est actif, les octets
+#   alloués par sous-système ; la croissance d'une vague à l'autre est signalée ;
+# - à chaque apparition de vague, les ennemis retirés du jeu mais encore
+#   suivis par le gestionnaire de vagues sont signalés et oubliés (sans
+#   cela, la vague en cours ne se terminerait jamais).
+
+# Seuils du GC pendant une partie (défaut de Python : 700, 10, 10)
+GC_THRESHOLDS = (50_000, 20, 20)
+# Croissance (octets) d'un sous-système entre deux vagues au-delà de laquelle une fuite est signalée
+LEAK_THRESHOLD = 256 * 1024
+# Rapport périodique (secondes) ; 0 : à la demande seulement
+DEFAULT_INTERVAL = float(os.environ.get('TOWER_MEMORY', 0))
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def subsystem_of(filename: str) -> str:
+    """Sous-système d'un fichier source : module du jeu (core.combat_system) ou paquet externe"""
+    if filename.startswith('<'):  # Modules gelés de Python
+        return 'python'
+    path = os.path.abspath(filename)
+    if path.startswith(PACKAGE_ROOT + os.sep):
+        module = os.path.relpath(path, PACKAGE_ROOT)
+        return os.path.splitext(module)[0].replace(os.sep, '.')
+    parts = path.split(os.sep)
+    if 'site-packages' in parts:
+        return parts[parts.index('site-packages') + 1].split('.')[0]
+    return 'python'
+
+def entity_counts(engine) -> Dict[str, int]:
+    """Entités vivantes de chaque sous-système d'un GameEngine"""
+    return {
+        'enemies': len(engine.enemies),
+        'projectiles': len(engine.combat_system.projectiles),
+        'towers': len(engine.towers),
+        'spawned_enemies': len(engine.wave_manager.spawned_enemies),
+        'effects': engine.effects.active,
+        'rewind_ticks': len(engine.rewind),
+    }
+
+def stale_enemies(engine) -> List:
+    """Ennemis encore suivis par le gestionnaire de vagues mais retirés du jeu"""
+    alive = set(map(id, engine.enemies))
+    return [enemy for enemy in engine.wave_manager.spawned_enemies if id(enemy) not in alive]
+
+class MemoryMonitor:
+    """
+    Budget mémoire d'une partie et contrôle du ramasse-miettes.
+
+    start() gèle les objets du démarrage et règle les seuils du GC,
+    wave_boundary() collecte entre deux vagues et compare la mémoire à
+    celle de la vague précédente, check_enemies() cherche les ennemis
+    orphelins à chaque apparition, update() fait les rapports périodiques.
+    Les pauses du GC sont mesurées, en distinguant celles survenues en
+    pleine vague.
+    """
+    def __init__(self, interval: float = DEFAULT_INTERVAL, trace: Optional[bool] = None,
+                 thresholds: Tuple[int, int, int] = GC_THRESHOLDS, history: int = 32):
+        self.interval = interval
+        self.trace = interval > 0 if trace is None else trace
+        self.thresholds = thresholds
+        self.reports: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.leaks: List[str] = []
+
+        # Pauses du GC : (génération, durée en secondes, en pleine vague)
+        self.pauses: Deque[Tuple[int, float, bool]] = deque(maxlen=1024)
+        self.in_wave = False
+        self._pause_start = 0.0
+
+        self._previous_thresholds: Optional[Tuple[int, int, int]] = None
+        self._wave_bytes: Optional[Dict[str, int]] = None
+        self._last_report = 0.0
+        self._started_tracing = False
+
+    # --- Ramasse-miettes ---
+
+    def start(self) -> None:
+        """À appeler une fois le jeu construit : gèle les objets présents et règle le GC"""
+        if self._previous_thresholds is not None:
+            return
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+        gc.collect()
+        gc.freeze()
+        self._previous_thresholds = gc.get_threshold()
+        gc.set_threshold(*self.thresholds)
+        gc.callbacks.append(self._on_gc)
+        self._last_report = time.perf_counter()
+
+    def stop(self) -> None:
+        """Rétablit le GC tel qu'avant start()"""
+        if self._previous_thresholds is None:
+            return
+        gc.callbacks.remove(self._on_gc)
+        gc.set_threshold(*self._previous_thresholds)
+        gc.unfreeze()
+        self._previous_thresholds = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _on_gc(self, phase: str, info: Dict[str, int]) -> None:
+        """Rappel du GC : mesure la durée de chaque collecte"""
+        if phase == 'start':
+            self._pause_start = time.perf_counter()
+        else:
+            self.pauses.append((info['generation'], time.perf_counter() - self._pause_start, self.in_wave))
+
+    def gc_stats(self) -> Dict[str, float]:
+        """Nombre et durée maximale (ms) des pauses du GC, en vague et entre les vagues"""
+        in_wave = [duration for _, duration, during in self.pauses if during]
+        between = [duration for _, duration, during in self.pauses if not during]
+        return {
+            'in_wave': len(in_wave),
+            'in_wave_max_ms': max(in_wave, default=0.0) * 1000,
+            'between_waves': len(between),
+            'between_waves_max_ms': max(between, default=0.0) * 1000,
+        }
+
+    # --- Rapports ---
+
+    def bytes_by_subsystem(self) -> Dict[str, int]:
+        """Octets alloués et encore vivants par sous-système (tracemalloc), du plus gros au plus petit"""
+        if not tracemalloc.is_tracing():
+            return {}
+        totals: Dict[str, int] = {}
+        for stat in tracemalloc.take_snapshot().statistics('filename'):
+            name = subsystem_of(stat.traceback[0].filename)
+            totals[name] = totals.get(name, 0) + stat.size
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+    def report(self, engine) -> Dict[str, Any]:
+        """Rapport immédiat : entités vivantes, octets par sous-système, GC"""
+        report = {
+            'time': time.perf_counter(),
+            'wave': engine.wave_manager.current_wave,
+            'entities': entity_counts(engine),
+            'bytes': self.bytes_by_subsystem(),
+            'gc': self.gc_stats(),
+            'gc_count': gc.get_count(),
+        }
+        self.reports.append(report)
+        return report
+
+    def update(self, engine) -> Optional[Dict[str, Any]]:
+        """À chaque tick : note si une vague est en cours et fait le rapport périodique s'il est dû"""
+        self.in_wave = bool(engine.enemies)
+        if self.interval <= 0:
+            return None
+        now = time.perf_counter()
+        if now - self._last_report < self.interval:
+            return None
+        self._last_report = now
+        return self.report(engine)
+
+    def check_enemies(self, engine) -> List[str]:
+        """
+        À chaque apparition de vague : signale et oublie les ennemis retirés
+        du jeu mais encore suivis par le gestionnaire de vagues. Retourne
+        les fuites trouvées.
+        """
+        leaks = []
+        stale = stale_enemies(engine)
+        if stale:
+            leaks.append(f"{len(stale)} ennemis retirés encore dans WaveManager.spawned_enemies")
+            engine.wave_manager.prune(engine.enemies)
+        self._signal(engine, leaks)
+        return leaks
+
+    def wave_boundary(self, engine) -> List[str]:
+        """
+        Entre deux vagues : collecte, puis signale les sous-systèmes en
+        croissance depuis la vague précédente. Retourne les fuites trouvées.
+        """
+        self.in_wave = False
+        gc.collect()
+
+        leaks = []
+        wave_bytes = self.bytes_by_subsystem()
+        if self._wave_bytes is not None:
+            for name, size in wave_bytes.items():
+                growth = size - self._wave_bytes.get(name, 0)
+                if growth > LEAK_THRESHOLD:
+                    leaks.append(f"{name} : +{growth // 1024} Kio depuis la vague précédente")
+        self._wave_bytes = wave_bytes
+        self._signal(engine, leaks)
+        return leaks
+
+    def _signal(self, engine, leaks: List[str]) -> None:
+        """Affiche et garde les fuites trouvées"""
+        for leak in leaks:
+            print(f"[MÉMOIRE] Vague {engine.wave_manager.current_wave} : {leak}")
+        self.leaks.extend(leaks)
+
+def format_report(report: Dict[str, Any], top: int = 8) -> List[str]:
+    """Lignes lisibles d'un rapport"""
+    entities = ', '.join(f"{name} {count}" for name, count in report['entities'].items())
+    gc_stats = report['gc']
+    lines = [f"Vague {report['wave']} : {entities}",
+             f"  GC : {gc_stats['in_wave']} pauses en vague (max {gc_stats['in_wave_max_ms']:.2f} ms), "
+             f"{gc_stats['between_waves']} entre les vagues (max {gc_stats['between_waves_max_ms']:.2f} ms)"]
+    for name, size in list(report['bytes'].items())[:top]:
+        lines.append(f"  {name:<28}{size / 1024:>10.1f} Kio")
+    return lines
+
+def main(ticks: int = 3000, every: int = 500) -> None:
+    """Partie sans affichage de ``ticks`` ticks ; un rapport par vague et tous les ``every`` ticks"""
+    from core.game_engine import GameEngine
+
+    engine = GameEngine(frontend='headless', seed=0)
+    engine.memory = MemoryMonitor(interval=0, trace=True)
+    engine.memory.start()
+    wave = engine.wave_manager.current_wave
+    try:
+        for tick in range(1, ticks + 1):
+            engine._update(engine.game_state['game_speed'])
+            engine.rewind.record(engine.fork())
+            engine.memory.update(engine)
+            if engine.wave_manager.current_wave != wave or tick % every == 0:
+                wave = engine.wave_manager.current_wave
+                print('\n'.join(format_report(engine.memory.report(engine))))
+            if engine.game_state['tower_hp'] <= 0:
+                break
+    finally:
+        engine.memory.stop()
+
+def check_stale_detection(ticks: int = 200) -> bool:
+    """
+    Vérification de la détection des fuites (python -m core.memory check) :
+    un ennemi est retiré du jeu sans prévenir le gestionnaire de vagues ;
+    il doit être signalé et oublié à l'apparition suivante.
+    """
+    from core.game_engine import GameEngine
+
+    engine = GameEngine(frontend='headless', seed=0)
+    engine.memory = MemoryMonitor(interval=0)
+    while not engine.enemies:
+        engine._update(engine.game_state['game_speed'])
+    leaked = engine.enemies.pop()
+
+    for _ in range(ticks):
+        engine._update(engine.game_state['game_speed'])
+        if engine.memory.leaks:
+            break
+
+    detected = len(engine.memory.leaks) == 1 and leaked not in engine.wave_manager.spawned_enemies
+    print(f"Ennemi orphelin {'signalé et oublié' if detected else 'NON signalé'} : {engine.memory.leaks}")
+    return detected
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['check']:
+        sys.exit(0 if check_stale_detection() else 1)
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
@@ -0,0 +1,305 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Mesures de jeu en continu (compteurs, jauges, quantiles, débits),
+# exportées au format OpenMetrics :
+# - mises à jour en O(1) depuis les points d'accroche de GameEngine,
+#   CombatSystem et WaveManager (une addition par lot d'événements du tick) ;
+# - exportées par un fil dédié, dans un fichier réécrit périodiquement
+#   (TOWER_METRICS=metrics.prom) ou sur un point HTTP local
+#   (TOWER_METRICS=http://127.0.0.1:9464, lu sur /metrics).
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+DEFAULT_INTERVAL = 5.0  # Secondes entre deux écritures du fichier
+RATE_WINDOW = 10.0  # Fenêtre (secondes) des débits
+QUANTILES = (0.5, 0.9, 0.99)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Counter:
+    """Compteur croissant"""
+    kind = 'counter'
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        """Ajoute ``amount`` (un lot d'événements)"""
+        self.value += amount
+
+    def samples(self, name: str) -> List[Tuple[str, Labels, float]]:
+        """Échantillons exportés : (nom, étiquettes, valeur)"""
+        return [(name + '_total', (), self.value)]
+
+class Gauge:
+    """Valeur instantanée"""
+    kind = 'gauge'
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float) -> None:
+        """Remplace la valeur"""
+        self.value = value
+
+    def samples(self, name: str) -> List[Tuple[str, Labels, float]]:
+        """Échantillons exportés : (nom, étiquettes, valeur)"""
+        return [(name, (), self.value)]
+
+class Quantiles:
+    """
+    Quantiles en continu, à erreur relative bornée (esquisse à la DDSketch).
+
+    Chaque valeur positive incrémente le seau ceil(log(x) / log(gamma)) :
+    un logarithme et une addition par observation, une mémoire qui ne
+    dépend que de l'étendue des valeurs. Le quantile retourné est à moins
+    de ``accuracy`` (relatif) de la vraie valeur.
+    """
+    kind = 'summary'
+
+    def __init__(self, accuracy: float = 0.01, quantiles: Tuple[float, ...] = QUANTILES):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.quantiles = quantiles
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0  # Observations nulles ou négatives
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Ajoute une observation"""
+        self.count += 1
+        self.sum += value
+        if value <= 0:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        """Valeur du quantile ``q`` (0 sans observation)"""
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if self.count == 0 or rank < seen:
+            return 0.0
+        buckets = dict(self.buckets)  # Copie : l'export peut se faire pendant une observation
+        for key in sorted(buckets):
+            seen += buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(buckets) / (self.gamma + 1)
+
+    def samples(self, name: str) -> List[Tuple[str, Labels, float]]:
+        """Échantillons exportés : (nom, étiquettes, valeur)"""
+        samples = [(name, (('quantile', str(q)),), self.quantile(q)) for q in self.quantiles]
+        samples.append((name + '_sum', (), self.sum))
+        samples.append((name + '_count', (), self.count))
+        return samples
+
+class Rate:
+    """Débit (par seconde) d'un ou plusieurs compteurs sur une fenêtre glissante, calculé à l'export"""
+    kind = 'gauge'
+
+    def __init__(self, counters: List[Counter], window: float = RATE_WINDOW):
+        self.counters = counters
+        self.window = window
+        self.history: Deque[Tuple[float, float]] = deque()
+
+    @property
+    def value(self) -> float:
+        """Débit depuis le plus ancien relevé de la fenêtre (chaque lecture ajoute un relevé)"""
+        now = time.monotonic()
+        total = sum(counter.value for counter in self.counters)
+        history = self.history
+        history.append((now, total))
+        while len(history) > 2 and now - history[1][0] >= self.window:
+            history.popleft()
+        start, first = history[0]
+        return (total - first) / (now - start) if now > start else 0.0
+
+    def samples(self, name: str) -> List[Tuple[str, Labels, float]]:
+        """Échantillons exportés : (nom, étiquettes, valeur)"""
+        return [(name, (), self.value)]
+
+class MetricsRegistry:
+    """
+    Ensemble de familles de mesures (nom, aide, type), chacune déclinée
+    par étiquettes. Les mesures sont créées au premier appel et
+    réutilisées ensuite : les points d'accroche gardent la référence et
+    ne paient que la mise à jour.
+    """
+    def __init__(self, prefix: str = 'tower_'):
+        self.prefix = prefix
+        self.families: Dict[str, Tuple[str, str, Dict[Labels, object]]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str, help_text: str, kind: str, labels: Dict[str, object], factory):
+        """Mesure d'une famille, créée par ``factory`` au premier appel"""
+        name = self.prefix + name
+        with self._lock:
+            family = self.families.setdefault(name, (kind, help_text, {}))
+            key = tuple((label, str(value)) for label, value in sorted(labels.items()))
+            metric = family[2].get(key)
+            if metric is None:
+                metric = family[2][key] = factory()
+        return metric
+
+    def counter(self, name: str, help_text: str, **labels) -> Counter:
+        """Compteur ``name`` aux étiquettes ``labels`` (créé au premier appel)"""
+        return self._get(name, help_text, 'counter', labels, Counter)
+
+    def gauge(self, name: str, help_text: str, **labels) -> Gauge:
+        """Jauge ``name`` aux étiquettes ``labels`` (créée au premier appel)"""
+        return self._get(name, help_text, 'gauge', labels, Gauge)
+
+    def quantiles(self, name: str, help_text: str, accuracy: float = 0.01, **labels) -> Quantiles:
+        """Esquisse de quantiles ``name`` aux étiquettes ``labels`` (créée au premier appel)"""
+        return self._get(name, help_text, 'summary', labels, lambda: Quantiles(accuracy))
+
+    def rate(self, name: str, help_text: str, counters: List[Counter], **labels) -> Rate:
+        """Débit des compteurs ``counters``, exporté comme une jauge"""
+        return self._get(name, help_text, 'gauge', labels, lambda: Rate(counters))
+
+    def exposition(self) -> str:
+        """Toutes les mesures au format texte OpenMetrics"""
+        with self._lock:
+            families = [(name, kind, help_text, list(metrics.items()))
+                        for name, (kind, help_text, metrics) in self.families.items()]
+        lines = []
+        for name, kind, help_text, metrics in families:
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"# HELP {name} {help_text}")
+            for labels, metric in metrics:
+                for sample, extra, value in metric.samples(name):
+                    pairs = ','.join(f'{label}="{text}"' for label, text in labels + extra)
+                    text = _number(value)
+                    lines.append(f"{sample}{{{pairs}}} {text}" if pairs else f"{sample} {text}")
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+def _number(value: float) -> str:
+    """Valeur d'un échantillon, sans perte (entiers sans partie décimale)"""
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+class GameMetrics:
+    """
+    Mesures d'une partie, tenues par les points d'accroche du jeu.
+
+    Les compteurs d'ennemis sont déclinés par vague (étiquette ``wave``) ;
+    start_wave() fait pointer spawned, killed et leaked sur ceux de la
+    nouvelle vague. Les débits (dégâts et score par seconde) ne sont
+    calculés qu'à l'export.
+    """
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        registry = self.registry
+
+        self.fired = registry.counter('projectiles_fired', "Tirs des tours (projectiles et éclairs)")
+        self.hits = registry.counter('projectiles_hit', "Projectiles arrivés sur un ennemi")
+        self.damage = registry.counter('damage', "Dégâts infligés aux ennemis")
+        self.score_earned = registry.counter('score_earned', "Points gagnés en tuant des ennemis")
+        self.dps = registry.rate('damage_per_second', "Dégâts par seconde", [self.damage])
+        self.score_rate = registry.rate('score_per_second', "Points gagnés par seconde", [self.score_earned])
+
+        self.enemies = registry.gauge('enemies_alive', "Ennemis présents")
+        self.projectiles = registry.gauge('projectiles_alive', "Projectiles en vol")
+        self.towers = registry.gauge('towers', "Tours construites")
+        self.wave = registry.gauge('wave', "Vague en cours")
+        self.score = registry.gauge('score', "Score")
+        self.tower_hp = registry.gauge('tower_hp', "Points de vie de la tour principale")
+        self.tick_seconds = registry.quantiles('tick_seconds', "Durée d'un tick de jeu")
+
+        self.start_wave(1)
+
+    def start_wave(self, wave: int) -> None:
+        """Compteurs d'ennemis de la vague qui commence"""
+        registry = self.registry
+        self.wave.set(wave)
+        self.spawned = registry.counter('enemies_spawned', "Ennemis générés", wave=wave)
+        self.killed = registry.counter('enemies_killed', "Ennemis tués", wave=wave)
+        self.leaked = registry.counter('enemies_leaked', "Ennemis arrivés à la tour", wave=wave)
+
+class MetricsExporter:
+    """
+    Export d'un registre par un fil dédié : ``target`` est un fichier
+    (réécrit toutes les ``interval`` secondes, remplacé d'un bloc) ou une
+    adresse http://hôte:port (servie à la demande sur /metrics).
+    """
+    def __init__(self, registry: MetricsRegistry, target: str, interval: float = DEFAULT_INTERVAL):
+        self.registry = registry
+        self.target = target
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server = None  # ThreadingHTTPServer pour une adresse http://, créé par start()
+
+    def start(self) -> None:
+        """Démarre le fil d'export (ou le serveur HTTP)"""
+        if self.target.startswith('http://'):
+            from http.server import ThreadingHTTPServer
+            host, _, port = self.target[len('http://'):].rstrip('/').partition(':')
+            self._server = ThreadingHTTPServer((host or '127.0.0.1', int(port or 9464)), self._handler())
+            self._thread = threading.Thread(target=self._server.serve_forever, name='metrics', daemon=True)
+        else:
+            self._thread = threading.Thread(target=self._write_loop, name='metrics', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Arrête l'export (dernière écriture du fichier comprise)"""
+        if self._thread is None:
+            return
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def write(self) -> None:
+        """Écrit le fichier d'un bloc (les lecteurs ne voient jamais un fichier à moitié écrit)"""
+        temporary = self.target + '.tmp'
+        with open(temporary, 'w') as file:
+            file.write(self.registry.exposition())
+        os.replace(temporary, self.target)
+
+    def _write_loop(self) -> None:
+        """Fil d'export : une écriture par intervalle, puis une dernière à l'arrêt"""
+        while not self._stop.wait(self.interval):
+            self._write_safely()
+        self._write_safely()
+
+    def _write_safely(self) -> None:
+        """Écrit le fichier ; une erreur d'écriture est signalée sans arrêter le jeu"""
+        try:
+            self.write()
+        except OSError as error:
+            print(f"[MESURES] Écriture impossible : {error}")
+
+    def _handler(self):
+        """Classe de requêtes HTTP qui sert l'exposition du registre"""
+        from http.server import BaseHTTPRequestHandler
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.exposition().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
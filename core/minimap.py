@@ -0,0 +1,84 @@
+import math
+from typing import List
+import numpy as np
+
+class Minimap:
+    """
+    Vue réduite du monde entier : densité d'ennemis par bloc, tour et viewport.
+
+    La densité est calculée en une seule réduction (np.bincount) sur les
+    positions de tous les ennemis ; le dessin ne dépend que de la taille
+    de la minimap.
+    """
+    # Seuils de densité (nombre d'ennemis par bloc) et glyphes associés
+    DENSITY_THRESHOLDS = np.array([1, 2, 4, 8])
+    DENSITY_CHARS = ['·', '░', '▒', '▓', '█']
+    DENSITY_COLORS = [(60, 60, 60), (255, 150, 150), (255, 100, 100), (255, 50, 50), (255, 0, 0)]
+
+    TOWER_CHAR = "T"
+    VIEWPORT_COLOR = (0, 200, 255)
+
+    def __init__(self, world_width: int, world_height: int, max_width: int, max_height: int):
+        self.world_width = world_width
+        self.world_height = world_height
+
+        # Taille d'un bloc en cases du monde, pour tenir dans l'espace disponible
+        self.block_width = max(1, math.ceil(world_width / max_width))
+        self.block_height = max(1, math.ceil(world_height / max_height))
+        self.width = math.ceil(world_width / self.block_width)
+        self.height = math.ceil(world_height / self.block_height)
+
+    def density(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Nombre d'ennemis par bloc, tableau (hauteur, largeur)"""
+        if len(xs) == 0:
+            return np.zeros((self.height, self.width), dtype=np.intp)
+
+        columns = np.clip(xs.astype(np.intp) // self.block_width, 0, self.width - 1)
+        rows = np.clip(ys.astype(np.intp) // self.block_height, 0, self.height - 1)
+        counts = np.bincount(rows * self.width + columns, minlength=self.width * self.height)
+        return counts.reshape(self.height, self.width)
+
+    def draw(self, console, x: int, y: int, game_map, towers: List, enemies: List):
+        """Dessine la minimap avec son coin supérieur gauche en (x, y)"""
+        xs = np.fromiter((enemy.position.x for enemy in enemies), dtype=float, count=len(enemies))
+        ys = np.fromiter((enemy.position.y for enemy in enemies), dtype=float, count=len(enemies))
+        levels = np.searchsorted(self.DENSITY_THRESHOLDS, self.density(xs, ys), side='right')
+
+        # Fond : une ligne de texte par niveau de densité non nul
+        for row in range(self.height):
+            line = ''.join(self.DENSITY_CHARS[level] for level in levels[row])
+            console.print(x, y + row, line, fg=self.DENSITY_COLORS[0])
+            for column in np.flatnonzero(levels[row]):
+                level = levels[row, column]
+                console.print(x + int(column), y + row, self.DENSITY_CHARS[level],
+                              fg=self.DENSITY_COLORS[level])
+
+        self._draw_viewport(console, x, y, game_map, levels)
+
+        for tower in towers:
+            column = tower.position.x // self.block_width
+            row = tower.position.y // self.block_height
+            if 0 <= column < self.width and 0 <= row < self.height:
+                console.print(x + column, y + row, self.TOWER_CHAR, fg=(255, 255, 0))
+
+    def _draw_viewport(self, console, x: int, y: int, game_map, levels: np.ndarray):
+        """Trace le contour de la zone visible, sans masquer les ennemis"""
+        left = game_map.viewport_x // self.block_width
+        top = game_map.viewport_y // self.block_height
+        right = min(self.width - 1, (game_map.viewport_x + game_map.viewport_width - 1) // self.block_width)
+        bottom = min(self.height - 1, (game_map.viewport_y + game_map.viewport_height - 1) // self.block_height)
+
+        outline = set()
+        for column in range(left, right + 1):
+            outline.add((column, top))
+            outline.add((column, bottom))
+        for row in range(top, bottom + 1):
+            outline.add((left, row))
+            outline.add((right, row))
+
+        for column, row in outline:
+            if levels[row, column] == 0:
+                char = '─' if row in (top, bottom) and column not in (left, right) else '│'
+                if column in (left, right) and row in (top, bottom):
+                    char = '+'
+                console.print(x + column, y + row, char, fg=self.VIEWPORT_COLOR)
@@ -0,0 +1,242 @@
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+import numpy as np
+
+from core.simulation import (Simulation, ENEMY_FIELDS, PROJECTILE_FIELDS, EY, EHP, PY,
+                             afflict, move_enemies, move_projectiles)
+from core import kernels
+from core.fixed_array import to_cells
+
+class SharedArray:
+    """
+    Tableau NumPy 2D de capacité fixe placé dans un segment de mémoire partagée
+    """
+    def __init__(self, capacity: int, fields: int, name: Optional[str] = None, dtype: str = 'i8'):
+        self.capacity = capacity
+        self.fields = fields
+        self.dtype = dtype
+        size = max(1, capacity * fields * np.dtype(dtype).itemsize)
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray((capacity, fields), dtype=dtype, buffer=self.memory.buf)
+
+    @property
+    def spec(self) -> Tuple[int, int, str, str]:
+        """Paramètres pour rattacher le segment depuis un autre processus"""
+        return self.capacity, self.fields, self.memory.name, self.dtype
+
+    def close(self, unlink: bool = False):
+        """Détache (et détruit si demandé) le segment"""
+        self.array = None
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+def _region_worker(region: int, connection) -> None:
+    """
+    Processus de calcul d'une région : déplace les ennemis et projectiles
+    que le coordinateur lui a attribués pour ce tick
+    """
+    # Un processus par région suffit : pas de fils de calcul Numba en plus
+    if kernels.backend == 'numba':
+        kernels.use_backend('numpy')
+
+    shared = {}
+    try:
+        while True:
+            message = connection.recv()
+            command = message[0]
+
+            if command == 'stop':
+                break
+
+            if command == 'attach':
+                for array in shared.values():
+                    array.close()
+                shared = {name: SharedArray(*spec) for name, spec in message[1].items()}
+
+            elif command == 'step':
+                _, enemy_count, projectile_count, tower_x, tower_y, delta_time = message
+                _move_region(shared, region, enemy_count, projectile_count,
+                             tower_x, tower_y, delta_time)
+
+            connection.send(True)
+    finally:
+        for array in shared.values():
+            array.close()
+        connection.close()
+
+def _move_region(shared, region: int, enemy_count: int, projectile_count: int,
+                 tower_x: int, tower_y: int, delta_time: float) -> None:
+    """Déplace les entités d'une région, en place dans les tableaux partagés"""
+    # Les indices restent ceux du tableau global : l'ordre des entités,
+    # donc le résultat, est identique à une exécution sur un seul processus
+    mine = np.flatnonzero(shared['enemy_regions'].array[:enemy_count, 0] == region)
+    if len(mine):
+        rows = shared['enemies'].array
+        block = rows[mine]
+        move_enemies(block, tower_x, tower_y, delta_time)
+        rows[mine] = block
+
+    mine = np.flatnonzero(shared['projectile_regions'].array[:projectile_count, 0] == region)
+    if len(mine):
+        rows = shared['projectiles'].array
+        block = rows[mine]
+        move_projectiles(block, delta_time)
+        rows[mine] = block
+
+def region_of(y: np.ndarray, regions: int, world_height: int) -> np.ndarray:
+    """Numéro de bande horizontale de chaque position (en virgule fixe)"""
+    return np.clip(to_cells(y) * regions // world_height, 0, regions - 1)
+
+class ParallelSimulation(Simulation):
+    """
+    Simulation d'un grand monde découpé en bandes horizontales.
+
+    Chaque bande est déplacée par un processus qui travaille directement
+    sur les tableaux d'entités en mémoire partagée. Une entité qui change
+    de bande est simplement prise en charge par l'autre processus au tick
+    suivant (la bande est recalculée à chaque barrière). L'apparition des
+    ennemis, les collisions et les tirs restent dans le coordinateur, dans
+    le même ordre qu'une Simulation : les résultats sont identiques.
+    """
+    def __init__(self, sim: Simulation, workers: int = 8, capacity: int = 1024):
+        self.__dict__.update(sim.fork().__dict__)
+        self.regions = workers
+        self.shared = {}
+        self.connections: List = []
+        self.processes: List = []
+
+        self._allocate(max(capacity, len(self.enemies)), max(capacity, len(self.projectiles)))
+
+        context = kernels.process_context()
+        for region in range(workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_region_worker, args=(region, child), daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        self._attach_workers()
+
+    def _attach_workers(self) -> None:
+        """Indique aux processus les segments partagés à utiliser"""
+        self._broadcast(('attach', {name: array.spec for name, array in self.shared.items()}))
+
+    def _allocate(self, enemy_capacity: int, projectile_capacity: int) -> None:
+        """Crée (ou agrandit) les segments partagés et y copie les entités"""
+        old = self.shared
+        self.shared = {
+            'enemies': SharedArray(enemy_capacity, ENEMY_FIELDS),
+            'projectiles': SharedArray(projectile_capacity, PROJECTILE_FIELDS),
+            'enemy_regions': SharedArray(enemy_capacity, 1, dtype='i4'),
+            'projectile_regions': SharedArray(projectile_capacity, 1, dtype='i4'),
+        }
+        for name in ('enemies', 'projectiles'):
+            current = getattr(self, name)
+            view = self.shared[name].array[:len(current)]
+            view[:] = current
+            setattr(self, name, view)
+
+        if self.connections:
+            self._attach_workers()
+        for array in old.values():
+            array.close(unlink=True)
+
+    def _share(self) -> None:
+        """Place les entités en mémoire partagée et leur attribue une région (barrière)"""
+        if (len(self.enemies) > self.shared['enemies'].capacity
+                or len(self.projectiles) > self.shared['projectiles'].capacity):
+            self._allocate(max(len(self.enemies), self.shared['enemies'].capacity) * 2,
+                           max(len(self.projectiles), self.shared['projectiles'].capacity) * 2)
+
+        for name, regions_name, column in (('enemies', 'enemy_regions', EY),
+                                           ('projectiles', 'projectile_regions', PY)):
+            current = getattr(self, name)
+            shared = self.shared[name].array
+            if not np.may_share_memory(current, shared):
+                shared[:len(current)] = current
+                current = shared[:len(current)]
+                setattr(self, name, current)
+            # Passage de frontière : la région est recalculée à chaque tick
+            regions = self.shared[regions_name].array
+            regions[:len(current), 0] = region_of(current[:, column], self.regions, self.world_height)
+
+    def _broadcast(self, message) -> None:
+        """Envoie un message à tous les processus et attend leur réponse (barrière)"""
+        for connection in self.connections:
+            connection.send(message)
+        for connection in self.connections:
+            connection.recv()
+
+    def step(self, delta_time: float = 0.1) -> None:
+        """Avance d'un tick ; les déplacements sont calculés en parallèle"""
+        self.tick += 1
+        self._spawn(delta_time)
+        self._update_effects(delta_time)
+        self._share()
+
+        # Phase parallèle : ennemis et projectiles sont indépendants pendant le déplacement
+        self._broadcast(('step', len(self.enemies), len(self.projectiles),
+                         self.tower_x, self.tower_y, delta_time))
+
+        # La séparation regarde les voisins de part et d'autre des frontières : coordinateur
+        self._separate_enemies(delta_time)
+        self._remove_enemies()
+        damage = np.zeros(len(self.enemies), dtype=np.int64)
+        afflictions = []
+        index = self._collide_projectiles(damage, afflictions)
+        self._update_towers(delta_time, damage, index, afflictions)
+        self.enemies[:, EHP] -= damage
+        afflict(self.enemies, afflictions, self.effect_time)
+
+        if len(self.enemies) == 0 and self.spawned_count == 0:
+            self.next_wave()
+
+        if self.tower_hp <= 0:
+            self.game_over = True
+
+    def fork(self) -> Simulation:
+        """Retourne une Simulation ordinaire (sans processus) de l'état courant"""
+        return self.to_simulation()
+
+    def to_simulation(self) -> Simulation:
+        """Copie l'état dans une Simulation sur un seul processus"""
+        sim = Simulation.__new__(Simulation)
+        sim.__dict__.update({name: value for name, value in self.__dict__.items()
+                             if name not in ('regions', 'shared', 'connections', 'processes')})
+        sim.enemies = self.enemies.copy()
+        sim.projectiles = self.projectiles.copy()
+        sim.towers = self.towers.copy()
+        sim.tower_reloads = self.tower_reloads.copy()
+        sim.rng_shared = True
+        self.rng_shared = True
+        return sim
+
+    def close(self) -> None:
+        """Arrête les processus et libère la mémoire partagée"""
+        if not self.processes:
+            return
+        for connection in self.connections:
+            connection.send(('stop',))
+        for process in self.processes:
+            process.join()
+        for connection in self.connections:
+            connection.close()
+        self.connections = []
+        self.processes = []
+
+        # Détacher les tableaux de la mémoire partagée avant de la libérer
+        self.enemies = self.enemies.copy()
+        self.projectiles = self.projectiles.copy()
+        for array in self.shared.values():
+            array.close(unlink=True)
+        self.shared = {}
+
+    def __enter__(self) -> 'ParallelSimulation':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
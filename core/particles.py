@@ -0,0 +1,126 @@
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+# Effets visuels éphémères (impacts, explosions, départs de tir, traînées) :
+# des particules sans objet Python, rangées dans des tableaux circulaires
+# de capacité fixe. L'émission, la mise à jour et la composition dans le
+# calque des entités (core.entity_layer) sont chacune une passe NumPy,
+# quel que soit le nombre de particules. Les particules n'ont aucun effet
+# sur la partie (générateur aléatoire à part).
+
+# Sortes de particules : glyphes tirés au hasard, couleur, particules par
+# événement, vitesse (cases par seconde) et durée de vie (secondes)
+PARTICLE_KINDS: Dict[str, Tuple[str, Tuple[int, int, int], int, float, float]] = {
+    'hit': ("'`,.", (255, 220, 120), 3, 4.0, 0.3),
+    'death': ("*%x+", (255, 120, 40), 8, 6.0, 0.6),
+    'muzzle': ("+", (255, 255, 200), 2, 2.0, 0.15),
+    'trail': (".", (90, 160, 90), 1, 0.0, 0.4),
+}
+
+# Part des particules émises selon le réglage de qualité ; les traînées ne sont émises qu'en 'high'
+QUALITY = {'high': 1.0, 'medium': 0.5, 'low': 0.25, 'off': 0.0}
+DEFAULT_CAPACITY = 4096
+DRAG = 4.0  # Freinage des particules (par seconde)
+
+class ParticleSystem:
+    """
+    Particules dans des tableaux circulaires : position et vitesse (en
+    cases), glyphe, couleur, durée de vie restante et initiale.
+
+    Une émission écrit à la suite de la dernière, en écrasant les plus
+    anciennes quand les ``capacity`` places sont prises : le nombre de
+    particules vivantes est borné. Une particule dont la vie est écoulée
+    reste en place mais n'est plus dessinée. ``quality`` (voir QUALITY)
+    et ``throttle`` (réduction temporaire, voir core.watchdog) réduisent
+    le nombre de particules émises.
+    """
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, quality: str = 'high', seed: Optional[int] = None):
+        if quality not in QUALITY:
+            raise ValueError(f"Qualité inconnue : {quality} (disponibles : {', '.join(QUALITY)})")
+        self.capacity = capacity
+        self.quality = quality
+        self.throttle = 1.0
+        self.rng = np.random.default_rng(seed)
+
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.glyph = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.head = 0  # Prochaine place écrite
+
+        # Glyphes et couleur de chaque sorte, en tableaux
+        self.kinds = {name: (np.array([ord(char) for char in glyphs], dtype=np.int32),
+                             np.array(color, dtype=np.uint8), count, speed, life)
+                      for name, (glyphs, color, count, speed, life) in PARTICLE_KINDS.items()}
+
+    @property
+    def alive(self) -> int:
+        """Nombre de particules vivantes"""
+        return int(np.count_nonzero(self.life > 0))
+
+    def emit(self, kind: str, xs, ys) -> int:
+        """
+        Émet les particules de ``kind`` pour des événements aux cases
+        (xs, ys) ; retourne le nombre de particules émises.
+        """
+        factor = QUALITY[self.quality] * self.throttle
+        if kind == 'trail' and factor < 1.0:
+            return 0
+        sources = len(xs)
+        glyphs, color, count, speed, life = self.kinds[kind]
+        total = min(int(sources * count * factor), self.capacity)
+        if total == 0:
+            return 0
+
+        # Événements répartis régulièrement entre les particules émises
+        origin = np.arange(total) * sources // total
+        angle = self.rng.uniform(0.0, 2 * np.pi, total)
+        magnitude = speed * self.rng.uniform(0.5, 1.0, total)
+        lives = life * self.rng.uniform(0.6, 1.0, total)
+
+        slots = (self.head + np.arange(total)) % self.capacity
+        self.head = (self.head + total) % self.capacity
+        self.x[slots] = np.asarray(xs, dtype=np.float32)[origin] + 0.5
+        self.y[slots] = np.asarray(ys, dtype=np.float32)[origin] + 0.5
+        self.vx[slots] = magnitude * np.cos(angle)
+        self.vy[slots] = magnitude * np.sin(angle)
+        self.glyph[slots] = glyphs[self.rng.integers(0, len(glyphs), total)]
+        self.color[slots] = color
+        self.life[slots] = lives
+        self.max_life[slots] = lives
+        return total
+
+    def update(self, delta_time: float) -> None:
+        """Avance toutes les particules d'un pas (une passe sur les tableaux)"""
+        self.x += self.vx * delta_time
+        self.y += self.vy * delta_time
+        drag = max(0.0, 1.0 - DRAG * delta_time)
+        self.vx *= drag
+        self.vy *= drag
+        self.life -= delta_time
+
+    def clear(self) -> None:
+        """Éteint toutes les particules"""
+        self.life[:] = 0
+
+    def composite(self, game_map, codes: np.ndarray, colors: np.ndarray) -> None:
+        """
+        Pose les particules vivantes de la vue dans les tampons d'un calque
+        (voir EntityLayer.compose) ; leur couleur s'estompe avec leur vie.
+        """
+        height, width = codes.shape
+        x = np.floor(self.x).astype(np.int64) - game_map.viewport_x
+        y = np.floor(self.y).astype(np.int64) - game_map.viewport_y
+        visible = np.flatnonzero((self.life > 0) & (x >= 0) & (x < min(width, game_map.viewport_width)) &
+                                 (y >= 0) & (y < min(height, game_map.viewport_height)))
+        if len(visible) == 0:
+            return
+
+        keys = y[visible] * width + x[visible]
+        fade = np.clip(self.life[visible] / self.max_life[visible], 0.2, 1.0)[:, None]
+        codes.reshape(-1)[keys] = self.glyph[visible]
+        colors.reshape(-1, 3)[keys] = (self.color[visible] * fade).astype(np.uint8)
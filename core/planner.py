@@ -0,0 +1,82 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from core import kernels
+from core.simulation import Simulation
+from utils.constants import UPGRADE_COSTS
+
+# Poids des points de vie de la tour dans l'évaluation d'une partie
+TOWER_HP_WEIGHT = 10
+GAME_OVER_PENALTY = 1000
+
+def evaluate(sim: Simulation) -> float:
+    """Valeur d'une fin de simulation : score, vie restante, défaite"""
+    value = sim.score + TOWER_HP_WEIGHT * sim.tower_hp
+    if sim.game_over:
+        value -= GAME_OVER_PENALTY
+    return value
+
+def _rollout(task: Tuple[Simulation, Optional[str], int, int, float]) -> float:
+    """Joue une partie future après un achat (fonction de module, pour le pool de processus)"""
+    sim, option, seed, horizon, delta_time = task
+    future = sim.fork()
+    future.reseed(seed)
+    if option is not None:
+        future.upgrade(option)
+    future.run(horizon, delta_time)
+    return evaluate(future)
+
+class UpgradePlanner:
+    """
+    Choisit le prochain achat (damage, range, fire_rate, hp ou rien)
+    en simulant des parties futures à partir de forks de l'état courant
+    """
+    def __init__(self, horizon: int = 300, rollouts: int = 16, delta_time: float = 0.1,
+                 workers: int = 0, seed: int = 0):
+        self.horizon = horizon
+        self.rollouts = rollouts
+        self.delta_time = delta_time
+        self.workers = workers  # 0 : tout dans le processus courant
+        self.seed = seed
+        self.executor = None
+
+    def options(self, sim: Simulation) -> List[Optional[str]]:
+        """Achats possibles avec le score actuel (None : ne rien acheter)"""
+        return [None] + [name for name, cost in UPGRADE_COSTS.items() if sim.score >= cost]
+
+    def evaluate_options(self, sim: Simulation) -> Dict[Optional[str], float]:
+        """Valeur moyenne de chaque achat possible"""
+        options = self.options(sim)
+        # Mêmes graines pour toutes les options : les écarts viennent de l'achat, pas du hasard
+        tasks = [(sim, option, self.seed + i, self.horizon, self.delta_time)
+                 for option in options for i in range(self.rollouts)]
+
+        if self.workers > 0:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                    mp_context=kernels.process_context())
+            chunksize = max(1, len(tasks) // (self.workers * 4))
+            values = list(self.executor.map(_rollout, tasks, chunksize=chunksize))
+        else:
+            values = [_rollout(task) for task in tasks]
+
+        return {option: sum(values[i * self.rollouts:(i + 1) * self.rollouts]) / self.rollouts
+                for i, option in enumerate(options)}
+
+    def choose(self, sim: Simulation) -> Optional[str]:
+        """Retourne le meilleur achat, ou None"""
+        values = self.evaluate_options(sim)
+        return max(values, key=values.get)
+
+    def choose_action(self, engine) -> Dict[str, Any]:
+        """Action au format de TcodInputHandler pour l'état courant du moteur"""
+        upgrade = self.choose(engine.fork())
+        if upgrade is None:
+            return {}
+        return {'upgrade': upgrade, 'cost': UPGRADE_COSTS[upgrade]}
+
+    def close(self):
+        """Arrête le pool de processus"""
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
@@ -0,0 +1,330 @@
+import argparse
+import json
+import struct
+import sys
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+import numpy as np
+
+# Format d'un enregistrement (entiers petit-boutistes) :
+#   MAGIC, longueur (uint32) et en-tête JSON (taille de l'écran, version...)
+#   blocs : un flux zlib indépendant par groupe de trames, ouvert par une keyframe
+#   index : une ligne (première trame, temps en µs, position, taille) par bloc
+#   pied : position de l'index et nombre de trames, puis MAGIC
+# Une trame : temps (µs depuis le début), keyframe, nombre de cases, puis
+# les indices des cases modifiées (absents pour une keyframe), leurs
+# caractères (points de code) et leurs couleurs (RGB compacté en 0xRRGGBB).
+MAGIC = b'TDREC\x01'
+FRAME_HEADER = struct.Struct('<QBI')
+FOOTER = struct.Struct('<QQ')
+INDEX_FIELDS = 4
+
+class _Palette(dict):
+    """Couleur (r, g, b) -> entier 0xRRGGBB, calculé une fois par couleur"""
+    def __missing__(self, color: Tuple[int, int, int]) -> int:
+        packed = self[color] = (color[0] << 16) | (color[1] << 8) | color[2]
+        return packed
+
+class SessionRecorder:
+    """
+    Enregistrement d'une partie, trame par trame, pour la partager ou l'archiver.
+
+    Le Renderer appelle capture() après chaque rendu : seules les cases
+    dont le caractère ou la couleur a changé sont écrites. Une keyframe
+    (écran complet) ouvre chaque bloc de ``keyframe_interval`` trames ;
+    chaque bloc est un flux zlib indépendant, repéré dans l'index de fin
+    de fichier, ce qui permet de se positionner sans tout décompresser.
+    """
+    def __init__(self, path: str, width: int, height: int, keyframe_interval: int = 100,
+                 level: int = 1):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.keyframe_interval = keyframe_interval
+        self.level = level  # Compression zlib : rapide, la capture doit rester sous la milliseconde
+
+        self.file = open(path, 'wb')
+        header = json.dumps({'version': 1, 'width': width, 'height': height,
+                             'keyframe_interval': keyframe_interval,
+                             'created': time.time()}).encode('utf-8')
+        self.file.write(MAGIC + struct.pack('<I', len(header)) + header)
+
+        self.start = time.perf_counter()
+        self.frames = 0
+        self.index: List[Tuple[int, int, int, int]] = []
+        self._compressor = None
+        self._block_offset = 0
+        self._glyphs: Optional[np.ndarray] = None
+        self._colors: Optional[np.ndarray] = None
+        self._palette = _Palette()
+
+        # Coût de l'enregistrement (secondes), pour vérifier qu'il reste négligeable
+        self.capture_time = 0.0
+        self.max_capture_time = 0.0
+
+    @property
+    def overhead(self) -> float:
+        """Durée moyenne d'une capture (secondes)"""
+        return self.capture_time / self.frames if self.frames else 0.0
+
+    def _snapshot(self, console) -> Tuple[np.ndarray, np.ndarray]:
+        """Caractères et couleurs de toutes les cases d'une console (tcod ou CellConsole)"""
+        if hasattr(console, 'ch'):
+            glyphs = console.ch.ravel().astype(np.uint32)
+            fg = console.fg.reshape(-1, 3).astype(np.uint32)
+            return glyphs, (fg[:, 0] << 16) | (fg[:, 1] << 8) | fg[:, 2]
+
+        count = len(console.chars)
+        glyphs = np.frombuffer(''.join(console.chars).encode('utf-32-le'), dtype=np.uint32)
+        colors = np.fromiter(map(self._palette.__getitem__, console.fgs), dtype=np.uint32, count=count)
+        return glyphs, colors
+
+    def capture(self, console) -> None:
+        """Enregistre la trame affichée par la console"""
+        started = time.perf_counter()
+        glyphs, colors = self._snapshot(console)
+
+        keyframe = self.frames % self.keyframe_interval == 0 or self._glyphs is None
+        if keyframe:
+            self._close_block()
+            self._compressor = zlib.compressobj(self.level)
+            self._block_offset = self.file.tell()
+            self.index.append((self.frames, self._elapsed(started), self._block_offset, 0))
+            indices = np.zeros(0, dtype=np.uint32)
+            changed_glyphs, changed_colors = glyphs, colors
+        else:
+            indices = np.flatnonzero((glyphs != self._glyphs) | (colors != self._colors)).astype(np.uint32)
+            changed_glyphs, changed_colors = glyphs[indices], colors[indices]
+
+        record = (FRAME_HEADER.pack(self._elapsed(started), keyframe, len(changed_glyphs))
+                  + indices.tobytes() + changed_glyphs.tobytes() + changed_colors.tobytes())
+        self.file.write(self._compressor.compress(record))
+
+        self._glyphs, self._colors = glyphs, colors
+        self.frames += 1
+
+        duration = time.perf_counter() - started
+        self.capture_time += duration
+        self.max_capture_time = max(self.max_capture_time, duration)
+
+    def _elapsed(self, now: float) -> int:
+        """Temps depuis le début de l'enregistrement, en microsecondes"""
+        return int((now - self.start) * 1_000_000)
+
+    def _close_block(self) -> None:
+        """Termine le flux zlib du bloc en cours et note sa taille dans l'index"""
+        if self._compressor is None:
+            return
+        self.file.write(self._compressor.flush())
+        self._compressor = None
+        first, start, offset, _ = self.index[-1]
+        self.index[-1] = (first, start, offset, self.file.tell() - offset)
+
+    def close(self) -> None:
+        """Écrit l'index et ferme le fichier"""
+        if self.file.closed:
+            return
+        self._close_block()
+        index_offset = self.file.tell()
+        self.file.write(np.array(self.index, dtype='<u8').reshape(-1, INDEX_FIELDS).tobytes())
+        self.file.write(FOOTER.pack(index_offset, self.frames) + MAGIC)
+        self.file.close()
+
+    def __enter__(self) -> 'SessionRecorder':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class SessionPlayer:
+    """
+    Lecture d'un enregistrement, sans affichage : reconstruction des
+    trames, positionnement dans le temps, lecture en ANSI à n'importe
+    quelle vitesse et export au format asciinema (asciicast v2).
+    """
+    def __init__(self, path: str):
+        with open(path, 'rb') as data:
+            self.data = data.read()
+        if not self.data.startswith(MAGIC):
+            raise ValueError(f"Fichier d'enregistrement invalide : {path}")
+
+        length, = struct.unpack_from('<I', self.data, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header: Dict[str, Any] = json.loads(self.data[start:start + length])
+        self.width = self.header['width']
+        self.height = self.header['height']
+        self._blocks_start = start + length
+
+        if self.data.endswith(MAGIC) and len(self.data) >= self._blocks_start + FOOTER.size + len(MAGIC):
+            index_offset, self.frame_count = FOOTER.unpack_from(self.data, len(self.data) - len(MAGIC) - FOOTER.size)
+            index_end = len(self.data) - len(MAGIC) - FOOTER.size
+            self.index = np.frombuffer(self.data[index_offset:index_end], dtype='<u8').reshape(-1, INDEX_FIELDS)
+        else:
+            # Enregistrement interrompu (pas d'index) : les blocs complets restent lisibles
+            self.index, self.frame_count = self._scan()
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def _scan(self) -> Tuple[np.ndarray, int]:
+        """Reconstruit l'index en parcourant les flux zlib complets"""
+        rows, frames, offset = [], 0, self._blocks_start
+        while offset < len(self.data):
+            decompressor = zlib.decompressobj()
+            try:
+                raw = decompressor.decompress(self.data[offset:])
+            except zlib.error:
+                break
+            if not decompressor.eof:
+                break
+            size = len(self.data) - offset - len(decompressor.unused_data)
+            block = list(_decode(raw))
+            rows.append((frames, block[0][0], offset, size))
+            frames += len(block)
+            offset += size
+        return np.array(rows, dtype='<u8').reshape(-1, INDEX_FIELDS), frames
+
+    @property
+    def duration(self) -> float:
+        """Durée de l'enregistrement (secondes)"""
+        elapsed = 0
+        if len(self.index):
+            for elapsed, *_ in self._block_frames(len(self.index) - 1):
+                pass
+        return elapsed / 1_000_000
+
+    def _block_at(self, elapsed: int) -> int:
+        """Bloc contenant l'instant ``elapsed`` (µs)"""
+        return max(0, int(np.searchsorted(self.index[:, 1], elapsed, side='right')) - 1)
+
+    def _block_frames(self, block: int) -> Iterator[Tuple[int, bool, np.ndarray, np.ndarray, np.ndarray]]:
+        """Trames décodées d'un bloc"""
+        _, _, offset, size = (int(value) for value in self.index[block])
+        return _decode(zlib.decompress(self.data[offset:offset + size]))
+
+    def frames(self, start: float = 0.0) -> Iterator[Tuple[float, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Trames à partir de ``start`` secondes : (temps, cases modifiées,
+        caractères et couleurs de tout l'écran). La première trame rendue
+        est complète (toutes les cases sont marquées modifiées).
+        """
+        cells = self.width * self.height
+        glyphs = np.full(cells, ord(' '), dtype=np.uint32)
+        colors = np.zeros(cells, dtype=np.uint32)
+        start_us = int(start * 1_000_000)
+
+        pending = True  # Écran pas encore émis : la première trame est complète
+        for block in range(self._block_at(start_us), len(self.index)):
+            for elapsed, keyframe, indices, new_glyphs, new_colors in self._block_frames(block):
+                if keyframe:
+                    glyphs[:], colors[:] = new_glyphs, new_colors
+                else:
+                    glyphs[indices], colors[indices] = new_glyphs, new_colors
+                if elapsed < start_us:
+                    continue
+                if keyframe or pending:
+                    indices, pending = np.arange(cells, dtype=np.uint32), False
+                yield elapsed / 1_000_000, indices, glyphs, colors
+
+    def seek(self, seconds: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Écran (caractères, couleurs en 0xRRGGBB) affiché à un instant donné, en (hauteur, largeur)"""
+        if not len(self.index):
+            raise IndexError("Enregistrement vide")
+        target = int(seconds * 1_000_000)
+        glyphs = colors = None
+        # Depuis la keyframe du bloc : rejouer les différences jusqu'à l'instant demandé
+        for elapsed, keyframe, indices, new_glyphs, new_colors in self._block_frames(self._block_at(target)):
+            if glyphs is not None and elapsed > target:
+                break
+            if keyframe:
+                glyphs, colors = new_glyphs.copy(), new_colors.copy()
+            else:
+                glyphs[indices], colors[indices] = new_glyphs, new_colors
+        return glyphs.reshape(self.height, self.width), colors.reshape(self.height, self.width)
+
+    def ansi_frames(self, start: float = 0.0) -> Iterator[Tuple[float, str]]:
+        """Trames converties en séquences ANSI (seules les cases modifiées sont émises)"""
+        first = True
+        for elapsed, indices, glyphs, colors in self.frames(start):
+            text = ansi_cells(indices, glyphs[indices], colors[indices], self.width)
+            if first:
+                text, first = '\x1b[2J' + text, False
+            yield elapsed, text
+
+    def play(self, speed: float = 1.0, output: TextIO = sys.stdout, start: float = 0.0) -> None:
+        """Rejoue l'enregistrement dans un terminal, ``speed`` fois plus vite"""
+        if speed <= 0:
+            raise ValueError("La vitesse de lecture doit être positive")
+        began = time.perf_counter()
+        output.write('\x1b[?25l')
+        try:
+            for elapsed, text in self.ansi_frames(start):
+                delay = (elapsed - start) / speed - (time.perf_counter() - began)
+                if delay > 0:
+                    time.sleep(delay)
+                output.write(text)
+                output.flush()
+        finally:
+            output.write('\x1b[0m\x1b[?25h\n')
+
+    def to_asciinema(self, output: TextIO, speed: float = 1.0) -> None:
+        """Écrit l'enregistrement au format asciicast v2 (lisible par asciinema play)"""
+        header = {'version': 2, 'width': self.width, 'height': self.height,
+                  'timestamp': int(self.header.get('created', 0)),
+                  'env': {'TERM': 'xterm-256color'}}
+        output.write(json.dumps(header) + '\n')
+        for elapsed, text in self.ansi_frames():
+            output.write(json.dumps([round(elapsed / speed, 6), 'o', text], ensure_ascii=False) + '\n')
+
+def _decode(raw: bytes) -> Iterator[Tuple[int, bool, np.ndarray, np.ndarray, np.ndarray]]:
+    """Trames d'un bloc décompressé : (temps µs, keyframe, indices, caractères, couleurs)"""
+    offset = 0
+    while offset < len(raw):
+        elapsed, keyframe, count = FRAME_HEADER.unpack_from(raw, offset)
+        offset += FRAME_HEADER.size
+        if keyframe:
+            indices = None
+        else:
+            indices = np.frombuffer(raw, dtype='<u4', count=count, offset=offset)
+            offset += 4 * count
+        glyphs = np.frombuffer(raw, dtype='<u4', count=count, offset=offset)
+        colors = np.frombuffer(raw, dtype='<u4', count=count, offset=offset + 4 * count)
+        offset += 8 * count
+        yield elapsed, bool(keyframe), indices, glyphs, colors
+
+def ansi_cells(indices: np.ndarray, glyphs: np.ndarray, colors: np.ndarray, width: int) -> str:
+    """Séquences ANSI qui écrivent des cases (indices croissants) avec leur couleur"""
+    output = []
+    cursor = -1  # Case où se trouve le curseur (-1 : inconnue)
+    current = None
+    for index, glyph, color in zip(indices.tolist(), glyphs.tolist(), colors.tolist()):
+        if index != cursor:
+            y, x = divmod(index, width)
+            output.append(f'\x1b[{y + 1};{x + 1}H')
+        if color != current:
+            current = color
+            output.append('\x1b[38;2;%d;%d;%dm' % (color >> 16, (color >> 8) & 0xFF, color & 0xFF))
+        output.append(chr(glyph))
+        # En fin de ligne, la position du curseur dépend du terminal
+        cursor = index + 1 if (index + 1) % width else -1
+    return ''.join(output)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Lecture ou export d'un enregistrement depuis la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Lecture d'un enregistrement de partie")
+    parser.add_argument('path')
+    parser.add_argument('--speed', type=float, default=1.0, help="Vitesse de lecture (2 : deux fois plus vite)")
+    parser.add_argument('--start', type=float, default=0.0, help="Début de la lecture (secondes)")
+    parser.add_argument('--asciinema', metavar='CAST', help="Exporter au format asciinema au lieu de jouer")
+    args = parser.parse_args(argv)
+
+    player = SessionPlayer(args.path)
+    if args.asciinema:
+        with open(args.asciinema, 'w', encoding='utf-8') as output:
+            player.to_asciinema(output, args.speed)
+    else:
+        player.play(args.speed, start=args.start)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,414 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional
+import numpy as np
+from entities.tower import Tower
+from entities.enemy import Enemy
+from entities.projectile import Projectile
+from models.position import Position
+from core.minimap import Minimap
+from core.entity_layer import EntityLayer
+from utils.constants import WEAPON_NAMES, EFFECT_NAMES, TOWER_COST
+
+class Renderer(ABC):
+    """
+    Interface commune des moteurs d'affichage.
+
+    Le dessin de l'écran est partagé : les sous-classes fournissent une
+    console (méthodes ``clear``, ``print`` et ``draw_frame``) et la façon
+    de la présenter et de lire les événements.
+    """
+    # Constantes pour l'affichage
+    HEALTH_BAR_LENGTH = 10
+    HEALTH_BAR_CHAR_FULL = "█"
+    HEALTH_BAR_CHAR_EMPTY = "░"
+
+    RELOAD_BAR_LENGTH = 10
+    RELOAD_BAR_CHAR_FULL = "●"
+    RELOAD_BAR_CHAR_EMPTY = "○"
+
+    # Caractères pour les entités
+    TOWER_CHAR = "T"
+    PROJECTILE_CHAR = "*"
+    CURSOR_CHAR = "+"
+
+    # Calque des entités : familles de la plus basse à la plus haute, piles d'ennemis comptées ou non
+    ENTITY_LAYERS = EntityLayer.LAYERS
+    STACK_COUNTS = False
+
+    # Couleur des cases à portée selon le nombre de tours qui les couvrent
+    COVERAGE_COLORS = [(60, 90, 160), (80, 130, 210), (120, 180, 255)]
+
+    # Terrain : couleur du sol, des murs et des cases explorées hors de vue (brouillard de guerre)
+    FLOOR_COLOR = (100, 100, 100)
+    WALL_COLOR = (150, 120, 90)
+    FOG_COLOR = (45, 45, 45)
+
+    def __init__(self, screen_width: int = 80, screen_height: int = 40,
+                 map_width: int = 50, map_height: int = 30):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.map_width = map_width
+        self.map_height = map_height
+
+        # Pour le tableau de bord (dashboard)
+        self.dashboard_width = screen_width - map_width - 2
+        self.dashboard_height = screen_height - 2
+        self.dashboard_x = map_width + 2
+        self.dashboard_y = 1
+
+        # Minimap sous la barre de rechargement, créée au premier rendu
+        self.minimap_x = self.dashboard_x + 2
+        self.minimap_y = self.dashboard_y + 19
+        self.minimap_max_width = self.dashboard_width - 4
+        self.minimap_max_height = self.dashboard_height - 24
+        self.minimap = None
+
+        # Calque des entités visibles, créé au premier rendu
+        self.entity_layer = None
+
+        # Le tableau de bord déjà dessiné peut être gardé d'une trame à l'autre
+        self.dashboard_drawn = False
+
+        # Onglet actuel du tableau de bord
+        self.current_tab = "attack"
+
+        # Console de dessin, créée par initialize()
+        self.console = None
+
+        # Enregistrement de la partie (core.recorder.SessionRecorder), optionnel
+        self.recorder = None
+
+    @abstractmethod
+    def initialize(self):
+        """Prépare l'affichage et crée la console"""
+        pass
+
+    @abstractmethod
+    def present(self):
+        """Envoie la console à l'écran"""
+        pass
+
+    @abstractmethod
+    def wait_for_keypress(self) -> Dict:
+        """Attend une touche et retourne l'événement"""
+        pass
+
+    @abstractmethod
+    def check_for_event(self) -> Dict:
+        """Vérifie si un événement est disponible"""
+        pass
+
+    def poll_events(self) -> List[Dict]:
+        """Retourne tous les événements disponibles, dans l'ordre (vide la file)"""
+        events = []
+        event = self.check_for_event()
+        while event:
+            events.append(event)
+            event = self.check_for_event()
+        return events
+
+    def close(self):
+        """Libère les ressources de l'affichage"""
+        pass
+
+    def clear(self):
+        """Efface l'écran"""
+        self.console.clear()
+
+    def render(self, game_map, towers: List[Tower], enemies: List[Enemy],
+               projectiles: List[Projectile], game_state: Dict[str, Any]):
+        """Affiche l'état du jeu"""
+        # Tableau de bord redessiné moins souvent en mode dégradé (voir core.watchdog) : sinon, l'ancien reste
+        quality = game_state.get('quality')
+        redraw_dashboard = quality is None or quality['dashboard'] or not self.dashboard_drawn
+        if redraw_dashboard:
+            self.clear()
+        else:
+            self._clear_outside_dashboard()
+
+        # Brouillard de guerre : cases vues par les tours (et explorées), si demandé
+        visibility = game_state.get('visibility')
+        visible = visibility.visible() if visibility is not None and game_state.get('fog') else None
+
+        # Afficher la carte (avec la portée des tours en mode construction)
+        build_mode = game_state.get('build_mode', False)
+        self._draw_map(game_map, game_state.get('coverage') if build_mode else None, visibility, visible)
+
+        # Afficher les entités (seulement celles en vue sous le brouillard)
+        self._draw_entities(game_map, towers, enemies, projectiles, game_state.get('particles'), visible)
+        if build_mode:
+            self._draw_build_cursor(game_map, game_state['build_cursor'])
+
+        # Afficher le tableau de bord
+        if redraw_dashboard:
+            self._draw_dashboard(game_state, towers, self._selected_tower(towers, game_state))
+            if visible is not None:
+                enemies = [enemy for enemy in enemies if visible[enemy.position.y, enemy.position.x]]
+            self._draw_minimap(game_map, towers, enemies)
+            self.dashboard_drawn = True
+
+        # Afficher le HUD
+        self._draw_hud(game_state)
+
+        # Gérer le Game Over
+        if game_state.get('game_over', False):
+            self._draw_game_over()
+
+        # Enregistrer la trame, puis mettre à jour l'écran
+        if self.recorder is not None:
+            self.recorder.capture(self.console)
+        self.present()
+
+    def _clear_outside_dashboard(self):
+        """Efface l'écran sauf le tableau de bord"""
+        blank = ' ' * self.dashboard_x
+        for y in range(self.screen_height):
+            self.console.print(0, y, blank)
+        for y in (0, self.screen_height - 1):
+            self.console.print(self.dashboard_x, y, ' ' * (self.screen_width - self.dashboard_x))
+
+    def _draw_map(self, game_map, coverage=None, visibility=None, visible=None):
+        """
+        Dessine la carte ; ``coverage`` (tours par case) colore les cases à
+        portée, ``visibility`` (VisibilityMap) distingue les murs et
+        ``visible`` (brouillard de guerre) cache les cases jamais vues et
+        assombrit celles hors de vue.
+        """
+        # Dessiner le cadre de la carte
+        self.console.draw_frame(0, 0, self.map_width + 2, self.map_height + 2,
+                               "World View", fg=(255, 255, 255))
+
+        for y_screen in range(self.map_height):
+            for x_screen in range(self.map_width):
+                world_pos = game_map.screen_to_world(Position(x_screen, y_screen))
+
+                # Afficher le fond
+                if 0 <= world_pos.x < game_map.width and 0 <= world_pos.y < game_map.height:
+                    if visible is not None and not visibility.explored[world_pos.y, world_pos.x]:
+                        continue
+                    color = self.FLOOR_COLOR
+                    if visibility is not None and not visibility.transparent[world_pos.y, world_pos.x]:
+                        color = self.WALL_COLOR
+                    if visible is not None and not visible[world_pos.y, world_pos.x]:
+                        color = self.FOG_COLOR
+                    elif coverage is not None and coverage[world_pos.y, world_pos.x] > 0:
+                        covering = min(int(coverage[world_pos.y, world_pos.x]), len(self.COVERAGE_COLORS))
+                        color = self.COVERAGE_COLORS[covering - 1]
+                    self.console.print(x_screen + 1, y_screen + 1, game_map.grid[world_pos.y][world_pos.x], fg=color)
+
+    def _draw_entities(self, game_map, towers: List[Tower], enemies: List[Enemy],
+                      projectiles: List[Projectile], particles=None, visible=None):
+        """Dessine les entités visibles sur la carte, composées en un calque (voir core.entity_layer)"""
+        if self.entity_layer is None:
+            self.entity_layer = EntityLayer(self.map_width, self.map_height, self.ENTITY_LAYERS, self.STACK_COUNTS)
+        codes, colors = self.entity_layer.compose(game_map, towers, enemies, projectiles, particles)
+        if visible is not None:
+            # Brouillard de guerre : rien n'est dessiné hors de vue des tours
+            in_view = visible[game_map.viewport_y:game_map.viewport_y + codes.shape[0],
+                              game_map.viewport_x:game_map.viewport_x + codes.shape[1]]
+            shown = np.zeros(codes.shape, dtype=bool)
+            shown[:in_view.shape[0], :in_view.shape[1]] = in_view
+            codes[~shown] = 0
+        self._composite_layer(1, 1, codes, colors)
+
+    def _composite_layer(self, x: int, y: int, codes, colors):
+        """Pose un calque sur la console (cases de code non nul) ; une écriture par case occupée"""
+        rows, columns = np.nonzero(codes)
+        for column, row, code, fg in zip(columns.tolist(), rows.tolist(), codes[rows, columns].tolist(),
+                                         colors[rows, columns].tolist()):
+            self.console.print(x + column, y + row, chr(code), fg=tuple(fg))
+
+    def _draw_build_cursor(self, game_map, cursor: Position):
+        """Dessine le curseur du mode construction"""
+        if game_map.is_in_viewport(cursor):
+            screen_pos = game_map.world_to_screen(cursor)
+            self.console.print(screen_pos.x + 1, screen_pos.y + 1, self.CURSOR_CHAR, fg=(0, 200, 255))
+
+    def _selected_tower(self, towers: List[Tower], game_state: Dict[str, Any]) -> Optional[Tower]:
+        """Tour visée par les améliorations : sous le curseur en mode construction, sinon la tour principale"""
+        if not towers:
+            return None
+        cursor = game_state.get('build_cursor')
+        if game_state.get('build_mode') and cursor is not None:
+            for tower in towers:
+                if tower.position.x == cursor.x and tower.position.y == cursor.y:
+                    return tower
+        return towers[0]
+
+    def _draw_dashboard(self, game_state: Dict[str, Any], towers: List[Tower], tower: Optional[Tower]):
+        """Dessine le tableau de bord (valeurs de la tour sélectionnée)"""
+        # Cadre du tableau de bord
+        self.console.draw_frame(self.dashboard_x, self.dashboard_y,
+                              self.dashboard_width, self.dashboard_height,
+                              "Dashboard", fg=(255, 255, 255))
+
+        # Onglets
+        tab_attack_color = (255, 255, 255) if self.current_tab == "attack" else (150, 150, 150)
+        tab_defense_color = (255, 255, 255) if self.current_tab == "defense" else (150, 150, 150)
+
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 2, "[A] Attaque", fg=tab_attack_color)
+        self.console.print(self.dashboard_x + 15, self.dashboard_y + 2, "[D] Défense", fg=tab_defense_color)
+
+        # Ligne horizontale sous les onglets
+        for x in range(self.dashboard_width - 2):
+            self.console.print(self.dashboard_x + 1 + x, self.dashboard_y + 3, "─", fg=(255, 255, 255))
+
+        # Tour sélectionnée, parmi toutes les tours
+        if tower is not None:
+            number = next(i for i, other in enumerate(towers) if other is tower) + 1
+            self.console.print(self.dashboard_x + 2, self.dashboard_y + 4,
+                             f"Tour {number}/{len(towers)} ({tower.position.x}, {tower.position.y})",
+                             fg=(150, 150, 150))
+
+        # Contenu de l'onglet
+        if self.current_tab == "attack":
+            self._draw_attack_tab(game_state, tower)
+        elif self.current_tab == "defense":
+            self._draw_defense_tab(game_state, tower)
+
+        # Barre de rechargement
+        self._draw_reload_bar(tower.reload_progress if tower else 0.0)
+
+        # Score et vague
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + self.dashboard_height - 3,
+                         f"Score: {game_state.get('score', 0)}", fg=(255, 255, 0))
+
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + self.dashboard_height - 2,
+                         f"Vague: {game_state.get('wave', 1)}", fg=(255, 255, 255))
+
+    def _draw_minimap(self, game_map, towers: List[Tower], enemies: List[Enemy]):
+        """Dessine la minimap du monde entier dans le tableau de bord"""
+        if self.minimap_max_width <= 0 or self.minimap_max_height <= 0:
+            return
+
+        if (self.minimap is None or self.minimap.world_width != game_map.width
+                or self.minimap.world_height != game_map.height):
+            self.minimap = Minimap(game_map.width, game_map.height,
+                                   self.minimap_max_width, self.minimap_max_height)
+
+        self.console.print(self.minimap_x, self.minimap_y - 1, "Minimap", fg=(200, 200, 200))
+        self.minimap.draw(self.console, self.minimap_x, self.minimap_y, game_map, towers, enemies)
+
+    def _draw_attack_tab(self, game_state: Dict[str, Any], tower: Tower):
+        """Dessine l'onglet d'amélioration des attaques"""
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 5,
+                         "--- Améliorations d'Attaque ---", fg=(200, 200, 200))
+
+        # Dégâts
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 7,
+                         f"[1] Dégâts (+1): Coût {10}", fg=(200, 200, 200))
+
+        damage_display = str(tower.damage) if tower else "1"
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 8,
+                         f"    Actuel: {damage_display}", fg=(150, 150, 150))
+
+        # Portée
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 10,
+                         f"[2] Portée (+1): Coût {15}", fg=(200, 200, 200))
+
+        range_display = str(tower.range) if tower else "3"
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 11,
+                         f"    Actuelle: {range_display}", fg=(150, 150, 150))
+
+        # Vitesse de tir
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 13,
+                         f"[S] Vitesse Tir (+0.2): Coût {25}", fg=(200, 200, 200))
+
+        fire_rate_display = f"{tower.fire_rate:.1f}" if tower else "1.0"
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 14,
+                         f"    Actuelle: {fire_rate_display}", fg=(150, 150, 150))
+
+        # Arme
+        weapon_display = WEAPON_NAMES[tower.weapon] if tower else WEAPON_NAMES['single']
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 15,
+                         f"[W] Arme: {weapon_display}", fg=(200, 200, 200))
+
+        # Effet de statut (affiché sous la barre de rechargement)
+        effect_display = EFFECT_NAMES[tower.effect] if tower else EFFECT_NAMES[None]
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 17,
+                         f"[E] Effet: {effect_display}", fg=(200, 200, 200))
+
+    def _draw_defense_tab(self, game_state: Dict[str, Any], tower: Tower):
+        """Dessine l'onglet d'amélioration de la défense"""
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 5,
+                         "--- Améliorations de Défense ---", fg=(200, 200, 200))
+
+        # Vie de la tour
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 7,
+                         f"[3] Vie de la Tour (+5): Coût {20}", fg=(200, 200, 200))
+
+        # La vie est celle de la partie, commune à toutes les tours
+        hp_display = f"{game_state.get('tower_hp', 0)}/{game_state.get('max_tower_hp', 10)}"
+
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 8,
+                         f"    Actuelle: {hp_display}", fg=(150, 150, 150))
+
+    def _draw_hud(self, game_state: Dict[str, Any]):
+        """Dessine le HUD (barre de vie, etc.)"""
+        tower_hp = game_state.get('tower_hp', 0)
+        max_tower_hp = game_state.get('max_tower_hp', 10)
+
+        self._draw_health_bar(tower_hp, max_tower_hp, 1, self.map_height + 2)
+
+        # Indicateur de rewind : position dans l'historique et mémoire utilisée
+        rewind = game_state.get('rewind')
+        if rewind:
+            self.console.print(20, self.map_height + 2,
+                               f"REWIND {rewind['offset']:+.1f}s  ({rewind['bytes'] / 1024:.0f} Ko)",
+                               fg=(0, 200, 255))
+        elif game_state.get('build_mode'):
+            self.console.print(20, self.map_height + 2,
+                               f"CONSTRUCTION  [Entrée] Tour ({TOWER_COST})  [X] Vendre  [B] Quitter",
+                               fg=(0, 200, 255))
+
+        # Latence des dernières entrées (événement reçu -> action appliquée)
+        latency = game_state.get('input_latency')
+        if latency is not None:
+            self.console.print(1, self.map_height + 3, f"Entrée: {latency * 1000:.1f} ms",
+                               fg=(100, 100, 100))
+
+        # Qualité réduite pour tenir le rythme des ticks (voir core.watchdog)
+        quality = game_state.get('quality')
+        if quality and quality['level']:
+            width = self.dashboard_x - 2
+            self.console.print(1, self.map_height + 4,
+                               f"Qualité -{quality['level']} (charge {quality['load'] * 100:.0f}%)"[:width],
+                               fg=(255, 150, 0))
+            self.console.print(1, self.map_height + 5, ', '.join(quality['labels'])[:width], fg=(255, 150, 0))
+
+    def _draw_health_bar(self, value: int, maximum: int, x: int, y: int):
+        """Dessine une barre de vie"""
+        # Calculer le remplissage
+        fill_length = int(self.HEALTH_BAR_LENGTH * value / maximum) if maximum > 0 else 0
+        bar = self.HEALTH_BAR_CHAR_FULL * fill_length + self.HEALTH_BAR_CHAR_EMPTY * (self.HEALTH_BAR_LENGTH - fill_length)
+
+        # Choisir la couleur en fonction de la santé
+        if value > maximum // 2:
+            color = (0, 255, 0)  # Vert
+        elif value > maximum // 4:
+            color = (255, 255, 0)  # Jaune
+        else:
+            color = (255, 0, 0)  # Rouge
+
+        self.console.print(x, y, f"HP: [{bar}]", fg=color)
+
+    def _draw_reload_bar(self, progress: float):
+        """Dessine la barre de rechargement"""
+        # Calculer le remplissage
+        fill_length = int(self.RELOAD_BAR_LENGTH * progress)
+        bar = self.RELOAD_BAR_CHAR_FULL * fill_length + self.RELOAD_BAR_CHAR_EMPTY * (self.RELOAD_BAR_LENGTH - fill_length)
+
+        # Choisir la couleur en fonction de l'état
+        color = (0, 200, 255) if progress >= 1.0 else (100, 100, 100)  # Cyan ou Gris
+
+        self.console.print(self.dashboard_x + 2, self.dashboard_y + 16, f"Prêt: [{bar}]", fg=color)
+
+    def _draw_game_over(self):
+        """Affiche l'écran de Game Over"""
+        self._print_centered(self.screen_height // 2, "GAME OVER", (255, 0, 0))
+        self._print_centered(self.screen_height // 2 + 2,
+                             "Appuyez sur une touche pour quitter", (255, 255, 255))
+
+    def _print_centered(self, y: int, text: str, fg):
+        """Affiche un texte centré horizontalement sur l'écran"""
+        self.console.print(self.screen_width // 2 - len(text) // 2, y, text, fg=fg)
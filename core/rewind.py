@@ -0,0 +1,146 @@
+import random
+import zlib
+from collections import deque
+from typing import Dict, Any
+import numpy as np
+
+from core.simulation import Simulation
+
+# Champs de Simulation stockés comme tableaux (le reste est scalaire)
+ARRAY_FIELDS = ('enemies', 'projectiles', 'towers', 'tower_reloads')
+IGNORED_FIELDS = ('rng', 'rng_shared')
+
+class RewindBuffer:
+    """
+    Historique borné des derniers ticks, pour revoir la fin d'une partie.
+
+    Chaque tick est stocké comme une différence avec le précédent : les
+    scalaires modifiés, et les tableaux d'entités combinés par XOR avec
+    ceux du tick précédent puis compressés (les valeurs inchangées
+    deviennent des zéros). Une image complète (keyframe) est gardée tous
+    les ``keyframe_interval`` ticks, ce qui borne le coût d'un accès.
+    """
+    def __init__(self, max_ticks: int = 600, keyframe_interval: int = 50,
+                 max_bytes: int = 8 * 1024 * 1024):
+        self.max_ticks = max_ticks  # 60 s à 10 ticks par seconde
+        self.keyframe_interval = keyframe_interval
+        self.max_bytes = max_bytes
+
+        # Entrées : (keyframe, scalaires, {champ: (données, forme, type, xor)}, taille)
+        self.entries: deque = deque()
+        self.first_tick = 0
+        self.bytes_used = 0
+
+        self._previous_scalars: Dict[str, Any] = {}
+        self._previous_arrays: Dict[str, np.ndarray] = {}
+        self._since_keyframe = 0
+
+    @property
+    def last_tick(self) -> int:
+        """Numéro du dernier tick enregistré"""
+        return self.first_tick + len(self.entries) - 1
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def record(self, sim: Simulation) -> None:
+        """Ajoute l'état d'un tick à l'historique"""
+        keyframe = not self.entries or self._since_keyframe >= self.keyframe_interval
+        self._since_keyframe = 1 if keyframe else self._since_keyframe + 1
+
+        scalars = {name: value for name, value in sim.__dict__.items()
+                   if name not in ARRAY_FIELDS and name not in IGNORED_FIELDS}
+        if keyframe:
+            stored_scalars = scalars
+        else:
+            stored_scalars = {name: value for name, value in scalars.items()
+                              if self._previous_scalars.get(name) != value}
+
+        arrays = {}
+        size = 64 + 32 * len(stored_scalars)  # Estimation grossière des scalaires
+        for name in ARRAY_FIELDS:
+            array = np.ascontiguousarray(getattr(sim, name))
+            previous = self._previous_arrays.get(name)
+            xor = (not keyframe and previous is not None and previous.shape == array.shape
+                   and previous.dtype == array.dtype)
+            raw = array.view(_bits(array.dtype))
+            if xor:
+                raw = raw ^ previous.view(raw.dtype)
+            data = zlib.compress(raw.tobytes(), 1)
+            arrays[name] = (data, array.shape, array.dtype.str, xor)
+            size += len(data)
+            self._previous_arrays[name] = array.copy()
+
+        self._previous_scalars = scalars
+        self.entries.append((keyframe, stored_scalars, arrays, size))
+        self.bytes_used += size
+        self._evict()
+
+    def _evict(self) -> None:
+        """Retire les ticks les plus anciens au-delà des limites, keyframe par keyframe"""
+        while len(self.entries) > 1 and (len(self.entries) > self.max_ticks
+                                         or self.bytes_used > self.max_bytes):
+            self._pop_oldest()
+            # L'historique doit toujours commencer par une keyframe
+            while self.entries and not self.entries[0][0]:
+                self._pop_oldest()
+
+    def _pop_oldest(self) -> None:
+        """Retire l'entrée la plus ancienne"""
+        _, _, _, size = self.entries.popleft()
+        self.bytes_used -= size
+        self.first_tick += 1
+
+    def seek(self, tick: int) -> Simulation:
+        """Reconstruit l'état d'un tick de l'historique"""
+        if not self.entries:
+            raise IndexError("Historique vide")
+        index = max(0, min(tick - self.first_tick, len(self.entries) - 1))
+
+        # Remonter jusqu'à la keyframe précédente, puis rejouer les différences
+        start = index
+        while not self.entries[start][0]:
+            start -= 1
+
+        scalars: Dict[str, Any] = {}
+        arrays: Dict[str, np.ndarray] = {}
+        for position in range(start, index + 1):
+            _, stored_scalars, stored_arrays, _ = self.entries[position]
+            scalars.update(stored_scalars)
+            for name, (data, shape, dtype, xor) in stored_arrays.items():
+                bits = _bits(np.dtype(dtype))
+                raw = np.frombuffer(zlib.decompress(data), dtype=bits).reshape(shape)
+                if xor:
+                    raw = raw ^ arrays[name].view(bits)
+                arrays[name] = raw.view(dtype)
+
+        sim = Simulation.__new__(Simulation)
+        sim.__dict__.update(scalars)
+        for name, array in arrays.items():
+            setattr(sim, name, array.copy())
+        sim.rng = random.Random()
+        sim.rng_shared = False
+        return sim
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Occupation mémoire de l'historique"""
+        keyframes = sum(1 for entry in self.entries if entry[0])
+        return {
+            'ticks': len(self.entries),
+            'keyframes': keyframes,
+            'bytes': self.bytes_used,
+            'max_bytes': self.max_bytes,
+        }
+
+    def clear(self) -> None:
+        """Vide l'historique"""
+        self.entries.clear()
+        self.first_tick = 0
+        self.bytes_used = 0
+        self._previous_scalars = {}
+        self._previous_arrays = {}
+        self._since_keyframe = 0
+
+def _bits(dtype: np.dtype) -> np.dtype:
+    """Type entier non signé de même taille, pour combiner les valeurs par XOR"""
+    return np.dtype(f'u{dtype.itemsize}')
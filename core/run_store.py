@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Historique des parties dans une base SQLite locale :
+# - runs : une ligne par partie (paramètres, score et vague finals, achats) ;
+# - wave_stats : une ligne par vague (ennemis tués et passés, dégâts, durée des ticks).
+# Les écritures sont mises en file et faites par un fil dédié, par lots
+# dans une seule transaction : la boucle de jeu n'attend jamais le disque.
+# L'historique est facultatif : main.py ne l'ouvre que si TOWER_RUNS donne un fichier.
+# Consultation : python -m core.run_store [FICHIER] [--sweep NOM]
+
+DEFAULT_PATH = 'runs.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    ended REAL,
+    seed INTEGER,
+    frontend TEXT,
+    sweep TEXT,
+    variant TEXT,
+    params TEXT,
+    final_score INTEGER,
+    final_wave INTEGER,
+    ticks INTEGER,
+    upgrades TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (final_score DESC);
+CREATE INDEX IF NOT EXISTS runs_by_sweep ON runs (sweep, variant, final_score, final_wave);
+
+CREATE TABLE IF NOT EXISTS wave_stats (
+    run_id INTEGER NOT NULL,
+    wave INTEGER NOT NULL,
+    ticks INTEGER NOT NULL,
+    kills INTEGER NOT NULL,
+    leaks INTEGER NOT NULL,
+    damage INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    tick_mean_ms REAL NOT NULL,
+    tick_max_ms REAL NOT NULL,
+    PRIMARY KEY (run_id, wave)
+) WITHOUT ROWID;
+"""
+
+INSERT_RUN = ("INSERT INTO runs (id, started, seed, frontend, sweep, variant, params) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?)")
+FINISH_RUN = ("UPDATE runs SET ended = ?, final_score = ?, final_wave = ?, ticks = ?, upgrades = ? "
+              "WHERE id = ?")
+INSERT_WAVE = ("INSERT OR REPLACE INTO wave_stats (run_id, wave, ticks, kills, leaks, damage, score, "
+               "tick_mean_ms, tick_max_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+def _connect(path: str) -> sqlite3.Connection:
+    """Connexion réglée pour des écritures groupées et des lectures concurrentes"""
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+class RunStore:
+    """
+    Base de l'historique des parties, écrite en arrière-plan.
+
+    Les méthodes d'écriture ne font que mettre une requête en file ; le
+    fil d'écriture vide la file par lots (au plus ``batch_size``
+    requêtes par transaction). Les identifiants de partie sont tirés au
+    hasard (62 bits), ce qui permet à plusieurs processus d'écrire dans
+    la même base. Les lectures passent par une connexion séparée.
+    """
+    def __init__(self, path: str = DEFAULT_PATH, batch_size: int = 1024):
+        self.path = path
+        self.batch_size = batch_size
+
+        # Schéma créé avant tout : les lectures peuvent commencer tout de suite
+        connection = _connect(path)
+        connection.executescript(SCHEMA)
+        connection.close()
+
+        self.queue: queue.Queue = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, name='run-store', daemon=True)
+        self.writer.start()
+        self._reader: Optional[sqlite3.Connection] = None
+        self.written = 0  # Requêtes écrites (fil d'écriture)
+
+    # --- Écriture ---
+
+    def start_run(self, seed: Optional[int] = None, frontend: Optional[str] = None,
+                  params: Optional[Dict[str, Any]] = None, sweep: Optional[str] = None,
+                  variant: Optional[str] = None) -> int:
+        """Enregistre le début d'une partie ; retourne son identifiant"""
+        run_id = uuid.uuid4().int >> 66
+        self.queue.put((INSERT_RUN, (run_id, time.time(), seed, frontend, sweep, variant,
+                                     json.dumps(params or {}, sort_keys=True))))
+        return run_id
+
+    def record_wave(self, run_id: int, wave: int, stats: Dict[str, Any]) -> None:
+        """Enregistre les statistiques d'une vague (voir GameEngine._close_wave)"""
+        ticks = stats['ticks']
+        self.queue.put((INSERT_WAVE, (run_id, wave, ticks, stats['kills'], stats['leaks'], stats['damage'],
+                                      stats['score'], stats['tick_time'] * 1000 / max(1, ticks),
+                                      stats['tick_max'] * 1000)))
+
+    def finish_run(self, run_id: int, score: int, wave: int, ticks: int,
+                   upgrades: Optional[Dict[str, int]] = None) -> None:
+        """Enregistre le résultat final d'une partie"""
+        self.queue.put((FINISH_RUN, (time.time(), score, wave, ticks,
+                                     json.dumps(upgrades or {}, sort_keys=True), run_id)))
+
+    def flush(self) -> None:
+        """Attend que toutes les écritures en file soient faites"""
+        self.queue.join()
+
+    def close(self) -> None:
+        """Termine les écritures en file, puis ferme la base"""
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def __enter__(self) -> 'RunStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _write_loop(self) -> None:
+        """Fil d'écriture : regroupe les requêtes en file dans une transaction"""
+        connection = _connect(self.path)
+        try:
+            running = True
+            while running:
+                batch = [self.queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                running = None not in batch
+                statements = [item for item in batch if item is not None]
+                try:
+                    with connection:
+                        self._execute(connection, statements)
+                    self.written += len(statements)
+                except sqlite3.Error as error:
+                    print(f"[HISTORIQUE] Écriture impossible ({len(statements)} requêtes perdues) : {error}")
+                finally:
+                    for _ in batch:
+                        self.queue.task_done()
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _execute(connection: sqlite3.Connection, statements: List[Tuple[str, Tuple]]) -> None:
+        """Exécute des requêtes dans l'ordre, les suites de requêtes identiques en un seul appel"""
+        start = 0
+        while start < len(statements):
+            sql = statements[start][0]
+            end = start + 1
+            while end < len(statements) and statements[end][0] == sql:
+                end += 1
+            connection.executemany(sql, [params for _, params in statements[start:end]])
+            start = end
+
+    # --- Lecture ---
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[Dict[str, Any]]:
+        """Résultats d'une requête de lecture, une ligne par dictionnaire"""
+        if self._reader is None:
+            self._reader = _connect(self.path)
+            self._reader.row_factory = sqlite3.Row
+        return [dict(row) for row in self._reader.execute(sql, params)]
+
+    def leaderboard(self, limit: int = 10, sweep: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Meilleures parties terminées (index runs_by_score, ou runs_by_sweep pour une série)"""
+        columns = 'id, started, seed, sweep, variant, final_score, final_wave, ticks'
+        if sweep is None:
+            return self._query(f"SELECT {columns} FROM runs WHERE final_score IS NOT NULL "
+                               "ORDER BY final_score DESC LIMIT ?", (limit,))
+        return self._query(f"SELECT {columns} FROM runs WHERE sweep = ? AND final_score IS NOT NULL "
+                           "ORDER BY final_score DESC LIMIT ?", (sweep, limit))
+
+    def compare(self, sweep: str) -> List[Dict[str, Any]]:
+        """Résultats d'une série d'expériences, par variante (index runs_by_sweep, sans lire la table)"""
+        return self._query(
+            "SELECT variant, COUNT(final_score) AS runs, AVG(final_score) AS mean_score, "
+            "MAX(final_score) AS best_score, AVG(final_wave) AS mean_wave "
+            "FROM runs WHERE sweep = ? GROUP BY variant ORDER BY mean_score DESC", (sweep,))
+
+    def waves(self, run_id: int) -> List[Dict[str, Any]]:
+        """Statistiques vague par vague d'une partie"""
+        return self._query("SELECT * FROM wave_stats WHERE run_id = ? ORDER BY wave", (run_id,))
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Affiche le classement, ou la comparaison des variantes d'une série"""
+    parser = argparse.ArgumentParser(description="Historique des parties")
+    parser.add_argument('path', nargs='?', default=DEFAULT_PATH)
+    parser.add_argument('--sweep', help="comparer les variantes d'une série")
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args(argv)
+    # Consulter ne crée pas de base vide
+    if not os.path.exists(args.path):
+        parser.error(f"{args.path} introuvable (l'historique s'active avec TOWER_RUNS={args.path})")
+
+    with RunStore(args.path) as store:
+        if args.sweep:
+            print(f"{'variante':<20}{'parties':>8}{'score moyen':>14}{'meilleur':>10}{'vague moy.':>12}")
+            for row in store.compare(args.sweep):
+                print(f"{str(row['variant']):<20}{row['runs']:>8}{row['mean_score'] or 0:>14.1f}"
+                      f"{row['best_score'] or 0:>10}{row['mean_wave'] or 0:>12.1f}")
+            return
+
+        print(f"{'#':>3}  {'score':>7}{'vague':>7}{'ticks':>8}  date")
+        for rank, row in enumerate(store.leaderboard(args.limit), 1):
+            date = time.strftime('%Y-%m-%d %H:%M', time.localtime(row['started']))
+            print(f"{rank:>3}  {row['final_score']:>7}{row['final_wave']:>7}{row['ticks'] or 0:>8}  {date}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core.env import ACTION_NAMES, ACTIONS
+from core.simulation import Simulation
+
+# Hôte de parties : des centaines de sessions (une Simulation chacune)
+# avancées dans une seule boucle asyncio, sans processus ni fil par partie.
+# Chaque session a sa cadence et son horloge de simulation ; les actions
+# arrivent par une file et sont appliquées au début du tick suivant. Un
+# ordonnanceur unique joue les ticks dus, le plus en retard d'abord, et
+# rend la main à la boucle entre deux tranches ; une session en pause ou
+# terminée n'est plus planifiée et ne coûte rien.
+# Protocole local (une requête JSON par ligne, une réponse par ligne) :
+#     python -m core.session_host serve [--socket tower.sock | --port 8765]
+#     python -m core.session_host bench [--sessions 500] [--seconds 5]
+
+DEFAULT_SOCKET = 'tower.sock'
+DEFAULT_TICK_RATE = 10.0  # Ticks par seconde (game_speed de 0,1 s)
+# Cadence maximale d'une session : au-delà, elle accaparerait la boucle aux dépens des autres
+MAX_TICK_RATE = 100.0
+DELTA_TIME = 0.1  # Durée simulée d'un tick
+# Retard (en ticks) au-delà duquel une session abandonne les ticks manqués au lieu de les rattraper
+MAX_BACKLOG = 5
+# Durée (secondes) d'une tranche de ticks avant de rendre la main à la boucle (entrées, sockets)
+TIME_SLICE = 0.005
+# Données en attente d'envoi (octets) au-delà desquelles un observateur lent saute des états
+WATCH_BUFFER_LIMIT = 64 * 1024
+
+class Session:
+    """
+    Une partie hébergée : simulation, file d'actions, cadence et mesures.
+
+    ``deadline`` est l'heure (horloge de la boucle) du prochain tick ; le
+    retard d'un tick est l'écart entre cette échéance et l'heure à
+    laquelle il est joué.
+    """
+    def __init__(self, session_id: int, seed: Optional[int] = None, tick_rate: float = DEFAULT_TICK_RATE,
+                 delta_time: float = DELTA_TIME, world_width: int = 100, world_height: int = 100):
+        self.id = session_id
+        self.sim = Simulation(world_width, world_height, seed)
+        self.tick_rate = tick_rate
+        self.interval = 1.0 / tick_rate
+        self.delta_time = delta_time
+        self.inputs: asyncio.Queue = asyncio.Queue()
+        self.paused = False
+        self.deadline = 0.0
+        self.generation = 0  # Change à chaque (re)planification : invalide les anciennes entrées du tas
+
+        # Observateurs : file d'écriture -> un état envoyé tous les ``every`` ticks
+        self.watchers: Dict[asyncio.StreamWriter, int] = {}
+
+        # Mesures
+        self.ticks = 0
+        self.skipped = 0  # Ticks abandonnés (retard supérieur à MAX_BACKLOG)
+        self.lag_mean = 0.0  # Retard moyen lissé (secondes)
+        self.lag_max = 0.0
+        self.tick_time = 0.0  # Temps de calcul cumulé (secondes)
+
+    @property
+    def clock(self) -> float:
+        """Temps simulé de la partie (secondes)"""
+        return self.ticks * self.delta_time
+
+    @property
+    def idle(self) -> bool:
+        """Vrai si la session n'a plus à être planifiée"""
+        return self.paused or self.sim.game_over
+
+    def send(self, action: Dict[str, Any]) -> None:
+        """Met une action (format de TcodInputHandler) en file pour le prochain tick"""
+        self.inputs.put_nowait(action)
+
+    def tick(self, now: float) -> None:
+        """Joue un tick : actions en file, puis un pas de simulation"""
+        lag = max(0.0, now - self.deadline)
+        self.lag_mean += 0.05 * (lag - self.lag_mean)
+        self.lag_max = max(self.lag_max, lag)
+
+        start = time.perf_counter()
+        while not self.inputs.empty():
+            action = self.inputs.get_nowait()
+            if action.get('cost', 0) <= self.sim.score:  # Achat trop cher ignoré, comme en jeu
+                self.sim.apply_action(action)
+        self.sim.step(self.delta_time)
+        self.tick_time += time.perf_counter() - start
+        self.ticks += 1
+
+        self.deadline += self.interval
+        if now - self.deadline > MAX_BACKLOG * self.interval:
+            missed = int((now - self.deadline) / self.interval)
+            self.skipped += missed
+            self.deadline += missed * self.interval
+
+        if self.watchers:
+            self._notify()
+
+    def _notify(self) -> None:
+        """Envoie l'état aux observateurs dont c'est le tour (les plus lents sautent des états)"""
+        line = None
+        for writer, every in list(self.watchers.items()):
+            if writer.is_closing():
+                del self.watchers[writer]
+                continue
+            if self.ticks % every or writer.transport.get_write_buffer_size() > WATCH_BUFFER_LIMIT:
+                continue
+            if line is None:
+                line = _encode({'session': self.id, 'tick': self.ticks, 'state': self.sim.summary()})
+            writer.write(line)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Mesures de la session"""
+        return {
+            'session': self.id,
+            'ticks': self.ticks,
+            'clock': self.clock,
+            'tick_rate': self.tick_rate,
+            'paused': self.paused,
+            'game_over': self.sim.game_over,
+            'lag_mean_ms': self.lag_mean * 1000,
+            'lag_max_ms': self.lag_max * 1000,
+            'skipped': self.skipped,
+            'tick_mean_ms': self.tick_time * 1000 / max(1, self.ticks),
+        }
+
+class SessionHost:
+    """
+    Ensemble de sessions avancées par un seul ordonnanceur asyncio.
+
+    Les sessions actives sont dans un tas trié par échéance ; run() joue
+    les ticks échus dans l'ordre des échéances (équitable : la session la
+    plus en retard passe d'abord), rend la main à la boucle toutes les
+    TIME_SLICE secondes, et dort jusqu'à la prochaine échéance quand rien
+    n'est dû. create() et resume() réveillent l'ordonnanceur.
+    """
+    def __init__(self, time_slice: float = TIME_SLICE):
+        self.time_slice = time_slice
+        self.sessions: Dict[int, Session] = {}
+        self._ids = itertools.count(1)
+        self._queue: List[Tuple[float, int, int, Session]] = []  # (échéance, ordre, génération, session)
+        self._order = itertools.count()
+        self._wake: Optional[asyncio.Event] = None
+        self.running = False
+        self.ticks = 0
+
+    def _event(self) -> asyncio.Event:
+        """Événement de réveil de l'ordonnanceur (créé dans la boucle courante)"""
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        return self._wake
+
+    def _schedule(self, session: Session) -> None:
+        """(Re)place une session dans le tas des échéances"""
+        session.generation += 1
+        heapq.heappush(self._queue, (session.deadline, next(self._order), session.generation, session))
+        self._event().set()
+
+    # --- Sessions ---
+
+    def create(self, seed: Optional[int] = None, tick_rate: float = DEFAULT_TICK_RATE, **options) -> Session:
+        """Crée une session ; son premier tick est dû tout de suite"""
+        # Refuse aussi NaN (toute comparaison est fausse)
+        if not 0 < tick_rate <= MAX_TICK_RATE:
+            raise ValueError(f"cadence invalide : {tick_rate} (de 0 exclu à {MAX_TICK_RATE:g} ticks par seconde)")
+        session = Session(next(self._ids), seed, tick_rate, **options)
+        session.deadline = asyncio.get_running_loop().time()
+        self.sessions[session.id] = session
+        self._schedule(session)
+        return session
+
+    def pause(self, session: Session) -> None:
+        """Suspend une session : son horloge s'arrête et elle n'est plus planifiée"""
+        session.paused = True
+
+    def resume(self, session: Session) -> None:
+        """Relance une session suspendue, à partir de maintenant (sans rattraper la pause)"""
+        if not session.paused:
+            return
+        session.paused = False
+        session.deadline = asyncio.get_running_loop().time()
+        self._schedule(session)
+
+    def remove(self, session: Session) -> None:
+        """Retire une session de l'hôte"""
+        session.paused = True
+        self.sessions.pop(session.id, None)
+
+    def send(self, session: Session, action: Dict[str, Any]) -> None:
+        """Met une action en file (appliquée au prochain tick de la session)"""
+        session.send(action)
+
+    # --- Ordonnanceur ---
+
+    async def run(self) -> None:
+        """Joue les ticks de toutes les sessions jusqu'à stop()"""
+        loop = asyncio.get_running_loop()
+        wake = self._event()
+        self.running = True
+        while self.running:
+            slice_end = loop.time() + self.time_slice
+            while self._queue:
+                deadline, _, generation, session = self._queue[0]
+                now = loop.time()
+                if deadline > now or now > slice_end:
+                    break
+                heapq.heappop(self._queue)
+                if generation != session.generation or session.idle:
+                    continue  # Entrée périmée, session en pause ou terminée
+                session.tick(now)
+                self.ticks += 1
+                if not session.idle:
+                    heapq.heappush(self._queue, (session.deadline, next(self._order), generation, session))
+
+            # Rendre la main ; dormir jusqu'à la prochaine échéance si rien n'est dû
+            delay = self._queue[0][0] - loop.time() if self._queue else None
+            if delay is not None and delay <= 0:
+                await asyncio.sleep(0)
+                continue
+            wake.clear()
+            try:
+                await asyncio.wait_for(wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        """Arrête l'ordonnanceur après la tranche en cours"""
+        self.running = False
+        self._event().set()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Mesures de l'hôte et de chaque session"""
+        sessions = [session.metrics() for session in self.sessions.values()]
+        active = [metrics for metrics in sessions if not (metrics['paused'] or metrics['game_over'])]
+        return {
+            'sessions': len(sessions),
+            'active': len(active),
+            'ticks': self.ticks,
+            'lag_mean_ms': sum(m['lag_mean_ms'] for m in active) / len(active) if active else 0.0,
+            'lag_max_ms': max((m['lag_max_ms'] for m in active), default=0.0),
+            'skipped': sum(m['skipped'] for m in sessions),
+            'per_session': sessions,
+        }
+
+    # --- Protocole local ---
+
+    async def serve(self, path: Optional[str] = DEFAULT_SOCKET, port: Optional[int] = None) -> None:
+        """Accepte les clients sur un socket Unix (ou TCP local) et joue les sessions"""
+        if port is not None:
+            server = await asyncio.start_server(self._client, '127.0.0.1', port)
+        else:
+            server = await asyncio.start_unix_server(self._client, path)
+        async with server:
+            await self.run()
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Une connexion : une requête JSON par ligne, une réponse par ligne.
+        À sa fermeture, les sessions créées par la connexion sont retirées de
+        l'hôte ; celles qu'elle ne faisait qu'observer perdent seulement cet
+        observateur.
+        """
+        created: Set[Session] = set()
+        watched: Set[Session] = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = self.handle(json.loads(line), writer, created, watched)
+                except (KeyError, ValueError, TypeError) as error:
+                    response = {'error': str(error)}
+                writer.write(_encode(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for session in watched:
+                session.watchers.pop(writer, None)
+            for session in created:
+                self.remove(session)
+            writer.close()
+
+    def handle(self, request: Dict[str, Any], writer: Optional[asyncio.StreamWriter] = None,
+               created: Optional[Set[Session]] = None,
+               watched: Optional[Set[Session]] = None) -> Dict[str, Any]:
+        """
+        Exécute une requête du protocole :
+        create {seed, tick_rate (0 < tick_rate <= MAX_TICK_RATE)} ;
+        action {session, action (nom de core.env)} ;
+        pause / resume / state / close {session} ; watch {session, every} ;
+        metrics {session facultatif}.
+        """
+        op = request['op']
+        if op == 'create':
+            session = self.create(request.get('seed'), float(request.get('tick_rate', DEFAULT_TICK_RATE)))
+            if created is not None:
+                created.add(session)
+            return {'session': session.id}
+        if op == 'metrics' and 'session' not in request:
+            metrics = self.metrics()
+            del metrics['per_session']
+            return metrics
+
+        session = self.sessions.get(request['session'])
+        if session is None:
+            raise ValueError(f"session inconnue : {request['session']}")
+        if op == 'action':
+            self.send(session, ACTIONS[ACTION_NAMES.index(request['action'])])
+        elif op == 'pause':
+            self.pause(session)
+        elif op == 'resume':
+            self.resume(session)
+        elif op == 'watch':
+            session.watchers[writer] = max(1, int(request.get('every', 1)))
+            if watched is not None:
+                watched.add(session)
+        elif op == 'close':
+            self.remove(session)
+        elif op == 'metrics':
+            return session.metrics()
+        elif op != 'state':
+            raise ValueError(f"opération inconnue : {op}")
+        return {'session': session.id, 'tick': session.ticks, 'state': session.sim.summary()}
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    """Une ligne JSON du protocole"""
+    return (json.dumps(message) + '\n').encode()
+
+async def bench(sessions: int = 500, seconds: float = 5.0, tick_rate: float = DEFAULT_TICK_RATE) -> Dict[str, Any]:
+    """Fait tourner ``sessions`` parties pendant ``seconds`` secondes ; retourne les mesures de l'hôte"""
+    host = SessionHost()
+    for seed in range(sessions):
+        host.create(seed, tick_rate)
+    scheduler = asyncio.create_task(host.run())
+    start = time.process_time()
+    await asyncio.sleep(seconds)
+    host.stop()
+    await scheduler
+    metrics = host.metrics()
+    metrics['cpu'] = (time.process_time() - start) / seconds
+    return metrics
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Lance l'hôte (serve) ou mesure sa capacité (bench)"""
+    parser = argparse.ArgumentParser(description="Hôte de parties asyncio")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve')
+    serve.add_argument('--socket', default=DEFAULT_SOCKET)
+    serve.add_argument('--port', type=int)
+    measure = commands.add_parser('bench')
+    measure.add_argument('--sessions', type=int, default=500)
+    measure.add_argument('--seconds', type=float, default=5.0)
+    measure.add_argument('--tick-rate', type=float, default=DEFAULT_TICK_RATE)
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        asyncio.run(SessionHost().serve(args.socket, args.port))
+        return
+
+    metrics = asyncio.run(bench(args.sessions, args.seconds, args.tick_rate))
+    print(f"{metrics['sessions']} sessions ({metrics['active']} actives), {metrics['ticks']} ticks "
+          f"({metrics['ticks'] / args.seconds:.0f}/s), processeur {metrics['cpu'] * 100:.0f}%")
+    print(f"retard moyen {metrics['lag_mean_ms']:.2f} ms, max {metrics['lag_max_ms']:.2f} ms, "
+          f"ticks abandonnés {metrics['skipped']}")
+
+if __name__ == '__main__':
+    main()
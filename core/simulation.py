@@ -0,0 +1,674 @@
+import random
+from operator import attrgetter
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+from models.position import Position, to_fixed, to_cell, to_microseconds
+from entities.tower import Tower
+from entities.enemy import Enemy
+from entities.projectile import Projectile
+from core import kernels
+from core.crowd import separate
+from core.effects import SLOW_SCALE
+from core.fixed_array import to_cells, div_round_array, isqrt_array
+from core.timer_wheel import RESOLUTION
+from core.weapons import EnemyIndex, area_damage
+from utils.constants import (UPGRADE_COSTS, WEAPONS, EFFECTS, EFFECT_DURATIONS, DAMAGE_PER_SECOND, FIXED_ONE,
+                             MICROSECONDS, TOWER_COST, TOWER_REFUND)
+from utils.archetypes import ARCHETYPES
+
+# Colonnes du tableau des ennemis (entiers ; position en virgule fixe, ligne de ARCHETYPES, échéance
+# de chaque effet de EFFECTS en microsecondes (0 : inactif), fraction de PV des dégâts continus)
+EX, EY, EHP, ESTATS, ESLOW, EBURN, EPOISON, EREMAINDER = range(8)
+ENEMY_FIELDS = 8
+EEFFECTS = slice(ESLOW, EPOISON + 1)  # Échéances, dans l'ordre de EFFECTS
+
+# Colonnes du tableau des projectiles (entiers ; position et vitesse en virgule fixe, effet
+# en indice dans TOWER_EFFECTS)
+PX, PY, PVX, PVY, PDAMAGE, PSPLASH, PEFFECT = range(7)
+PROJECTILE_FIELDS = 7
+
+# Colonnes du tableau des tours construites (entiers ; arme et effet en indices, voir TOWER_EFFECTS ;
+# rayon des éclats et portée de l'éclair en virgule fixe)
+TX, TY, THP, TRANGE, TDAMAGE, TWEAPON, TEFFECT, TSPLASH, TCHAIN_COUNT, TCHAIN_RANGE = range(10)
+TOWER_FIELDS = 10
+
+# Colonnes du rechargement des tours construites (flottants, mêmes calculs que Tower)
+RFIRE_RATE, RRELOAD_TIME, RRELOAD_ELAPSED, RRELOAD_PROGRESS = range(4)
+RELOAD_FIELDS = 4
+
+# Effets de statut des tours, dans l'ordre de Tower.cycle_effect (indice 0 : aucun)
+TOWER_EFFECTS = (None,) + EFFECTS
+
+# Durée (microsecondes) et dégâts par seconde de chaque effet de EFFECTS (voir EffectSystem)
+EFFECT_DURATIONS_US = np.array([to_microseconds(EFFECT_DURATIONS[effect]) for effect in EFFECTS], dtype=np.int64)
+EFFECT_RATES = np.array([DAMAGE_PER_SECOND.get(effect, 0) for effect in EFFECTS], dtype=np.int64)
+
+PROJECTILE_SPEED = 5.0
+PROJECTILE_SPEED_FIXED = round(PROJECTILE_SPEED * FIXED_ONE)
+
+class Simulation:
+    """
+    Copie compacte et autonome de l'état du jeu, sans interface.
+
+    Les ennemis, les projectiles et les tours construites sont stockés
+    dans des tableaux NumPy (une ligne par entité), les autres valeurs
+    (dont la tour principale) sont des scalaires : fork() se résume à
+    copier quelques tampons plats. Les règles reproduisent celles de
+    GameEngine._update et _apply_action, de CombatSystem et de WaveManager.
+    """
+    def __init__(self, world_width: int = 100, world_height: int = 100, seed: Optional[int] = None):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.rng = random.Random(seed)
+        self.rng_shared = False  # Générateur partagé avec un fork : copie avant tirage
+        self.tick = 0
+
+        # État de la partie (équivalent de game_state)
+        self.score = 50
+        self.tower_hp = 10
+        self.max_tower_hp = 10
+        self.game_over = False
+
+        # Tour
+        self.tower_x = world_width // 2
+        self.tower_y = world_height // 2
+        self.tower_range = 5
+        self.tower_damage = 1
+        self.tower_fire_rate = 1.0
+        self.tower_reload_time = 1.0
+        self.tower_reload_elapsed = 0.0
+        self.tower_reload_progress = 1.0
+        self.tower_weapon = 'single'
+        self.tower_splash_radius = to_fixed(1.5)
+        self.tower_chain_count = 3
+        self.tower_chain_range = to_fixed(3.0)
+        self.tower_effect = None
+
+        # Mode construction : le curseur désigne la tour à améliorer et la case où construire
+        self.build_mode = False
+        self.cursor_x = self.tower_x
+        self.cursor_y = self.tower_y
+
+        # Temps des effets de statut (microsecondes, EffectSystem.now)
+        self.effect_time = 0
+
+        # Vagues
+        self.current_wave = 1
+        self.enemies_per_wave = 3
+        self.spawn_timer = 0
+        self.spawn_interval = 60
+        self.spawned_count = 0  # Ennemis générés et pas encore retirés
+
+        # Entités
+        self.enemies = np.zeros((0, ENEMY_FIELDS), dtype=np.int64)
+        self.projectiles = np.zeros((0, PROJECTILE_FIELDS), dtype=np.int64)
+        self.towers = np.zeros((0, TOWER_FIELDS), dtype=np.int64)
+        self.tower_reloads = np.zeros((0, RELOAD_FIELDS), dtype=np.float64)
+
+    @classmethod
+    def from_engine(cls, engine) -> 'Simulation':
+        """
+        Construit une simulation à partir de l'état courant d'un GameEngine.
+
+        Les effets de statut en cours (core.effects) sont repris dans les
+        colonnes des ennemis ; les murs du terrain (lignes de vue, voir
+        models.visibility_map) ne sont pas simulés.
+        """
+        sim = cls.__new__(cls)
+        sim.world_width = engine.game_map.width
+        sim.world_height = engine.game_map.height
+        sim.rng = random.Random()
+        sim.rng.setstate(engine.wave_manager.rng.getstate())
+        sim.rng_shared = False
+        sim.tick = 0
+
+        state = engine.game_state
+        sim.score = state['score']
+        sim.tower_hp = state['tower_hp']
+        sim.max_tower_hp = state['max_tower_hp']
+        sim.game_over = state['game_over']
+
+        tower = engine.tower
+        sim.tower_x = tower.position.x
+        sim.tower_y = tower.position.y
+        sim.tower_range = tower.range
+        sim.tower_damage = tower.damage
+        sim.tower_fire_rate = tower.fire_rate
+        sim.tower_reload_time = tower.reload_time
+        sim.tower_reload_elapsed = tower.reload_elapsed
+        sim.tower_reload_progress = tower.reload_progress
+        sim.tower_weapon = tower.weapon
+        sim.tower_splash_radius = round(tower.splash_radius * FIXED_ONE)
+        sim.tower_chain_count = tower.chain_count
+        sim.tower_chain_range = round(tower.chain_range * FIXED_ONE)
+        sim.tower_effect = tower.effect
+
+        sim.build_mode = state['build_mode']
+        sim.cursor_x = engine.cursor.x
+        sim.cursor_y = engine.cursor.y
+
+        # Tours construites, dans l'ordre de GameEngine.towers
+        built = [t for t in engine.towers if t is not tower]
+        sim.towers = np.array([[t.position.x, t.position.y, t.hp, t.range, t.damage, WEAPONS.index(t.weapon),
+                                TOWER_EFFECTS.index(t.effect), round(t.splash_radius * FIXED_ONE), t.chain_count,
+                                round(t.chain_range * FIXED_ONE)] for t in built],
+                              dtype=np.int64).reshape(-1, TOWER_FIELDS)
+        sim.tower_reloads = np.array([[t.fire_rate, t.reload_time, t.reload_elapsed, t.reload_progress]
+                                      for t in built], dtype=np.float64).reshape(-1, RELOAD_FIELDS)
+
+        waves = engine.wave_manager
+        sim.current_wave = waves.current_wave
+        sim.enemies_per_wave = waves.enemies_per_wave
+        sim.spawn_timer = waves.spawn_timer
+        sim.spawn_interval = waves.spawn_interval
+        sim.spawned_count = len(waves.spawned_enemies)
+
+        effects = engine.effects
+        sim.effect_time = effects.now
+        sim.enemies = enemy_rows(effects, engine.enemies)
+        sim.projectiles = np.array([[p.fx, p.fy, p.velocity_x, p.velocity_y, p.damage,
+                                     round(p.splash_radius * FIXED_ONE), TOWER_EFFECTS.index(p.effect)]
+                                    for p in engine.combat_system.projectiles],
+                                   dtype=np.int64).reshape(-1, PROJECTILE_FIELDS)
+        return sim
+
+    def fork(self) -> 'Simulation':
+        """
+        Retourne une copie indépendante de la simulation.
+
+        Les tableaux sont copiés ; le générateur aléatoire est partagé en
+        copie sur écriture (copier son état coûte plus que tout le reste).
+        """
+        self.rng_shared = True
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone.enemies = self.enemies.copy()
+        clone.projectiles = self.projectiles.copy()
+        clone.towers = self.towers.copy()
+        clone.tower_reloads = self.tower_reloads.copy()
+        return clone
+
+    def reseed(self, seed: int) -> None:
+        """Remplace le générateur aléatoire (futurs différents pour chaque fork)"""
+        self.rng = random.Random(seed)
+        self.rng_shared = False
+
+    def _own_rng(self) -> random.Random:
+        """Retourne le générateur, copié d'abord s'il est partagé"""
+        if self.rng_shared:
+            rng = random.Random()
+            rng.setstate(self.rng.getstate())
+            self.rng = rng
+            self.rng_shared = False
+        return self.rng
+
+    def summary(self) -> Dict[str, Any]:
+        """Résumé de l'état, dans le format de game_state"""
+        return {
+            'game_over': self.game_over,
+            'score': self.score,
+            'wave': self.current_wave,
+            'tower_hp': self.tower_hp,
+            'max_tower_hp': self.max_tower_hp,
+        }
+
+    def to_entities(self) -> Tuple[List[Tower], List[Enemy], List[Projectile]]:
+        """Recrée des objets entités (pour l'affichage) à partir des tableaux"""
+        tower_position = Position(self.tower_x, self.tower_y)
+        tower = Tower(tower_position, self.tower_range, self.tower_damage, self.tower_fire_rate,
+                      self.tower_weapon)
+        tower.splash_radius = self.tower_splash_radius / FIXED_ONE
+        tower.chain_count = self.tower_chain_count
+        tower.chain_range = self.tower_chain_range / FIXED_ONE
+        tower.effect = self.tower_effect
+        tower.hp = self.tower_hp
+        tower.reload_time = self.tower_reload_time
+        tower.reload_elapsed = self.tower_reload_elapsed
+        tower.reload_progress = self.tower_reload_progress
+        towers = [tower]
+
+        for row, reload in zip(self.towers.tolist(), self.tower_reloads.tolist()):
+            built = Tower(Position(row[TX], row[TY]), row[TRANGE], row[TDAMAGE], reload[RFIRE_RATE],
+                          WEAPONS[row[TWEAPON]])
+            built.hp = row[THP]
+            built.effect = TOWER_EFFECTS[row[TEFFECT]]
+            built.splash_radius = row[TSPLASH] / FIXED_ONE
+            built.chain_count = row[TCHAIN_COUNT]
+            built.chain_range = row[TCHAIN_RANGE] / FIXED_ONE
+            built.reload_time = reload[RRELOAD_TIME]
+            built.reload_elapsed = reload[RRELOAD_ELAPSED]
+            built.reload_progress = reload[RRELOAD_PROGRESS]
+            towers.append(built)
+
+        enemies = []
+        for row in self.enemies.tolist():
+            x, y = row[EX], row[EY]
+            enemy = Enemy(Position(to_cell(x), to_cell(y)), tower_position, row[ESTATS], row[EHP])
+            enemy.fx, enemy.fy = x, y
+            enemy.speed_scale = SLOW_SCALE if row[ESLOW] else FIXED_ONE
+            enemies.append(enemy)
+
+        projectiles = []
+        for x, y, vx, vy, damage, splash, effect in self.projectiles.tolist():
+            position = Position(to_cell(x), to_cell(y))
+            projectile = Projectile(position, Position(position.x, position.y), damage, PROJECTILE_SPEED,
+                                    splash / FIXED_ONE, TOWER_EFFECTS[effect])
+            projectile.fx, projectile.fy = x, y
+            projectile.velocity_x, projectile.velocity_y = vx, vy
+            projectiles.append(projectile)
+
+        return towers, enemies, projectiles
+
+    # --- Actions du joueur ---
+
+    def apply_action(self, action: Dict[str, Any]) -> None:
+        """Applique une action au format de TcodInputHandler.handle_input (voir GameEngine._apply_action)"""
+        if action.get('toggle_build'):
+            self.build_mode = not self.build_mode
+            self.cursor_x, self.cursor_y = self.tower_x, self.tower_y
+
+        if action.get('move'):
+            dx, dy = action['move']
+            if self.build_mode:
+                self.cursor_x = max(0, min(self.cursor_x + dx, self.world_width - 1))
+                self.cursor_y = max(0, min(self.cursor_y + dy, self.world_height - 1))
+            else:
+                # La tour principale ne va pas sur la case d'une tour construite
+                x = max(0, min(self.tower_x + dx, self.world_width - 1))
+                y = max(0, min(self.tower_y + dy, self.world_height - 1))
+                if self._built_at(x, y) < 0:
+                    self.tower_x, self.tower_y = x, y
+
+        if action.get('place_tower'):
+            self.place_tower()
+        if action.get('sell_tower'):
+            self.sell_tower()
+
+        if action.get('upgrade'):
+            self.upgrade(action['upgrade'], action.get('cost', UPGRADE_COSTS[action['upgrade']]))
+
+        if action.get('cycle_weapon'):
+            built = self._selected()
+            if built < 0:
+                self.tower_weapon = WEAPONS[(WEAPONS.index(self.tower_weapon) + 1) % len(WEAPONS)]
+            else:
+                self.towers[built, TWEAPON] = (self.towers[built, TWEAPON] + 1) % len(WEAPONS)
+        if action.get('cycle_effect'):
+            built = self._selected()
+            if built < 0:
+                self.tower_effect = TOWER_EFFECTS[(TOWER_EFFECTS.index(self.tower_effect) + 1) % len(TOWER_EFFECTS)]
+            else:
+                self.towers[built, TEFFECT] = (self.towers[built, TEFFECT] + 1) % len(TOWER_EFFECTS)
+
+        if action.get('next_wave'):
+            self.next_wave()
+
+    def _built_at(self, x: int, y: int) -> int:
+        """Ligne de la tour construite sur la case (x, y), -1 si aucune"""
+        rows = np.flatnonzero((self.towers[:, TX] == x) & (self.towers[:, TY] == y))
+        return int(rows[0]) if len(rows) else -1
+
+    def _selected(self) -> int:
+        """Tour visée par les améliorations : construite sous le curseur (mode construction), sinon -1 (principale)"""
+        return self._built_at(self.cursor_x, self.cursor_y) if self.build_mode else -1
+
+    def place_tower(self) -> None:
+        """Construit une tour sur la case du curseur si elle est libre et payable (voir GameEngine._place_tower)"""
+        x, y = self.cursor_x, self.cursor_y
+        if (x, y) == (self.tower_x, self.tower_y) or self._built_at(x, y) >= 0 or self.score < TOWER_COST:
+            return
+        self.score -= TOWER_COST
+        row, reload = new_tower(x, y)
+        self.towers = np.concatenate((self.towers, np.array([row], dtype=np.int64)))
+        self.tower_reloads = np.concatenate((self.tower_reloads, np.array([reload], dtype=np.float64)))
+
+    def sell_tower(self) -> None:
+        """Vend la tour construite sous le curseur (la tour principale ne peut pas être vendue)"""
+        built = self._built_at(self.cursor_x, self.cursor_y)
+        if built < 0:
+            return
+        self.score += TOWER_REFUND
+        self.towers = np.delete(self.towers, built, axis=0)
+        self.tower_reloads = np.delete(self.tower_reloads, built, axis=0)
+
+    def upgrade(self, upgrade_type: str, cost: Optional[int] = None) -> None:
+        """Achète une amélioration de la tour sélectionnée (voir _selected)"""
+        self.score -= UPGRADE_COSTS[upgrade_type] if cost is None else cost
+        built = self._selected()
+
+        if upgrade_type == 'hp':
+            self.max_tower_hp += 5
+            self.tower_hp += 5
+        elif built >= 0:
+            if upgrade_type == 'damage':
+                self.towers[built, TDAMAGE] += 1
+            elif upgrade_type == 'range':
+                self.towers[built, TRANGE] += 1
+            elif upgrade_type == 'fire_rate':
+                self.tower_reloads[built, RFIRE_RATE] += 0.2
+                self.tower_reloads[built, RRELOAD_TIME] = 1.0 / self.tower_reloads[built, RFIRE_RATE]
+        elif upgrade_type == 'damage':
+            self.tower_damage += 1
+        elif upgrade_type == 'range':
+            self.tower_range += 1
+        elif upgrade_type == 'fire_rate':
+            self.tower_fire_rate += 0.2
+            self.tower_reload_time = 1.0 / self.tower_fire_rate
+
+    def next_wave(self) -> None:
+        """Passe à la vague suivante"""
+        self.current_wave += 1
+        self.spawn_timer = self.spawn_interval
+
+    # --- Boucle de simulation ---
+
+    def run(self, ticks: int, delta_time: float = 0.1) -> None:
+        """Avance de plusieurs ticks, ou jusqu'à la fin de la partie"""
+        for _ in range(ticks):
+            if self.game_over:
+                break
+            self.step(delta_time)
+
+    def step(self, delta_time: float = 0.1) -> None:
+        """Avance la simulation d'un tick"""
+        self.tick += 1
+        self._spawn(delta_time)
+        self._update_effects(delta_time)
+        self._move_enemies(delta_time)
+        self._separate_enemies(delta_time)
+        self._remove_enemies()
+        self._move_projectiles(delta_time)
+        damage = np.zeros(len(self.enemies), dtype=np.int64)
+        afflictions: List[Tuple[np.ndarray, np.ndarray]] = []
+        index = self._collide_projectiles(damage, afflictions)
+        self._update_towers(delta_time, damage, index, afflictions)
+        self.enemies[:, EHP] -= damage
+        afflict(self.enemies, afflictions, self.effect_time)
+
+        if len(self.enemies) == 0 and self.spawned_count == 0:
+            self.next_wave()
+
+        if self.tower_hp <= 0:
+            self.game_over = True
+
+    def _spawn(self, delta_time: float) -> None:
+        """Génère les ennemis de la vague (voir WaveManager)"""
+        self.spawn_timer += 1
+        if self.spawn_timer < self.spawn_interval:
+            return
+        self.spawn_timer = 0
+
+        count = int(self.enemies_per_wave * self.current_wave * 0.6) + 1
+
+        rng = self._own_rng()
+        spawned = np.empty((count, ENEMY_FIELDS), dtype=np.int64)
+        for i in range(count):
+            x, y = spawn_position(rng, self.world_width, self.world_height)
+            stats = ARCHETYPES.row(ARCHETYPES.choose(rng, self.current_wave, i), self.current_wave)
+            spawned[i] = (to_fixed(x), to_fixed(y), ARCHETYPES.hp[stats], stats, 0, 0, 0, 0)
+
+        self.enemies = np.concatenate((self.enemies, spawned))
+        self.spawned_count += count
+
+    def _update_effects(self, delta_time: float) -> None:
+        """Avance le temps des effets de statut : dégâts continus, puis fins échues (voir EffectSystem.update)"""
+        elapsed = to_microseconds(delta_time)
+        self.effect_time += elapsed
+        update_effects(self.enemies, self.effect_time, elapsed)
+
+    def _move_enemies(self, delta_time: float) -> None:
+        """Déplace les ennemis vers la tour (voir Enemy.update)"""
+        move_enemies(self.enemies, self.tower_x, self.tower_y, delta_time)
+
+    def _separate_enemies(self, delta_time: float) -> None:
+        """Écarte les ennemis empilés (même passe que GameEngine._separate_enemies)"""
+        if len(self.enemies) < 2:
+            return
+        self.enemies[:, EX], self.enemies[:, EY] = separate(self.enemies[:, EX], self.enemies[:, EY],
+                                                            self.world_width, self.world_height, delta_time)
+
+    def _remove_enemies(self) -> None:
+        """Retire les ennemis qui ont atteint la tour ou sont morts"""
+        enemies = self.enemies
+        if len(enemies) == 0:
+            return
+
+        reached = (to_cells(enemies[:, EX]) == self.tower_x) & (to_cells(enemies[:, EY]) == self.tower_y)
+        dead = ~reached & (enemies[:, EHP] <= 0)
+
+        self.tower_hp -= int(reached.sum())
+        self.score += int(ARCHETYPES.value_array[enemies[dead, ESTATS]].sum())
+
+        removed = reached | dead
+        if removed.any():
+            self.spawned_count -= int(removed.sum())
+            self.enemies = enemies[~removed]
+
+    def _move_projectiles(self, delta_time: float) -> None:
+        """Déplace les projectiles (voir Projectile.update)"""
+        move_projectiles(self.projectiles, delta_time)
+
+    def _collide_projectiles(self, damage: np.ndarray,
+                             afflictions: List[Tuple[np.ndarray, np.ndarray]]) -> Optional[EnemyIndex]:
+        """
+        Applique les collisions et retire les projectiles sortis ou arrivés (voir CombatSystem).
+
+        Les dégâts sont cumulés dans ``damage`` et les effets à appliquer
+        en fin de tick dans ``afflictions`` ; retourne l'index spatial des
+        ennemis s'il a été construit, pour le réutiliser dans le tick.
+        """
+        projectiles = self.projectiles
+        if len(projectiles) == 0:
+            return None
+
+        x, y = to_cells(projectiles[:, PX]), to_cells(projectiles[:, PY])
+        inside = (x >= 0) & (x < self.world_width) & (y >= 0) & (y < self.world_height)
+        hit = np.zeros(len(projectiles), dtype=bool)
+        index = None
+
+        if len(self.enemies):
+            # Premier ennemi (dans l'ordre du tableau) sur la case de chaque projectile
+            candidates = np.flatnonzero(inside)
+            enemy_keys = to_cells(self.enemies[:, EY]) * self.world_width + to_cells(self.enemies[:, EX])
+            targets = kernels.first_enemy_at(enemy_keys, y[candidates] * self.world_width + x[candidates],
+                                             self.world_width * self.world_height)
+            found = targets >= 0
+            hits, targets = candidates[found], targets[found]
+
+            np.add.at(damage, targets, projectiles[hits, PDAMAGE])
+            afflictions.append((targets, projectiles[hits, PEFFECT]))
+            hit[hits] = True
+
+            # Éclats : une seule requête de rayon pour tous les impacts
+            splash = projectiles[hits, PSPLASH] > 0
+            if splash.any():
+                index = self._enemy_index()
+                shells = projectiles[hits[splash]]
+                impacts, splashed = area_damage(index, shells[:, PX], shells[:, PY], targets[splash],
+                                                shells[:, PSPLASH], shells[:, PDAMAGE], damage)
+                afflictions.append((splashed, shells[impacts, PEFFECT]))
+
+        self.projectiles = projectiles[inside & ~hit]
+        return index
+
+    def _enemy_index(self) -> EnemyIndex:
+        """Index spatial des ennemis, pour les requêtes de combat du tick"""
+        return EnemyIndex(self.enemies[:, EX], self.enemies[:, EY], self.world_width, self.world_height)
+
+    def _tower_table(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Tours principale puis construites, dans l'ordre de GameEngine.towers (mêmes colonnes que towers)"""
+        main = [self.tower_x, self.tower_y, self.tower_hp, int(self.tower_range), self.tower_damage,
+                WEAPONS.index(self.tower_weapon), TOWER_EFFECTS.index(self.tower_effect), self.tower_splash_radius,
+                self.tower_chain_count, self.tower_chain_range]
+        reload = [self.tower_fire_rate, self.tower_reload_time, self.tower_reload_elapsed, self.tower_reload_progress]
+        return (np.concatenate((np.array([main], dtype=np.int64), self.towers)),
+                np.concatenate((np.array([reload], dtype=np.float64), self.tower_reloads)))
+
+    def _update_towers(self, delta_time: float, damage: np.ndarray, index: Optional[EnemyIndex],
+                       afflictions: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        """Fait tirer chaque tour prête sur l'ennemi le plus proche ; les autres rechargent (voir CombatSystem.update)"""
+        towers, reloads = self._tower_table()
+        ready = reloads[:, RRELOAD_PROGRESS] >= 1.0
+        waiting = ~ready
+        reloads[waiting, RRELOAD_ELAPSED] += delta_time
+        reloads[waiting, RRELOAD_PROGRESS] = np.minimum(1.0, reloads[waiting, RRELOAD_ELAPSED] /
+                                                        reloads[waiting, RRELOAD_TIME])
+
+        shooters = np.flatnonzero(ready)
+        if len(shooters) and len(self.enemies):
+            # Portée entière : distance <= portée équivaut à dx² + dy² <= portée²
+            cells_x, cells_y = to_cells(self.enemies[:, EX]), to_cells(self.enemies[:, EY])
+            targets = kernels.closest_in_range(cells_x, cells_y, towers[shooters, TX], towers[shooters, TY],
+                                               towers[shooters, TRANGE])
+            found = targets >= 0
+            shooters, targets = shooters[found], targets[found]
+            reloads[shooters, RRELOAD_ELAPSED] = 0.0
+            reloads[shooters, RRELOAD_PROGRESS] = 0.0
+            self._shoot(towers, shooters, targets, cells_x, cells_y, damage, index, afflictions)
+
+        # Rechargement de la tour principale : flottants Python, comme Tower
+        self.tower_reload_elapsed = float(reloads[0, RRELOAD_ELAPSED])
+        self.tower_reload_progress = float(reloads[0, RRELOAD_PROGRESS])
+        self.tower_reloads = reloads[1:]
+
+    def _shoot(self, towers: np.ndarray, shooters: np.ndarray, targets: np.ndarray, cells_x: np.ndarray,
+               cells_y: np.ndarray, damage: np.ndarray, index: Optional[EnemyIndex],
+               afflictions: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        """Tirs des tours ``shooters`` sur leurs cibles (lignes de la table de _tower_table)"""
+        # Éclairs en chaîne : la cible et ses plus proches voisins, sans projectile
+        chain = towers[shooters, TWEAPON] == WEAPONS.index('chain')
+        if chain.any():
+            if index is None:
+                index = self._enemy_index()
+            chained, primary = towers[shooters[chain]], targets[chain]
+            np.add.at(damage, primary, chained[:, TDAMAGE])
+            impacts, hits = area_damage(index, index.x[primary], index.y[primary], primary, chained[:, TCHAIN_RANGE],
+                                        chained[:, TDAMAGE], damage, limit=chained[:, TCHAIN_COUNT])
+            afflictions.append((primary, chained[:, TEFFECT]))
+            afflictions.append((hits, chained[impacts, TEFFECT]))
+
+        # Même calcul entier que Projectile.__init__
+        shooters, targets = shooters[~chain], targets[~chain]
+        if len(shooters) == 0:
+            return
+        fired = towers[shooters]
+        dx = (cells_x[targets] - fired[:, TX]) * FIXED_ONE
+        dy = (cells_y[targets] - fired[:, TY]) * FIXED_ONE
+        length = isqrt_array(dx * dx + dy * dy)
+        moving = length > 0
+        safe_length = np.where(moving, length, 1)
+        vx = np.where(moving, div_round_array(dx * PROJECTILE_SPEED_FIXED, safe_length), 0)
+        vy = np.where(moving, div_round_array(dy * PROJECTILE_SPEED_FIXED, safe_length), 0)
+
+        splash = np.where(fired[:, TWEAPON] == WEAPONS.index('splash'), fired[:, TSPLASH], 0)
+        projectiles = np.column_stack((fired[:, TX] * FIXED_ONE, fired[:, TY] * FIXED_ONE, vx, vy,
+                                       fired[:, TDAMAGE], splash, fired[:, TEFFECT]))
+        self.projectiles = np.concatenate((self.projectiles, projectiles))
+
+def spawn_position(rng: random.Random, width: int, height: int) -> Tuple[int, int]:
+    """Tire une position sur un bord de la carte (même séquence que WaveManager)"""
+    side = rng.choice(['top', 'bottom', 'left', 'right'])
+    if side == 'top':
+        return rng.randint(0, width - 1), 0
+    if side == 'bottom':
+        return rng.randint(0, width - 1), height - 1
+    if side == 'left':
+        return 0, rng.randint(0, height - 1)
+    return width - 1, rng.randint(0, height - 1)
+
+def new_tower(x: int, y: int) -> Tuple[List[int], List[float]]:
+    """Ligne de towers et de tower_reloads d'une tour construite en (x, y) (voir GameEngine._place_tower)"""
+    tower = Tower(Position(x, y), range=3, damage=1, fire_rate=1.0)
+    row = [x, y, tower.hp, tower.range, tower.damage, WEAPONS.index(tower.weapon), TOWER_EFFECTS.index(tower.effect),
+           round(tower.splash_radius * FIXED_ONE), tower.chain_count, round(tower.chain_range * FIXED_ONE)]
+    return row, [tower.fire_rate, tower.reload_time, tower.reload_elapsed, tower.reload_progress]
+
+def enemy_rows(effects, enemies: List[Enemy]) -> np.ndarray:
+    """
+    Tableau des ennemis d'un GameEngine (mêmes lignes que ``effect_columns``),
+    construit colonne par colonne : les attributs sont lus sans boucle
+    Python et les effets pris d'un bloc dans les tableaux d'EffectSystem.
+    """
+    count = len(enemies)
+    rows = np.zeros((count, ENEMY_FIELDS), dtype=np.int64)
+    for column, name in ((EX, 'fx'), (EY, 'fy'), (EHP, 'hp'), (ESTATS, 'stats')):
+        rows[:, column] = np.fromiter(map(attrgetter(name), enemies), dtype=np.int64, count=count)
+    slots = np.fromiter(map(attrgetter('effect_slot'), enemies), dtype=np.int64, count=count)
+    affected = np.flatnonzero(slots >= 0)
+    if len(affected):
+        rows[affected, EEFFECTS] = effects.expiry[slots[affected]]
+        rows[affected, EREMAINDER] = effects.damage_remainder[slots[affected]]
+    return rows
+
+def effect_columns(effects, enemy) -> List[int]:
+    """Colonnes d'effets (échéances, fraction de PV) d'un ennemi d'un EffectSystem"""
+    slot = enemy.effect_slot
+    if slot < 0:
+        return [0] * (len(EFFECTS) + 1)
+    return effects.expiry[slot].tolist() + [int(effects.damage_remainder[slot])]
+
+def update_effects(enemies: np.ndarray, now, elapsed: int) -> None:
+    """
+    Effets de statut d'un tableau d'ennemis au temps ``now`` (un par
+    ennemi, ou commun), ``elapsed`` microsecondes après le précédent :
+    dégâts continus, puis fins échues, au pas de la roue temporelle
+    d'EffectSystem ; la fraction de PV repart de zéro sans effet actif.
+    """
+    if len(enemies) == 0:
+        return
+    expiry = enemies[:, EEFFECTS]
+    active = expiry != 0
+
+    rate = active @ EFFECT_RATES
+    burning = np.flatnonzero(rate)
+    if len(burning):
+        total = rate[burning] * elapsed + enemies[burning, EREMAINDER]
+        enemies[burning, EHP] -= total // MICROSECONDS
+        enemies[burning, EREMAINDER] = total % MICROSECONDS
+
+    # Une fin est traitée au premier pas de la roue qui la suit
+    now_step = np.reshape(np.asarray(now) // RESOLUTION, (-1, 1))
+    ended = active & (-(-expiry // RESOLUTION) <= now_step)
+    if ended.any():
+        expiry[ended] = 0
+        enemies[:, EEFFECTS] = expiry
+        enemies[ended.any(axis=1) & ~(expiry != 0).any(axis=1), EREMAINDER] = 0
+
+def afflict(enemies: np.ndarray, afflictions: List[Tuple[np.ndarray, np.ndarray]], now) -> None:
+    """
+    Applique (ou prolonge) les effets notés pendant le tick : paires
+    (ennemis, effets en indices de TOWER_EFFECTS) ; ``now`` est commun
+    ou donné par ennemi (voir EffectSystem.apply)
+    """
+    if not afflictions:
+        return
+    targets = np.concatenate([targets for targets, _ in afflictions])
+    codes = np.concatenate([codes for _, codes in afflictions])
+    chosen = codes > 0
+    targets, kinds = targets[chosen], codes[chosen] - 1
+    if len(targets):
+        now = np.broadcast_to(now, len(enemies))[targets]
+        enemies[targets, ESLOW + kinds] = now + EFFECT_DURATIONS_US[kinds]
+
+def enemy_speeds(enemies: np.ndarray) -> np.ndarray:
+    """Vitesse (virgule fixe) de chaque ennemi, ralentissement compris (même calcul que Enemy.update)"""
+    speed = ARCHETYPES.speed_fixed_array[enemies[:, ESTATS]]
+    return np.where(enemies[:, ESLOW] != 0, speed * SLOW_SCALE // FIXED_ONE, speed)
+
+def move_enemies(enemies: np.ndarray, tower_x: int, tower_y: int, delta_time: float) -> None:
+    """Déplace sur place les ennemis d'un tableau vers la tour (même calcul entier que Enemy.update)"""
+    if len(enemies) == 0:
+        return
+
+    speed = enemy_speeds(enemies)
+    kernels.move_enemies(enemies[:, EX], enemies[:, EY], speed, to_fixed(tower_x), to_fixed(tower_y),
+                         to_microseconds(delta_time))
+
+def move_projectiles(projectiles: np.ndarray, delta_time: float) -> None:
+    """Déplace sur place les projectiles d'un tableau (même calcul entier que Projectile.update)"""
+    if len(projectiles) == 0:
+        return
+
+    kernels.move_projectiles(projectiles[:, PX], projectiles[:, PY], projectiles[:, PVX], projectiles[:, PVY],
+                             to_microseconds(delta_time))
@@ -1,76 +1,133 @@
-import tcod
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from models.position import Position
+from utils.constants import (KEY_A, KEY_B, KEY_D, KEY_E, KEY_LEFT, KEY_RIGHT, KEY_UP, KEY_DOWN,
+                             KEY_1, KEY_2, KEY_3, KEY_R, KEY_S, KEY_W, KEY_X, KEY_RETURN, KEY_SPACE,
+                             UPGRADE_COSTS, TOWER_COST)
+
+def _upgrade(upgrade_type: str) -> Dict[str, Any]:
+    """Action d'achat d'une amélioration"""
+    return {'upgrade': upgrade_type, 'cost': UPGRADE_COSTS[upgrade_type]}
+
+# Touches actives dans tous les onglets : touche -> action
+GLOBAL_BINDINGS: Dict[int, Dict[str, Any]] = {
+    # Changement d'onglet
+    KEY_A: {'change_tab': 'attack'},
+    KEY_D: {'change_tab': 'defense'},
+    # Déplacement
+    KEY_LEFT: {'move': (-1, 0)},
+    KEY_RIGHT: {'move': (1, 0)},
+    KEY_UP: {'move': (0, -1)},
+    KEY_DOWN: {'move': (0, 1)},
+    # Entrer dans le mode construction ou en sortir
+    KEY_B: {'toggle_build': True},
+    # Déclencher manuellement la prochaine vague
+    KEY_SPACE: {'next_wave': True},
+    # Revoir l'historique récent (rewind)
+    KEY_R: {'rewind': True},
+}
+
+# Touches propres à chaque onglet
+TAB_BINDINGS: Dict[str, Dict[int, Dict[str, Any]]] = {
+    'attack': {
+        KEY_1: _upgrade('damage'),
+        KEY_2: _upgrade('range'),
+        KEY_S: _upgrade('fire_rate'),
+        KEY_W: {'cycle_weapon': True},  # Gratuit
+        KEY_E: {'cycle_effect': True},  # Gratuit
+    },
+    'defense': {
+        KEY_3: _upgrade('hp'),
+    },
+}
+
+# Mode construction : poser (Entrée) ou vendre (X) une tour sous le curseur
+BUILD_BINDINGS: Dict[int, Dict[str, Any]] = {
+    KEY_RETURN: {'place_tower': True, 'cost': TOWER_COST},
+    KEY_X: {'sell_tower': True},
+}
 
 class TcodInputHandler:
     """
     Gestionnaire d'entrée utilisant TCOD
+    
+    Les touches sont traduites par une table précalculée pour chaque
+    contexte (onglet, mode construction). handle_events() traite tous les
+    événements d'une trame : les déplacements consécutifs sont regroupés
+    en une seule action, appliquée pas à pas.
     """
     def __init__(self, game_state: Dict[str, Any]):
         self.game_state = game_state
+        self.bindings: Dict[Tuple[Optional[str], bool], Dict[int, Dict[str, Any]]] = {}
+        for tab in (None, *TAB_BINDINGS):
+            for build_mode in (False, True):
+                table = dict(GLOBAL_BINDINGS)
+                table.update(TAB_BINDINGS.get(tab, {}))
+                if build_mode:
+                    table.update(BUILD_BINDINGS)
+                self.bindings[(tab, build_mode)] = table
     
     def handle_input(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """
         Traite les entrées et retourne les actions à effectuer
         """
-        action = {}
+        return self._translate(event, self.game_state.get('current_tab'),
+                               bool(self.game_state.get('build_mode')), self.game_state.get('score', 0))
+    
+    def handle_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Traduit tous les événements d'une trame en actions, dans l'ordre
         
-        if not event:
-            return action
-            
-        if event.get('type') == 'QUIT':
-            action['quit'] = True
-            return action
-            
-        if event.get('type') != 'KEYDOWN':
-            return action
-            
-        key = event.get('key', None)
+        Chaque événement est interprété dans l'état laissé par les
+        précédents (onglet, mode construction, score après les améliorations
+        déjà retenues ; une pose de tour peut être refusée par le moteur, son
+        coût n'est donc pas déduit ici). Une action garde dans 'time'
+        l'instant de son premier événement, pour mesurer la latence.
+        """
+        tab = self.game_state.get('current_tab')
+        build_mode = bool(self.game_state.get('build_mode'))
+        score = self.game_state.get('score', 0)
         
-        if key is None:
-            return action
-            
-        # Changement d'onglet
-        if key == tcod.event.K_a:
-            action['change_tab'] = 'attack'
-        elif key == tcod.event.K_d:
-            action['change_tab'] = 'defense'
+        actions: List[Dict[str, Any]] = []
+        for event in events:
+            action = self._translate(event, tab, build_mode, score)
+            if not action:
+                continue
             
-        # Déplacement
-        elif key == tcod.event.K_LEFT:
-            action['move'] = (-1, 0)
-        elif key == tcod.event.K_RIGHT:
-            action['move'] = (1, 0)
-        elif key == tcod.event.K_UP:
-            action['move'] = (0, -1)
-        elif key == tcod.event.K_DOWN:
-            action['move'] = (0, 1)
+            tab = action.get('change_tab', tab)
+            if action.get('toggle_build'):
+                build_mode = not build_mode
+            if 'upgrade' in action:
+                score -= action['cost']
             
-        # Actions spécifiques à l'onglet
-        if self.game_state.get('current_tab') == 'attack':
-            # Amélioration des dégâts
-            if key == tcod.event.K_1 and self.game_state.get('score', 0) >= 10:
-                action['upgrade'] = 'damage'
-                action['cost'] = 10
-                
-            # Amélioration de la portée
-            elif key == tcod.event.K_2 and self.game_state.get('score', 0) >= 15:
-                action['upgrade'] = 'range'
-                action['cost'] = 15
-                
-            # Amélioration de la vitesse de tir
-            elif key == tcod.event.K_s and self.game_state.get('score', 0) >= 25:
-                action['upgrade'] = 'fire_rate'
-                action['cost'] = 25
-                
-        elif self.game_state.get('current_tab') == 'defense':
-            # Amélioration des points de vie
-            if key == tcod.event.K_3 and self.game_state.get('score', 0) >= 20:
-                action['upgrade'] = 'hp'
-                action['cost'] = 20
-                
-        # Déclencher manuellement la prochaine vague
-        if key == tcod.event.K_SPACE:
-            action['next_wave'] = True
+            # Déplacements consécutifs : une seule action, dont le moteur rejoue
+            # les pas dans l'ordre ('steps' ; bords et tours construites à chaque pas)
+            previous = actions[-1] if actions else None
+            if previous is not None and 'move' in previous and 'move' in action:
+                previous.setdefault('steps', [previous['move']]).append(action['move'])
+                continue
             
-        return action
\ No newline at end of file
+            if 'time' in event:
+                action['time'] = event['time']
+            actions.append(action)
+        
+        return actions
+    
+    def _translate(self, event: Dict[str, Any], tab: Optional[str], build_mode: bool,
+                   score: int) -> Dict[str, Any]:
+        """Action d'un événement dans un contexte donné ({} : aucune)"""
+        if not event:
+            return {}
+        
+        if event.get('type') == 'QUIT':
+            return {'quit': True}
+        
+        if event.get('type') != 'KEYDOWN':
+            return {}
+        
+        table = self.bindings.get((tab, build_mode)) or self.bindings[(None, build_mode)]
+        action = table.get(event.get('key'))
+        
+        # Achat impossible : la touche est ignorée
+        if action is None or score < action.get('cost', 0):
+            return {}
+        return dict(action)
@@ -0,0 +1,74 @@
+from typing import Any, List, Tuple
+
+# Pas de temps par défaut (microsecondes) : une échéance tombe au premier pas entier qui la suit
+RESOLUTION = 10_000
+
+class TimerWheel:
+    """
+    Roue temporelle hiérarchique : échéancier dont le coût ne dépend que
+    des échéances atteintes.
+
+    Le temps est découpé en pas de ``resolution`` microsecondes. Le niveau
+    0 a une case par pas ; chaque niveau supérieur a des cases ``slots``
+    fois plus larges. Une échéance lointaine est rangée dans un niveau
+    haut, puis redescendue (cascade) quand sa case est atteinte : chaque
+    entrée n'est déplacée qu'au plus ``levels`` fois.
+    """
+    def __init__(self, resolution: int = RESOLUTION, slots: int = 64, levels: int = 4):
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self.spans = [slots ** level for level in range(levels + 1)]
+
+        self.wheels: List[List[List[Tuple[int, Any]]]] = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.overflow: List[Tuple[int, Any]] = []  # Au-delà du dernier niveau
+        self.current = 0  # Dernier pas traité
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def schedule(self, due: int, item: Any) -> None:
+        """Programme ``item`` pour l'instant ``due`` (en microsecondes)"""
+        step = max(-(-due // self.resolution), self.current + 1)
+        self._insert(step, item)
+        self.count += 1
+
+    def _insert(self, step: int, item: Any) -> None:
+        """Range une entrée dans le niveau qui couvre son échéance"""
+        delta = step - self.current
+        for level in range(self.levels):
+            if delta < self.spans[level + 1]:
+                index = (step // self.spans[level]) % self.slots
+                self.wheels[level][index].append((step, item))
+                return
+        self.overflow.append((step, item))
+
+    def advance(self, now: int) -> List[Any]:
+        """Avance jusqu'à ``now`` (en microsecondes) et retourne les entrées échues, dans l'ordre"""
+        target = now // self.resolution
+        due = []
+        while self.current < target:
+            self.current += 1
+
+            # Cascade : les niveaux dont une case commence maintenant redescendent leurs entrées
+            if self.current % self.spans[self.levels] == 0 and self.overflow:
+                pending, self.overflow = self.overflow, []
+                for step, item in pending:
+                    self._insert(step, item)
+            for level in range(self.levels - 1, 0, -1):
+                if self.current % self.spans[level] == 0:
+                    index = (self.current // self.spans[level]) % self.slots
+                    bucket = self.wheels[level][index]
+                    if bucket:
+                        self.wheels[level][index] = []
+                        for step, item in bucket:
+                            self._insert(step, item)
+
+            bucket = self.wheels[0][self.current % self.slots]
+            if bucket:
+                self.wheels[0][self.current % self.slots] = []
+                due.extend(item for _, item in bucket)
+
+        self.count -= len(due)
+        return due
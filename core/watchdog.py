@@ -0,0 +1,106 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+# Dégradations, de la première appliquée à la dernière : (nom, libellé du HUD)
+DEGRADATIONS: Tuple[Tuple[str, str], ...] = (
+    ('particles', "particules 1/4"),
+    ('render', "rendu 1/2"),
+    ('dashboard', "tableau 1/4"),
+    ('merge_projectiles', "projectiles groupés"),
+    ('coarse_offscreen', "hors vue 1/2"),
+)
+
+# Intervalles (en trames) du rendu et du tableau de bord une fois dégradés
+RENDER_INTERVAL = 2
+DASHBOARD_INTERVAL = 4
+
+class TickWatchdog:
+    """
+    Surveille la durée de chaque trame par rapport au budget (game_speed).
+
+    Les phases (entrées, mise à jour, rendu) sont chronométrées ; leur
+    somme est lissée (moyenne exponentielle). Au-delà de ``high`` fois le
+    budget pendant ``patience`` trames, la dégradation suivante est
+    activée ; sous ``low`` fois le budget pendant ``recovery`` trames, la
+    dernière est levée. Le niveau est le nombre de dégradations actives.
+    """
+    def __init__(self, budget: float, degradations: Sequence[Tuple[str, str]] = DEGRADATIONS,
+                 high: float = 0.9, low: float = 0.5, patience: int = 5, recovery: int = 30,
+                 smoothing: float = 0.2):
+        self.budget = budget
+        self.degradations = tuple(degradations)
+        self.high = high
+        self.low = low
+        self.patience = patience
+        self.recovery = recovery
+        self.smoothing = smoothing
+
+        self.level = 0
+        self.frame = 0
+        self.load = 0.0  # Durée lissée d'une trame (secondes)
+        self.phases: Dict[str, float] = {}  # Durée de chaque phase de la dernière trame
+        self._over = 0
+        self._under = 0
+
+    def active(self, name: str) -> bool:
+        """Vrai si la dégradation ``name`` est en cours"""
+        return any(degradation == name for degradation, _ in self.degradations[:self.level])
+
+    def begin_frame(self) -> None:
+        """Début d'une trame"""
+        self.frame += 1
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Chronomètre une phase de la trame"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def end_frame(self) -> None:
+        """Fin d'une trame : met à jour la charge et le niveau de dégradation"""
+        spent = sum(self.phases.values())
+        self.load += self.smoothing * (spent - self.load)
+
+        if self.load > self.high * self.budget:
+            self._over += 1
+            self._under = 0
+            if self._over >= self.patience and self.level < len(self.degradations):
+                self.level += 1
+                self._over = 0
+        elif self.load < self.low * self.budget:
+            self._under += 1
+            self._over = 0
+            if self._under >= self.recovery and self.level > 0:
+                self.level -= 1
+                self._under = 0
+        else:
+            self._over = self._under = 0
+
+    def should_render(self) -> bool:
+        """Vrai si la trame courante doit être affichée"""
+        return not self.active('render') or self.frame % RENDER_INTERVAL == 0
+
+    def should_draw_dashboard(self) -> bool:
+        """Vrai si le tableau de bord doit être redessiné à cette trame (un rendu sur DASHBOARD_INTERVAL)"""
+        if not self.active('dashboard'):
+            return True
+        interval = DASHBOARD_INTERVAL * (RENDER_INTERVAL if self.active('render') else 1)
+        return self.frame % interval == 0
+
+    def labels(self) -> List[str]:
+        """Libellés des dégradations actives"""
+        return [label for _, label in self.degradations[:self.level]]
+
+    def status(self) -> Dict[str, Any]:
+        """État pour le HUD (game_state['quality'])"""
+        return {
+            'level': self.level,
+            'labels': self.labels(),
+            'load': self.load / self.budget if self.budget > 0 else 0.0,
+            'dashboard': self.should_draw_dashboard(),
+        }
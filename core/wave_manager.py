@@ -2,20 +2,25 @@ import random
 from typing import List, Optional
 from models.position import Position
 from entities.enemy import Enemy
+from utils.archetypes import ARCHETYPES
+from core.metrics import GameMetrics
 
 class WaveManager:
     """
     Gère les vagues d'ennemis
     """
-    def __init__(self, game_map, tower_position: Position):
+    def __init__(self, game_map, tower_position: Position, rng: Optional[random.Random] = None,
+                 metrics: Optional[GameMetrics] = None):
         self.game_map = game_map
+        self.rng = rng or random.Random()
+        self.metrics = metrics  # Mesures de jeu (ennemis générés par vague), facultatives
         self.tower_position = tower_position
         self.current_wave = 1
         self.enemies_per_wave = 3
         self.spawn_timer = 0
         self.spawn_interval = 60  # Frames entre chaque vague
-        self.difficulty_multiplier = 1.1
         self.spawned_enemies: List[Enemy] = []
+        self.spawned_total = 0  # Ennemis générés depuis le début (numéro du suivant)
     
     def update(self, delta_time: float = 1.0) -> List[Enemy]:
         """Met à jour le gestionnaire de vagues et retourne les nouveaux ennemis"""
@@ -32,36 +37,42 @@ class WaveManager:
         num_to_spawn = int(self.enemies_per_wave * self.current_wave * 0.6) + 1
         new_enemies = []
         
-        for _ in range(num_to_spawn):
-            enemy = self._create_enemy()
+        for index in range(num_to_spawn):
+            enemy = self._create_enemy(index)
+            enemy.serial = self.spawned_total
+            self.spawned_total += 1
             new_enemies.append(enemy)
             self.spawned_enemies.append(enemy)
         
+        if self.metrics is not None:
+            self.metrics.spawned.inc(num_to_spawn)
+        
         print(f"[VAGUE] Vague {self.current_wave} : {num_to_spawn} ennemis apparaissent !")
         return new_enemies
     
-    def _create_enemy(self) -> Enemy:
-        """Crée un ennemi à une position aléatoire sur les bords de la carte"""
-        side = random.choice(['top', 'bottom', 'left', 'right'])
+    def _create_enemy(self, index: int = 0) -> Enemy:
+        """Crée le index-ième ennemi de la vague, à une position aléatoire sur les bords de la carte"""
+        side = self.rng.choice(['top', 'bottom', 'left', 'right'])
         
         if side == 'top':
-            x = random.randint(0, self.game_map.width - 1)
+            x = self.rng.randint(0, self.game_map.width - 1)
             y = 0
         elif side == 'bottom':
-            x = random.randint(0, self.game_map.width - 1)
+            x = self.rng.randint(0, self.game_map.width - 1)
             y = self.game_map.height - 1
         elif side == 'left':
             x = 0
-            y = random.randint(0, self.game_map.height - 1)
+            y = self.rng.randint(0, self.game_map.height - 1)
         else:  # right
             x = self.game_map.width - 1
-            y = random.randint(0, self.game_map.height - 1)
+            y = self.rng.randint(0, self.game_map.height - 1)
         
-        enemy = Enemy.create_enemy(
+        # Type tiré après la position (même séquence aléatoire que la Simulation)
+        archetype = ARCHETYPES.choose(self.rng, self.current_wave, index)
+        enemy = Enemy(
             Position(x, y),
             self.tower_position,
-            self.current_wave,
-            self.difficulty_multiplier
+            ARCHETYPES.row(archetype, self.current_wave)
         )
         
         return enemy
@@ -70,6 +81,8 @@ class WaveManager:
         """Passe à la vague suivante"""
         self.current_wave += 1
         self.spawn_timer = self.spawn_interval  # Déclenche immédiatement la prochaine vague
+        if self.metrics is not None:
+            self.metrics.start_wave(self.current_wave)
         print(f"[VAGUE] Préparation de la vague {self.current_wave}")
     
     def remove_enemy(self, enemy: Enemy):
@@ -77,6 +90,11 @@ class WaveManager:
         if enemy in self.spawned_enemies:
             self.spawned_enemies.remove(enemy)
     
+    def prune(self, alive: List[Enemy]):
+        """Oublie les ennemis générés qui ne sont plus dans le jeu"""
+        kept = set(map(id, alive))
+        self.spawned_enemies = [enemy for enemy in self.spawned_enemies if id(enemy) in kept]
+    
     def all_enemies_defeated(self) -> bool:
         """Vérifie si tous les ennemis de la vague ont été vaincus"""
         return len(self.spawned_enemies) == 0
\ No newline at end of file
@@ -0,0 +1,144 @@
+from typing import Optional, Tuple
+import numpy as np
+
+from core.crowd import stable_argsort
+from core.fixed_array import to_cells
+from utils.constants import FIXED_ONE
+
+class EnemyIndex:
+    """
+    Index spatial des ennemis d'un tick, pour les requêtes de combat groupées.
+
+    Les ennemis sont triés par case (tri stable, donc à case égale par
+    ordre du tableau) ; une requête ne parcourt que les cases couvertes
+    par son rayon. L'index est construit une fois par tick et sert à
+    tous les impacts de ce tick.
+
+    Avec ``groups`` (numéro de partie de chaque ennemi, voir
+    core.batch_simulation), plusieurs parties de même taille partagent
+    l'index : une requête ne voit que les ennemis de son groupe.
+    """
+    def __init__(self, x: np.ndarray, y: np.ndarray, world_width: int, world_height: int,
+                 groups: Optional[np.ndarray] = None):
+        self.x = x
+        self.y = y
+        self.world_width = world_width
+        self.world_height = world_height
+
+        # Tri stable par case puis par groupe (les ennemis sont toujours sur la carte :
+        # c'est le tri par clé, en deux passes plus rapides)
+        cell_x, cell_y = to_cells(x), to_cells(y)
+        self.order = stable_argsort(self._keys(cell_x, cell_y, None))
+        if groups is not None:
+            self.order = self.order[stable_argsort(groups[self.order])]
+        sorted_keys = self._keys(cell_x, cell_y, groups)[self.order]
+        boundaries = np.ones(len(sorted_keys), dtype=bool)
+        boundaries[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        self.starts = np.flatnonzero(boundaries)
+        self.cells = sorted_keys[self.starts]
+        self.counts = np.diff(np.append(self.starts, len(sorted_keys)))
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def _keys(self, cell_x: np.ndarray, cell_y: np.ndarray, groups: Optional[np.ndarray]) -> np.ndarray:
+        """Clé de chaque case (décalée d'une carte entière par groupe)"""
+        keys = cell_y * self.world_width + cell_x
+        if groups is not None:
+            keys = keys + groups * (self.world_width * self.world_height)
+        return keys
+
+    def _slots(self, cell_x: np.ndarray, cell_y: np.ndarray,
+               groups: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Case occupée correspondant à chaque (x, y) : (trouvée, indice dans self.cells)"""
+        keys = self._keys(cell_x, cell_y, groups)
+        slots = np.minimum(np.searchsorted(self.cells, keys), len(self.cells) - 1)
+        inside = (cell_x >= 0) & (cell_x < self.world_width) & (cell_y >= 0) & (cell_y < self.world_height)
+        return inside & (self.cells[slots] == keys), slots
+
+    def first_at(self, cell_x: np.ndarray, cell_y: np.ndarray,
+                 groups: Optional[np.ndarray] = None) -> np.ndarray:
+        """Premier ennemi (ordre du tableau) sur chaque case, -1 si la case est vide"""
+        first = np.full(len(cell_x), -1, dtype=np.int64)
+        if len(self.cells) == 0:
+            return first
+        found, slots = self._slots(cell_x, cell_y, groups)
+        first[found] = self.order[self.starts[slots[found]]]
+        return first
+
+    def query(self, center_x: np.ndarray, center_y: np.ndarray, radius,
+              exclude: Optional[np.ndarray] = None, limit=None,
+              groups: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ennemis à distance <= radius de chaque centre (virgule fixe).
+
+        Retourne deux tableaux alignés (requête, ennemi). ``exclude`` donne
+        pour chaque requête un ennemi à ignorer (-1 : aucun) ; avec
+        ``limit`` (un nombre, ou un par requête), seuls les ``limit`` plus
+        proches sont gardés (à distance égale, l'ordre du tableau
+        départage). ``groups`` donne le groupe de chaque requête.
+        """
+        count = len(center_x)
+        radius = np.broadcast_to(np.asarray(radius, dtype=np.int64), (count,))
+        if count == 0 or len(self.cells) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+
+        # Nombre de cases à parcourir de part et d'autre du centre
+        span = int(-(-radius.max() // FIXED_ONE))
+        base_x, base_y = to_cells(center_x), to_cells(center_y)
+
+        queries, enemies = [], []
+        for offset_y in range(-span, span + 1):
+            for offset_x in range(-span, span + 1):
+                found, slots = self._slots(base_x + offset_x, base_y + offset_y, groups)
+                owners = np.flatnonzero(found)
+                counts = self.counts[slots[found]]
+                total = int(counts.sum())
+                if total == 0:
+                    continue
+                # Tous les occupants de la case, pour chaque requête qui la voit
+                rank = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                queries.append(np.repeat(owners, counts))
+                enemies.append(self.order[np.repeat(self.starts[slots[found]], counts) + rank])
+
+        if not queries:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        queries, enemies = np.concatenate(queries), np.concatenate(enemies)
+
+        dx = self.x[enemies] - center_x[queries]
+        dy = self.y[enemies] - center_y[queries]
+        squared = dx * dx + dy * dy
+        keep = squared <= radius[queries] * radius[queries]
+        if exclude is not None:
+            keep &= enemies != exclude[queries]
+        queries, enemies, squared = queries[keep], enemies[keep], squared[keep]
+
+        if limit is not None:
+            # Tri par requête, puis distance, puis ordre du tableau
+            order = np.lexsort((enemies, squared, queries))
+            queries, enemies = queries[order], enemies[order]
+            group_start = np.searchsorted(queries, queries)
+            if np.ndim(limit):
+                limit = np.asarray(limit)[queries]
+            nearest = np.arange(len(queries)) - group_start < limit
+            queries, enemies = queries[nearest], enemies[nearest]
+
+        return queries, enemies
+
+def area_damage(index: EnemyIndex, center_x: np.ndarray, center_y: np.ndarray, primary: np.ndarray,
+                radius, damage: np.ndarray, total: np.ndarray, limit=None,
+                groups: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ajoute à ``total`` (dégâts par ennemi) les dégâts de zone de plusieurs impacts.
+
+    Chaque impact touche les ennemis à portée de son centre, sauf sa cible
+    principale (comptée à part) ; avec ``limit`` seuls les plus proches sont
+    touchés (éclair en chaîne). Tous les impacts sont traités en une requête.
+    Retourne les paires (impact, ennemi touché).
+    """
+    queries, enemies = index.query(center_x, center_y, radius, exclude=primary, limit=limit, groups=groups)
+    if len(enemies):
+        total += np.bincount(enemies, weights=damage[queries], minlength=len(total)).astype(np.int64)
+    return queries, enemies
@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 from models.position import Position
 
 class Entity(ABC):
+    __slots__ = ('position', 'hp')
+
     def __init__(self, position: Position, hp: int):
         self.position = position
         self.hp = hp
@@ -1,16 +1,48 @@
 from entities.base import Entity
-from models.position import Position
-import math
+from models.position import Position, to_fixed, to_cell, to_microseconds, div_round, fixed_distance
+from utils.constants import FIXED_ONE, MICROSECONDS
+from utils.archetypes import ARCHETYPES
 
 class Enemy(Entity):
     """
-    Représente un ennemi qui se déplace vers la tour
+    Représente un ennemi qui se déplace vers la tour.
+
+    Les statistiques (vitesse, valeur, PV de départ) sont lues dans la
+    table partagée ARCHETYPES : l'ennemi ne garde que le numéro de sa
+    ligne (``stats``) et ses PV courants.
     """
-    def __init__(self, position: Position, target_position: Position = None, speed: float = 1.0, hp: int = 10):
-        super().__init__(position, hp)
+    __slots__ = ('target_position', 'stats', 'effect_slot', 'speed_scale', 'fx', 'fy', 'serial')
+    
+    def __init__(self, position: Position, target_position: Position = None, stats: int = 0, hp: int = None):
+        super().__init__(position, ARCHETYPES.hp[stats] if hp is None else hp)
         self.target_position = target_position
-        self.speed = speed
-        self.value = 5  # Points gagnés quand l'ennemi est vaincu
+        self.stats = stats  # Ligne (type, vague) de la table des types d'ennemis
+        
+        # Effets de statut (voir core.effects) : emplacement et facteur de vitesse en virgule fixe
+        self.effect_slot = -1
+        self.speed_scale = FIXED_ONE
+        
+        # Position exacte en virgule fixe ; self.position n'en est que la case
+        self.fx = to_fixed(position.x)
+        self.fy = to_fixed(position.y)
+        
+        # Numéro d'apparition (donné par WaveManager) : répartit les mises à jour espacées
+        self.serial = 0
+    
+    @property
+    def speed(self) -> float:
+        """Vitesse en cases par seconde"""
+        return ARCHETYPES.speed[self.stats]
+    
+    @property
+    def value(self) -> int:
+        """Points gagnés quand l'ennemi est vaincu"""
+        return ARCHETYPES.value[self.stats]
+    
+    @property
+    def archetype(self) -> int:
+        """Type d'ennemi (indice dans ARCHETYPES.names)"""
+        return ARCHETYPES.archetype_of(self.stats)
     
     def set_target(self, target_position: Position):
         """Définit la position cible de l'ennemi"""
@@ -22,22 +54,25 @@ class Enemy(Entity):
             print(f"[ENNEMI] Pas de cible définie pour l'ennemi à {self.position.x}, {self.position.y}")
             return
         
-        # Calculer la direction vers la cible
-        dx = self.target_position.x - self.position.x
-        dy = self.target_position.y - self.position.y
-        distance = math.sqrt(dx**2 + dy**2)
+        # Calculer la direction vers la cible (en virgule fixe)
+        dx = to_fixed(self.target_position.x) - self.fx
+        dy = to_fixed(self.target_position.y) - self.fy
+        distance = fixed_distance(dx, dy)
+        speed = ARCHETYPES.speed_fixed[self.stats] * self.speed_scale // FIXED_ONE
+        step = speed * to_microseconds(delta_time) // MICROSECONDS
         
-        if distance <= self.speed:
+        if distance <= step:
             # Arrivé à destination
-            self.position.x = self.target_position.x
-            self.position.y = self.target_position.y
+            self.fx = to_fixed(self.target_position.x)
+            self.fy = to_fixed(self.target_position.y)
         else:
             # Se déplacer vers la cible
-            move_x = (dx / distance) * self.speed * delta_time
-            move_y = (dy / distance) * self.speed * delta_time
-            
-            self.position.x = round(self.position.x + move_x)
-            self.position.y = round(self.position.y + move_y)
+            self.fx += div_round(dx * step, distance)
+            self.fy += div_round(dy * step, distance)
+        
+        # La case n'est dérivée que pour l'affichage et les collisions
+        self.position.x = to_cell(self.fx)
+        self.position.y = to_cell(self.fy)
         
         print(f"[ENNEMI] Avance vers la cible. Nouvelle position : {self.position.x}, {self.position.y}")
     
@@ -50,9 +85,6 @@ class Enemy(Entity):
     
     @staticmethod
     def create_enemy(position: Position, target_position: Position = None, 
-                     wave: int = 1, difficulty_multiplier: float = 1.1) -> 'Enemy':
-        """Crée un ennemi adapté au niveau de vague actuel"""
-        hp = int(10 * (difficulty_multiplier ** (wave - 1)))
-        speed = 1.0 + (wave * 0.1)  # Augmente légèrement avec le niveau
-        
-        return Enemy(position, target_position, speed, hp)
\ No newline at end of file
+                     wave: int = 1, archetype: str = 'standard') -> 'Enemy':
+        """Crée un ennemi d'un type donné, adapté au niveau de vague actuel (lecture de table)"""
+        return Enemy(position, target_position, ARCHETYPES.row(ARCHETYPES.ids[archetype], wave))
\ No newline at end of file
@@ -1,38 +1,47 @@
 from entities.base import Entity
-from models.position import Position
-import math
+from models.position import Position, to_fixed, to_cell, to_microseconds, div_round, fixed_distance
+from utils.constants import FIXED_ONE, MICROSECONDS
 
 class Projectile(Entity):
     """
     Représente un projectile tiré par une tour vers une cible
     """
-    def __init__(self, position: Position, target_position: Position, damage: int = 1, speed: float = 3.0):
+    def __init__(self, position: Position, target_position: Position, damage: int = 1, speed: float = 3.0,
+                 splash_radius: float = 0.0, effect: str = None):
         super().__init__(position, hp=1)  # Les projectiles ont 1 HP
         self.target_position = target_position
         self.damage = damage
         self.speed = speed
+        self.splash_radius = splash_radius  # 0 : touche une seule cible
+        self.effect = effect  # Effet de statut appliqué aux ennemis touchés
         
-        # Calculer la direction du mouvement
-        dx = target_position.x - position.x
-        dy = target_position.y - position.y
-        distance = math.sqrt(dx**2 + dy**2)
+        # Position exacte en virgule fixe ; self.position n'en est que la case
+        self.fx = to_fixed(position.x)
+        self.fy = to_fixed(position.y)
+        
+        # Calculer la direction du mouvement (vitesse en unités fixes par seconde)
+        dx = to_fixed(target_position.x) - self.fx
+        dy = to_fixed(target_position.y) - self.fy
+        distance = fixed_distance(dx, dy)
+        speed_fixed = round(speed * FIXED_ONE)
         
         if distance > 0:
-            self.velocity_x = (dx / distance) * speed
-            self.velocity_y = (dy / distance) * speed
+            self.velocity_x = div_round(dx * speed_fixed, distance)
+            self.velocity_y = div_round(dy * speed_fixed, distance)
         else:
             self.velocity_x = 0
             self.velocity_y = 0
     
     def update(self, delta_time: float = 1.0):
         """Met à jour la position du projectile"""
-        # Position décimale pour des mouvements plus fluides
-        new_x = self.position.x + self.velocity_x * delta_time
-        new_y = self.position.y + self.velocity_y * delta_time
+        # Déplacement en arithmétique entière, sans perte entre les ticks
+        elapsed = to_microseconds(delta_time)
+        self.fx += div_round(self.velocity_x * elapsed, MICROSECONDS)
+        self.fy += div_round(self.velocity_y * elapsed, MICROSECONDS)
         
-        # Mettre à jour la position (conversion en entier)
-        self.position.x = round(new_x)
-        self.position.y = round(new_y)
+        # La case n'est dérivée que pour l'affichage et les collisions
+        self.position.x = to_cell(self.fx)
+        self.position.y = to_cell(self.fy)
         
         print(f"[PROJECTILE] Se déplace vers ({self.position.x}, {self.position.y})")
     
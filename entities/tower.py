@@ -1,30 +1,39 @@
-import time
 from entities.base import Entity
 from models.position import Position
+from utils.constants import WEAPONS, EFFECTS
 
 class Tower(Entity):
     """
     Représente une tour de défense qui peut tirer sur les ennemis
     """
-    def __init__(self, position: Position, range: int = 3, damage: int = 1, fire_rate: float = 1.0):
+    def __init__(self, position: Position, range: int = 3, damage: int = 1, fire_rate: float = 1.0,
+                 weapon: str = 'single'):
         super().__init__(position, hp=99)
         self.range = range
         self.damage = damage
         self.fire_rate = fire_rate  # Tirs par seconde
         self.reload_time = 1.0 / fire_rate
-        self.last_shot_time = 0
+        self.reload_elapsed = 0.0  # Temps simulé depuis le dernier tir
         self.reload_progress = 1.0  # 1.0 = prêt à tirer
+        
+        # Arme : 'single' (une cible), 'splash' (obus à éclats) ou 'chain' (éclair en chaîne)
+        self.weapon = weapon
+        self.splash_radius = 1.5  # Rayon des éclats autour de l'impact (en cases)
+        self.chain_count = 3  # Ennemis supplémentaires touchés par l'éclair
+        self.chain_range = 3.0  # Portée d'un rebond de l'éclair (en cases)
+        
+        # Effet de statut appliqué aux ennemis touchés : None, 'slow', 'burn' ou 'poison'
+        self.effect = None
     
     def update(self):
         """Met à jour l'état de la tour"""
         print(f"[TOUR] Prête à attaquer dans un rayon de {self.range}")
     
     def update_reload(self, delta_time: float):
-        """Met à jour le temps de rechargement"""
-        current_time = time.time()
-        elapsed = current_time - self.last_shot_time
+        """Met à jour le temps de rechargement (temps simulé, pas l'horloge)"""
+        self.reload_elapsed += delta_time
         
-        self.reload_progress = min(1.0, elapsed / self.reload_time)
+        self.reload_progress = min(1.0, self.reload_elapsed / self.reload_time)
     
     def can_shoot(self) -> bool:
         """Vérifie si la tour peut tirer"""
@@ -32,7 +41,7 @@ class Tower(Entity):
     
     def shoot(self):
         """Marque la tour comme ayant tiré, réinitialise le rechargement"""
-        self.last_shot_time = time.time()
+        self.reload_elapsed = 0.0
         self.reload_progress = 0.0
     
     def upgrade_damage(self, amount: int = 1):
@@ -49,4 +58,15 @@ class Tower(Entity):
         """Améliore la cadence de tir de la tour"""
         self.fire_rate += amount
         self.reload_time = 1.0 / self.fire_rate
-        print(f"[TOUR] Cadence de tir améliorée à {self.fire_rate:.1f} tirs/s")
\ No newline at end of file
+        print(f"[TOUR] Cadence de tir améliorée à {self.fire_rate:.1f} tirs/s")
+    
+    def cycle_weapon(self):
+        """Passe à l'arme suivante"""
+        self.weapon = WEAPONS[(WEAPONS.index(self.weapon) + 1) % len(WEAPONS)]
+        print(f"[TOUR] Arme : {self.weapon}")
+    
+    def cycle_effect(self):
+        """Passe à l'effet de statut suivant (aucun, puis chacun des effets)"""
+        choices = (None,) + EFFECTS
+        self.effect = choices[(choices.index(self.effect) + 1) % len(choices)]
+        print(f"[TOUR] Effet : {self.effect}")
\ No newline at end of file
@@ -1,6 +1,26 @@
+import os
+import sys
+from core import kernels
 from core.game_engine import GameEngine
 
 def main():
+    # Interface choisie en argument : 'tcod' (par défaut), 'ansi' ou 'headless'
+    frontend = sys.argv[1] if len(sys.argv) > 1 else 'tcod'
+    # Enregistrement optionnel de la partie (relire avec : python -m core.recorder FICHIER)
+    record = sys.argv[2] if len(sys.argv) > 2 else None
+    # Historique des parties, désactivé par défaut : TOWER_RUNS=runs.db pour l'activer
+    # (consulter avec : python -m core.run_store runs.db)
+    runs = os.environ.get('TOWER_RUNS')
+    # Mesures de jeu au format OpenMetrics : fichier (metrics.prom) ou http://127.0.0.1:9464
+    metrics = os.environ.get('TOWER_METRICS')
+    # Effets visuels : high, medium, low ou off
+    particles = os.environ.get('TOWER_PARTICLES', 'high')
+    # Brouillard de guerre (cases hors de vue des tours) : TOWER_FOG=1 pour l'afficher
+    fog = os.environ.get('TOWER_FOG', '') not in ('', '0')
+    
+    # Compiler (ou recharger du cache) les noyaux avant la première partie (TOWER_KERNELS=numba ; NumPy par défaut)
+    kernels.warm_up()
+    
     # Créer et lancer le moteur de jeu
     engine = GameEngine(
         screen_width=80,
@@ -8,7 +28,13 @@ def main():
         map_width=50,
         map_height=30,
         world_width=100,
-        world_height=100
+        world_height=100,
+        frontend=frontend,
+        record=record,
+        runs=runs or None,
+        metrics=metrics or None,
+        particles=particles,
+        fog=fog
     )
     engine.run()
 
@@ -0,0 +1,94 @@
+from typing import Dict, List, Tuple
+import numpy as np
+
+class CoverageMap:
+    """
+    Couverture de la carte par les tours : quelles tours atteignent chaque case.
+
+    Chaque tour est enregistrée sur les cases de son disque de portée
+    (même test que le ciblage : dx² + dy² <= portée²). Poser, déplacer,
+    améliorer ou vendre une tour ne met à jour que les cases de son
+    disque ; le ciblage et l'affichage ne font ensuite que des lectures.
+    """
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+
+        # Nombre de tours couvrant chaque case (pour l'affichage)
+        self.counts = np.zeros((height, width), dtype=np.int32)
+        # Tours couvrant chaque case couverte, dans l'ordre de pose
+        self.cells: Dict[int, List] = {}
+        # Empreinte enregistrée de chaque tour : (x, y, portée)
+        self.footprints: Dict[int, Tuple[int, int, int]] = {}
+
+        self._disks: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _disk(self, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Décalages (dx, dy) des cases à distance <= radius, mis en cache par rayon"""
+        if radius not in self._disks:
+            offsets = np.arange(-radius, radius + 1)
+            dx, dy = np.meshgrid(offsets, offsets)
+            inside = dx * dx + dy * dy <= radius * radius
+            self._disks[radius] = (dx[inside], dy[inside])
+        return self._disks[radius]
+
+    def _cells(self, x: int, y: int, radius: int, exclude_radius: int = -1) -> Tuple[np.ndarray, np.ndarray]:
+        """Cases de la carte du disque de centre (x, y), privé du disque de rayon exclude_radius"""
+        dx, dy = self._disk(radius)
+        if exclude_radius >= 0:
+            ring = dx * dx + dy * dy > exclude_radius * exclude_radius
+            dx, dy = dx[ring], dy[ring]
+        xs, ys = dx + x, dy + y
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        return xs[inside], ys[inside]
+
+    def add(self, tower) -> None:
+        """Enregistre la couverture d'une tour"""
+        x, y, radius = tower.position.x, tower.position.y, int(tower.range)
+        self._cover(tower, *self._cells(x, y, radius))
+        self.footprints[id(tower)] = (x, y, radius)
+
+    def remove(self, tower) -> None:
+        """Retire la couverture d'une tour (vendue ou détruite)"""
+        footprint = self.footprints.pop(id(tower), None)
+        if footprint is None:
+            return
+        xs, ys = self._cells(*footprint)
+        self.counts[ys, xs] -= 1
+        for key in (ys * self.width + xs).tolist():
+            towers = self.cells[key]
+            towers.remove(tower)
+            if not towers:
+                del self.cells[key]
+
+    def update(self, tower) -> None:
+        """Met à jour la couverture d'une tour déplacée ou dont la portée a changé"""
+        footprint = self.footprints.get(id(tower))
+        x, y, radius = tower.position.x, tower.position.y, int(tower.range)
+        if footprint == (x, y, radius):
+            return
+
+        if footprint is not None and footprint[:2] == (x, y) and radius > footprint[2]:
+            # Portée augmentée : seul l'anneau ajouté est à couvrir
+            self._cover(tower, *self._cells(x, y, radius, exclude_radius=footprint[2]))
+            self.footprints[id(tower)] = (x, y, radius)
+            return
+
+        self.remove(tower)
+        self.add(tower)
+
+    def _cover(self, tower, xs: np.ndarray, ys: np.ndarray) -> None:
+        """Ajoute une tour sur des cases (distinctes)"""
+        self.counts[ys, xs] += 1
+        for key in (ys * self.width + xs).tolist():
+            self.cells.setdefault(key, []).append(tower)
+
+    def towers_at(self, x: int, y: int) -> List:
+        """Tours dont la portée couvre la case (x, y)"""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return []
+        return self.cells.get(y * self.width + x, [])
+
+    def is_covered(self, x: int, y: int) -> bool:
+        """Vérifie si au moins une tour couvre la case"""
+        return 0 <= x < self.width and 0 <= y < self.height and self.counts[y, x] > 0
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from models.position import Position
 from entities.base import Entity
 
@@ -12,12 +12,26 @@ class GameMap:
         self.grid = [['.' for _ in range(width)] for _ in range(height)]
         self.entities: List[Entity] = []
         
+        # Cases de terrain modifiées (x, y), dans l'ordre ; la version est leur nombre
+        self.terrain_changes: List[Tuple[int, int]] = []
+        
         # Pour le viewport
         self.viewport_width = 40
         self.viewport_height = 20
         self.viewport_x = 0
         self.viewport_y = 0
     
+    @property
+    def terrain_version(self) -> int:
+        """Nombre de modifications du terrain depuis la création de la carte"""
+        return len(self.terrain_changes)
+    
+    def set_terrain(self, x: int, y: int, char: str) -> None:
+        """Change le terrain d'une case (voir OPAQUE_TERRAIN pour les murs)"""
+        if self.grid[y][x] != char:
+            self.grid[y][x] = char
+            self.terrain_changes.append((x, y))
+    
     def add_entity(self, entity: Entity) -> None:
         """Ajoute une entité à la carte"""
         self.entities.append(entity)
@@ -1,7 +1,33 @@
+import math
+from utils.constants import FIXED_SHIFT, FIXED_ONE, FIXED_HALF, MICROSECONDS
+
 class Position:
+    __slots__ = ('x', 'y')
+
     def __init__(self, x: int, y: int):
         self.x = x
         self.y = y
 
     def __eq__(self, other):
-        return isinstance(other, Position) and self.x == other.x and self.y == other.y
\ No newline at end of file
+        return isinstance(other, Position) and self.x == other.x and self.y == other.y
+
+def to_fixed(cell: int) -> int:
+    """Convertit une coordonnée en cases en virgule fixe (centre de la case)"""
+    return cell * FIXED_ONE
+
+def to_cell(fixed: int) -> int:
+    """Case la plus proche d'une coordonnée en virgule fixe"""
+    return (fixed + FIXED_HALF) >> FIXED_SHIFT
+
+def to_microseconds(delta_time: float) -> int:
+    """Convertit un delta de temps en secondes en microsecondes entières"""
+    return round(delta_time * MICROSECONDS)
+
+def div_round(a: int, b: int) -> int:
+    """Division entière arrondie au plus proche, symétrique autour de zéro (b > 0)"""
+    quotient = (abs(a) * 2 + b) // (b * 2)
+    return quotient if a >= 0 else -quotient
+
+def fixed_distance(dx: int, dy: int) -> int:
+    """Distance entière (arrondie par défaut) entre deux points en virgule fixe"""
+    return math.isqrt(dx * dx + dy * dy)
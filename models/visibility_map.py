@@ -0,0 +1,118 @@
+from typing import Dict, Optional, Set, Tuple
+import numpy as np
+
+from utils.constants import OPAQUE_TERRAIN
+
+class VisibilityMap:
+    """
+    Lignes de vue des tours et brouillard de guerre.
+
+    Le champ de vision de chaque tour (disque de sa portée, murs compris)
+    est calculé par le FOV de tcod (en C) sur un tableau de transparence
+    tiré de GameMap.grid, puis gardé en cache. Il n'est recalculé que si
+    la tour bouge, si sa portée change ou si le terrain change dans son
+    disque (voir sync_terrain). Sans case opaque dans le disque, le champ
+    de vision est le disque entier (tcod n'est alors pas chargé) : le
+    ciblage est celui de CoverageMap. Les cases vues au moins une fois
+    sont explorées.
+    """
+    def __init__(self, game_map):
+        self.game_map = game_map
+        self.width = game_map.width
+        self.height = game_map.height
+
+        # Terrain : codes des caractères de la grille et transparence de chaque case
+        self.terrain = np.array([[ord(char) for char in row] for row in game_map.grid], dtype=np.int32)
+        self.transparent = ~np.isin(self.terrain, [ord(char) for char in OPAQUE_TERRAIN])
+        self.terrain_version = game_map.terrain_version
+
+        # Champ de vision de chaque tour : empreinte (x, y, portée), coin du disque et masque
+        self.footprints: Dict[int, Tuple[int, int, int]] = {}
+        self.masks: Dict[int, Tuple[int, int, np.ndarray]] = {}
+        # Tours dont un mur coupe une partie du disque (les autres voient tout leur disque)
+        self.obstructed: Set[int] = set()
+
+        self.explored = np.zeros((self.height, self.width), dtype=bool)
+        self._visible: Optional[np.ndarray] = None  # Union des champs de vision (None : à recalculer)
+        self._disks: Dict[int, np.ndarray] = {}
+
+    def _disk(self, radius: int) -> np.ndarray:
+        """Masque du disque dx² + dy² <= radius² (même test que le ciblage), mis en cache par rayon"""
+        if radius not in self._disks:
+            offsets = np.arange(-radius, radius + 1)
+            self._disks[radius] = offsets[None, :] ** 2 + offsets[:, None] ** 2 <= radius * radius
+        return self._disks[radius]
+
+    def _field_of_view(self, x: int, y: int, radius: int) -> Tuple[int, int, np.ndarray, bool]:
+        """Coin (x0, y0) et masque des cases vues depuis (x, y), limités à la carte ; vrai si un mur gêne"""
+        x0, y0 = max(0, x - radius), max(0, y - radius)
+        x1, y1 = min(self.width, x + radius + 1), min(self.height, y + radius + 1)
+        disk = self._disk(radius)[y0 - y + radius:y1 - y + radius, x0 - x + radius:x1 - x + radius]
+        transparent = self.transparent[y0:y1, x0:x1]
+        if transparent[disk].all():
+            return x0, y0, disk, False
+
+        import tcod.map  # Chargé seulement quand un mur gêne une tour
+        seen = tcod.map.compute_fov(transparent, (y - y0, x - x0), radius, light_walls=True,
+                                    algorithm=tcod.constants.FOV_SYMMETRIC_SHADOWCAST)
+        return x0, y0, seen & disk, True
+
+    def add(self, tower) -> None:
+        """Calcule et garde le champ de vision d'une tour"""
+        x, y, radius = tower.position.x, tower.position.y, int(tower.range)
+        self.footprints[id(tower)] = (x, y, radius)
+        self._set_mask(id(tower), *self._field_of_view(x, y, radius))
+
+    def remove(self, tower) -> None:
+        """Oublie le champ de vision d'une tour (vendue ou détruite)"""
+        self.footprints.pop(id(tower), None)
+        self.masks.pop(id(tower), None)
+        self.obstructed.discard(id(tower))
+        self._visible = None
+
+    def update(self, tower) -> None:
+        """Recalcule le champ de vision d'une tour déplacée ou dont la portée a changé"""
+        if self.footprints.get(id(tower)) != (tower.position.x, tower.position.y, int(tower.range)):
+            self.add(tower)
+
+    def sync_terrain(self) -> None:
+        """Reprend les cases modifiées de la grille depuis le dernier appel ; recalcule les tours concernées"""
+        game_map = self.game_map
+        if game_map.terrain_version == self.terrain_version:
+            return
+        changes = game_map.terrain_changes[self.terrain_version:game_map.terrain_version]
+        self.terrain_version = game_map.terrain_version
+
+        xs = np.array([x for x, _ in changes], dtype=np.int64)
+        ys = np.array([y for _, y in changes], dtype=np.int64)
+        self.terrain[ys, xs] = [ord(game_map.grid[y][x]) for x, y in changes]
+        self.transparent[ys, xs] = ~np.isin(self.terrain[ys, xs], [ord(char) for char in OPAQUE_TERRAIN])
+
+        for key, (x, y, radius) in list(self.footprints.items()):
+            if ((xs - x) ** 2 + (ys - y) ** 2 <= radius * radius).any():
+                self._set_mask(key, *self._field_of_view(x, y, radius))
+
+    def _set_mask(self, key: int, x0: int, y0: int, mask: np.ndarray, obstructed: bool) -> None:
+        """Remplace le champ de vision d'une tour"""
+        self.masks[key] = (x0, y0, mask)
+        if obstructed:
+            self.obstructed.add(key)
+        else:
+            self.obstructed.discard(key)
+        self._visible = None
+
+    def sees(self, tower, x: int, y: int) -> bool:
+        """Vérifie si la tour voit la case (x, y)"""
+        x0, y0, mask = self.masks[id(tower)]
+        row, column = y - y0, x - x0
+        return 0 <= row < mask.shape[0] and 0 <= column < mask.shape[1] and bool(mask[row, column])
+
+    def visible(self) -> np.ndarray:
+        """Cases vues par au moins une tour (et marquées explorées), tableau (hauteur, largeur)"""
+        if self._visible is None:
+            visible = np.zeros((self.height, self.width), dtype=bool)
+            for x0, y0, mask in self.masks.values():
+                visible[y0:y0 + mask.shape[0], x0:x0 + mask.shape[1]] |= mask
+            self.explored |= visible
+            self._visible = visible
+        return self._visible
@@ -0,0 +1,96 @@
+import json
+import os
+import random
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+from utils.constants import FIXED_ONE
+
+# Définition des types d'ennemis (données du jeu)
+ARCHETYPES_FILE = os.path.join(os.path.dirname(__file__), 'archetypes.json')
+
+# Vagues compilées ; au-delà, les statistiques de la dernière vague sont réutilisées
+MAX_WAVE = 200
+
+class ArchetypeTable:
+    """
+    Statistiques des types d'ennemis, compilées une fois pour toutes les vagues.
+
+    Chaque couple (type, vague) occupe une ligne des tables : un ennemi ne
+    garde que le numéro de sa ligne (et ses PV courants), les valeurs
+    communes sont partagées. Les tables existent en listes (accès depuis
+    les objets) et en tableaux NumPy (accès groupé depuis la Simulation).
+    """
+    def __init__(self, definitions: Dict[str, Dict[str, Any]], max_wave: int = MAX_WAVE):
+        self.names = list(definitions)
+        self.ids = {name: archetype for archetype, name in enumerate(self.names)}
+        self.max_wave = max_wave
+
+        # Affichage et apparition, par type
+        self.chars = [definitions[name]['char'] for name in self.names]
+        self.colors = [tuple(definitions[name]['color']) for name in self.names]
+        self.weights = [definitions[name].get('weight', 0) for name in self.names]
+        self.from_wave = [definitions[name].get('from_wave', 1) for name in self.names]
+        self.every_wave = [definitions[name].get('every_wave', 0) for name in self.names]
+        self.candidates: Dict[int, Tuple[List[int], float]] = {}
+
+        # Statistiques, par ligne (type, vague)
+        self.hp, self.speed, self.value = [], [], []
+        for name in self.names:
+            definition = definitions[name]
+            for wave in range(1, max_wave + 1):
+                self.hp.append(int(definition['hp'] * (definition['hp_growth'] ** (wave - 1))))
+                self.speed.append(definition['speed'] + (wave * definition['speed_per_wave']))
+                self.value.append(definition['value'])
+        self.speed_fixed = [round(speed * FIXED_ONE) for speed in self.speed]
+
+        self.hp_array = np.array(self.hp, dtype=np.int64)
+        self.speed_fixed_array = np.array(self.speed_fixed, dtype=np.int64)
+        self.value_array = np.array(self.value, dtype=np.int64)
+
+    def row(self, archetype: int, wave: int) -> int:
+        """Ligne des statistiques d'un type à une vague donnée"""
+        return archetype * self.max_wave + min(max(wave, 1), self.max_wave) - 1
+
+    def archetype_of(self, row: int) -> int:
+        """Type d'ennemi d'une ligne"""
+        return row // self.max_wave
+
+    def choose(self, rng: random.Random, wave: int, index: int) -> int:
+        """
+        Type du ``index``-ième ennemi d'une vague : les boss ouvrent leurs
+        vagues, les autres sont tirés selon leur poids parmi les types
+        disponibles (sans tirage s'il n'y en a qu'un)
+        """
+        for archetype, every in enumerate(self.every_wave):
+            if every and index == 0 and wave >= self.from_wave[archetype] and wave % every == 0:
+                return archetype
+
+        available, total = self._candidates(wave)
+        if len(available) == 1:
+            return available[0]
+
+        pick = rng.random() * total
+        for archetype in available:
+            pick -= self.weights[archetype]
+            if pick < 0:
+                return archetype
+        return available[-1]
+
+    def _candidates(self, wave: int) -> Tuple[List[int], float]:
+        """Types tirables à une vague et somme de leurs poids (calculés une fois par vague)"""
+        if wave not in self.candidates:
+            available = [archetype for archetype, weight in enumerate(self.weights)
+                         if weight > 0 and self.from_wave[archetype] <= wave]
+            self.candidates[wave] = available, sum(self.weights[archetype] for archetype in available)
+        return self.candidates[wave]
+
+@lru_cache(maxsize=None)
+def load_archetypes(path: str = ARCHETYPES_FILE) -> ArchetypeTable:
+    """Charge et compile un fichier de types d'ennemis (une seule fois par fichier)"""
+    with open(path, encoding='utf-8') as data:
+        return ArchetypeTable(json.load(data))
+
+# Table du jeu, partagée par tous les ennemis
+ARCHETYPES = load_archetypes()
@@ -0,0 +1,53 @@
+# Codes de touches (valeurs SDL, identiques à tcod.event.K_*)
+# Permettent aux interfaces sans tcod de produire les mêmes événements.
+KEY_RETURN = 0x0D
+KEY_ESCAPE = 0x1B
+KEY_SPACE = 0x20
+KEY_1 = 0x31
+KEY_2 = 0x32
+KEY_3 = 0x33
+KEY_A = 0x61
+KEY_B = 0x62
+KEY_D = 0x64
+KEY_E = 0x65
+KEY_R = 0x72
+KEY_S = 0x73
+KEY_W = 0x77
+KEY_X = 0x78
+KEY_RIGHT = 0x4000004F
+KEY_LEFT = 0x40000050
+KEY_DOWN = 0x40000051
+KEY_UP = 0x40000052
+
+# Coût des améliorations de la tour
+UPGRADE_COSTS = {
+    'damage': 10,
+    'range': 15,
+    'fire_rate': 25,
+    'hp': 20,
+}
+
+# Mode construction : prix d'une tour et somme rendue à la vente
+TOWER_COST = 30
+TOWER_REFUND = 15
+
+# Terrain de GameMap.grid qui bloque la vue des tours (voir models.visibility_map)
+OPAQUE_TERRAIN = '#'
+
+# Armes des tours, dans l'ordre de sélection (touche W)
+WEAPONS = ('single', 'splash', 'chain')
+WEAPON_NAMES = {'single': "Simple", 'splash': "Éclats", 'chain': "Chaîne"}
+
+# Coordonnées en virgule fixe : une case vaut FIXED_ONE unités
+# (1/65536 de case : même à 1000 ticks/s un ennemi lent avance encore)
+FIXED_SHIFT = 16
+FIXED_ONE = 1 << FIXED_SHIFT
+FIXED_HALF = FIXED_ONE >> 1
+MICROSECONDS = 1_000_000
+
+# Effets de statut des tours (touche E) : durée en secondes
+EFFECTS = ('slow', 'burn', 'poison')
+EFFECT_NAMES = {None: "Aucun", 'slow': "Gel", 'burn': "Feu", 'poison': "Poison"}
+EFFECT_DURATIONS = {'slow': 2.0, 'burn': 1.5, 'poison': 5.0}
+SLOW_FACTOR = 0.5  # Vitesse restante d'un ennemi ralenti
+DAMAGE_PER_SECOND = {'burn': 4, 'poison': 1}